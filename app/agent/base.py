@@ -1,9 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import Any, ClassVar, List, Optional, Tuple
 
 from pydantic import BaseModel, Field, model_validator
 
+from app.checkpoint import CheckpointStore
 from app.llm import LLM
 from app.logger import logger
 from app.sandbox.client import SANDBOX_CLIENT
@@ -42,6 +44,18 @@ class BaseAgent(BaseModel, ABC):
 
     duplicate_threshold: int = 2
 
+    # Number of runs in progress in this process, across all agents
+    _active_runs: ClassVar[int] = 0
+
+    # Checkpointing
+    checkpoint_id: Optional[str] = Field(
+        None,
+        description="Run ID to record progress under, a run with a known ID resumes from its checkpoint",
+    )
+    # Number of memory messages already checkpointed, and the last of them
+    _checkpoint_count: int = 0
+    _checkpoint_last: Optional[Message] = None
+
     class Config:
         arbitrary_types_allowed = True
         extra = "allow"  # Allow extra fields for flexibility in subclasses
@@ -128,30 +142,122 @@ class BaseAgent(BaseModel, ABC):
         if self.state != AgentState.IDLE:
             raise RuntimeError(f"Cannot run agent from state: {self.state}")
 
-        if request:
-            self.update_memory("user", request)
+        checkpoint = CheckpointStore.for_config() if self.checkpoint_id else None
+        records = (
+            await asyncio.to_thread(checkpoint.load, self.checkpoint_run_id)
+            if checkpoint
+            else []
+        )
+        for kind, data in records:
+            if kind == "result":
+                logger.info(f"Run {self.checkpoint_id} already finished")
+                return data
 
         results: List[str] = []
-        async with self.state_context(AgentState.RUNNING):
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
-            ):
-                self.current_step += 1
-                logger.info(f"Executing step {self.current_step}/{self.max_steps}")
-                step_result = await self.step()
-
-                # Check for stuck state
-                if self.is_stuck():
-                    self.handle_stuck_state()
-
-                results.append(f"Step {self.current_step}: {step_result}")
-
-            if self.current_step >= self.max_steps:
-                self.current_step = 0
-                self.state = AgentState.IDLE
-                results.append(f"Terminated: Reached max steps ({self.max_steps})")
-        await SANDBOX_CLIENT.cleanup()
-        return "\n".join(results) if results else "No steps executed"
+        if records:
+            results = self._restore_checkpoint(records)
+            logger.info(
+                f"Resuming run {self.checkpoint_id} after step {self.current_step}"
+            )
+        else:
+            self._checkpoint_count = len(self.memory.messages)
+            self._checkpoint_last = (
+                self.memory.messages[-1] if self.memory.messages else None
+            )
+            if request:
+                self.update_memory("user", request)
+
+        BaseAgent._active_runs += 1
+        try:
+            async with self.state_context(AgentState.RUNNING):
+                while (
+                    self.current_step < self.max_steps
+                    and self.state != AgentState.FINISHED
+                ):
+                    self.current_step += 1
+                    logger.info(f"Executing step {self.current_step}/{self.max_steps}")
+                    step_result = await self.step()
+
+                    # Check for stuck state
+                    if self.is_stuck():
+                        self.handle_stuck_state()
+
+                    results.append(f"Step {self.current_step}: {step_result}")
+                    if checkpoint:
+                        self._save_checkpoint(checkpoint, results[-1])
+
+                if self.current_step >= self.max_steps:
+                    self.current_step = 0
+                    self.state = AgentState.IDLE
+                    results.append(f"Terminated: Reached max steps ({self.max_steps})")
+            result = "\n".join(results) if results else "No steps executed"
+            if checkpoint:
+                checkpoint.record(self.checkpoint_run_id, "result", result)
+        finally:
+            BaseAgent._active_runs -= 1
+            if checkpoint:
+                await asyncio.to_thread(checkpoint.flush)
+        # The sandbox is shared by every agent of the process
+        if not BaseAgent._active_runs:
+            await SANDBOX_CLIENT.cleanup()
+        return result
+
+    @property
+    def checkpoint_run_id(self) -> str:
+        """ID of the run's records in the checkpoint store"""
+        return f"agent:{self.checkpoint_id}"
+
+    def _save_checkpoint(self, checkpoint: CheckpointStore, step_result: str) -> None:
+        """Record the step result and the messages added since the last checkpoint."""
+        messages = self.memory.messages
+        count = self._checkpoint_count
+        start, reset = 0, False
+        if count:
+            # Memory grows at the end and may drop its oldest messages, find
+            # where the checkpointed ones end. Compaction rewrites messages,
+            # which then have to be recorded again in full
+            start = next(
+                (
+                    i + 1
+                    for i in range(min(count, len(messages)) - 1, -1, -1)
+                    if messages[i] is self._checkpoint_last
+                ),
+                None,
+            )
+            if start is None:
+                start, reset = 0, True
+        checkpoint.record(
+            self.checkpoint_run_id,
+            "step",
+            {
+                "step": self.current_step,
+                "result": step_result,
+                "reset": reset,
+                "dropped": count - start if not reset else 0,
+                "messages": [message.model_dump() for message in messages[start:]],
+            },
+        )
+        self._checkpoint_count = len(messages)
+        self._checkpoint_last = messages[-1] if messages else None
+
+    def _restore_checkpoint(self, records: List[Tuple[str, Any]]) -> List[str]:
+        """Replay the recorded steps into memory, returning their results."""
+        results = []
+        messages = self.memory.messages
+        for kind, data in records:
+            if kind != "step":
+                continue
+            new_messages = [Message(**message) for message in data["messages"]]
+            if data["reset"]:
+                messages = new_messages
+            else:
+                messages = messages[data["dropped"] :] + new_messages
+            self.current_step = data["step"]
+            results.append(data["result"])
+        self.memory.messages = messages
+        self._checkpoint_count = len(messages)
+        self._checkpoint_last = messages[-1] if messages else None
+        return results
 
     @abstractmethod
     async def step(self) -> str:
@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING, Optional
 from pydantic import Field, model_validator
 
 from app.agent.toolcall import ToolCallAgent
+from app.config import BrowserSettings, config
 from app.logger import logger
 from app.prompt.browser import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import Message, ToolChoice
@@ -19,12 +20,21 @@ class BrowserContextHelper:
     def __init__(self, agent: "BaseAgent"):
         self.agent = agent
         self._current_base64_image: Optional[str] = None
+        # Last full element list put in the prompt, later states are diffs to it
+        self._elements_text: str = ""
 
     async def get_browser_state(self) -> Optional[dict]:
         browser_tool = self.agent.available_tools.get_tool(BrowserUseTool().name)
         if not browser_tool or not hasattr(browser_tool, "get_current_state"):
             logger.warning("BrowserUseTool not found or doesn't have get_current_state")
             return None
+        # A diff is useless once memory no longer holds the list it applies to
+        if self._elements_text and not any(
+            self._elements_text in (message.content or "")
+            for message in self.agent.memory.messages
+        ):
+            browser_tool.reset_observations()
+            self._elements_text = ""
         try:
             result = await browser_tool.get_current_state()
             if result.error:
@@ -43,10 +53,12 @@ class BrowserContextHelper:
         """Gets browser state and formats the browser prompt."""
         browser_state = await self.get_browser_state()
         url_info, tabs_info, content_above_info, content_below_info = "", "", "", ""
+        elements_info = ""
         results_info = ""  # Or get from agent if needed elsewhere
 
         if browser_state and not browser_state.get("error"):
             url_info = f"\n   URL: {browser_state.get('url', 'N/A')}\n   Title: {browser_state.get('title', 'N/A')}"
+            elements_info = self._format_elements(browser_state)
             tabs = browser_state.get("tabs", [])
             if tabs:
                 tabs_info = f"\n   {len(tabs)} tab(s) available"
@@ -64,15 +76,40 @@ class BrowserContextHelper:
                 )
                 self.agent.memory.add_message(image_message)
                 self._current_base64_image = None  # Consume the image after adding
+                browser_settings = config.browser_config or BrowserSettings()
+                self.agent.memory.keep_latest_images(
+                    browser_settings.max_images_in_memory
+                )
 
         return NEXT_STEP_PROMPT.format(
             url_placeholder=url_info,
+            elements_placeholder=elements_info,
             tabs_placeholder=tabs_info,
             content_above_placeholder=content_above_info,
             content_below_placeholder=content_below_info,
             results_placeholder=results_info,
         )
 
+    def _format_elements(self, browser_state: dict) -> str:
+        """Format the interactive elements, or their changes since the last step."""
+        diff = browser_state.get("interactive_elements_diff")
+        if diff is None:
+            self._elements_text = browser_state.get("interactive_elements") or ""
+            return f":\n{self._elements_text}" if self._elements_text else ""
+        if diff.get("unchanged"):
+            return " (unchanged since the previous step)"
+
+        parts = [" (changes since the previous step, other elements are unchanged):"]
+        if diff["added"]:
+            parts.append(f"Added:\n{diff['added']}")
+        if diff["changed"]:
+            parts.append(f"Changed:\n{diff['changed']}")
+        if diff["removed"]:
+            parts.append("Removed: " + ", ".join(f"[{i}]" for i in diff["removed"]))
+        if diff["renumbered"]:
+            parts.append("Renumbered: " + "; ".join(diff["renumbered"]))
+        return "\n".join(parts)
+
     async def cleanup_browser(self):
         browser_tool = self.agent.available_tools.get_tool(BrowserUseTool().name)
         if browser_tool and hasattr(browser_tool, "cleanup"):
@@ -1,11 +1,13 @@
 import asyncio
 import json
-from typing import Any, List, Optional, Union
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import Field
 
 from app.agent.react import ReActAgent
-from app.exceptions import TokenLimitExceeded
+from app.exceptions import TokenLimitExceeded, ToolCallStreamInterrupted
+from app.llm import MULTIMODAL_MODELS
 from app.logger import logger
 from app.prompt.toolcall import NEXT_STEP_PROMPT, SYSTEM_PROMPT
 from app.schema import TOOL_CHOICE_TYPE, AgentState, Message, ToolCall, ToolChoice
@@ -14,6 +16,11 @@ from app.tool import CreateChatCompletion, Terminate, ToolCollection
 
 TOOL_CALL_REQUIRED = "Tool calls required but none provided"
 
+# Image captured by the tool call running in the current task
+_tool_base64_image: ContextVar[Optional[str]] = ContextVar(
+    "tool_base64_image", default=None
+)
+
 
 class ToolCallAgent(ReActAgent):
     """Base agent class for handling tool/function calls with enhanced abstraction"""
@@ -36,12 +43,38 @@ class ToolCallAgent(ReActAgent):
     max_steps: int = 30
     max_observe: Optional[Union[int, bool]] = None
 
+    # Compact memory to fit this many prompt tokens (also bounded by the LLM's
+    # remaining max_input_tokens), None to only compact under max_input_tokens
+    memory_token_budget: Optional[int] = None
+
+    # Run consecutive calls of concurrency-safe tools concurrently
+    parallel_tool_calls: bool = True
+    max_concurrent_tool_calls: int = 4
+
+    # Scheduled tool calls of the current step, keyed by call id
+    _tool_tasks: Dict[str, asyncio.Task] = {}
+    # Calls started while the LLM was still streaming, in call order
+    _streamed_tool_calls: List[ToolCall] = []
+    # Last scheduled call that must not overlap with later calls
+    _tool_barrier: Optional[asyncio.Task] = None
+    _tool_semaphore: Optional[asyncio.Semaphore] = None
+
     async def think(self) -> bool:
         """Process current state and decide next actions using tools"""
         if self.next_step_prompt:
             user_msg = Message.user_message(self.next_step_prompt)
             self.messages += [user_msg]
 
+        self._compact_memory()
+
+        self._reset_tool_tasks()
+        # With streamed tool calls, start executing each call as soon as it is complete
+        on_tool_call = (
+            self._start_tool_call_early
+            if self.llm.stream_tool_calls and self.tool_choices != ToolChoice.NONE
+            else None
+        )
+
         try:
             # Get response with tool options
             response = await self.llm.ask_tool(
@@ -53,10 +86,25 @@ class ToolCallAgent(ReActAgent):
                 ),
                 tools=self.available_tools.to_params(),
                 tool_choice=self.tool_choices,
+                on_tool_call=on_tool_call,
+            )
+        except ToolCallStreamInterrupted as e:
+            # Started calls may have had side effects, so they are let finish
+            # and reported rather than cancelled and asked for again
+            logger.warning(f"⚠️ {self.name}'s response was interrupted: {e}")
+            self.tool_calls = list(self._streamed_tool_calls)
+            self.memory.add_message(
+                Message.from_tool_calls(
+                    content=f"My response was interrupted ({e}), only these tool calls were run.",
+                    tool_calls=self.tool_calls,
+                )
             )
+            return True
         except ValueError:
+            self._reset_tool_tasks()
             raise
         except Exception as e:
+            self._reset_tool_tasks()
             # Check if this is a RetryError containing TokenLimitExceeded
             if hasattr(e, "__cause__") and isinstance(e.__cause__, TokenLimitExceeded):
                 token_limit_error = e.__cause__
@@ -120,6 +168,7 @@ class ToolCallAgent(ReActAgent):
 
             return bool(self.tool_calls)
         except Exception as e:
+            self._reset_tool_tasks()
             logger.error(f"🚨 Oops! The {self.name}'s thinking process hit a snag: {e}")
             self.memory.add_message(
                 Message.assistant_message(
@@ -128,6 +177,34 @@ class ToolCallAgent(ReActAgent):
             )
             return False
 
+    def _compact_memory(self) -> None:
+        """Compact memory so the next request fits the token budget"""
+        budget = self.memory_token_budget
+        if self.llm.max_input_tokens is not None:
+            remaining = self.llm.max_input_tokens - self.llm.used_input_tokens
+            budget = remaining if budget is None else min(budget, remaining)
+        if budget is None:
+            return
+
+        # Leave room for the parts of the request that are not in memory
+        counter = self.llm.token_counter
+        supports_images = self.llm.model in MULTIMODAL_MODELS
+        overhead = counter.FORMAT_TOKENS + sum(
+            counter.count_text_cached(str(tool))
+            for tool in self.available_tools.to_params()
+        )
+        if self.system_prompt:
+            overhead += counter.count_message(
+                Message.system_message(self.system_prompt), supports_images
+            )
+
+        before = self.memory.count_tokens(counter, supports_images)
+        after = self.memory.compact(counter, budget - overhead, supports_images)
+        if after < before:
+            logger.info(
+                f"🗜️ Compacted {self.name}'s memory from {before} to {after} tokens"
+            )
+
     async def act(self) -> str:
         """Execute tool calls and handle their results"""
         if not self.tool_calls:
@@ -137,12 +214,12 @@ class ToolCallAgent(ReActAgent):
             # Return last message content if no tool calls
             return self.messages[-1].content or "No content or commands to execute"
 
-        results = []
-        for command in self.tool_calls:
-            # Reset base64_image for each tool call
-            self._current_base64_image = None
+        # Calls already started while streaming are reused, results keep call order
+        tasks = [self._schedule_tool_call(command) for command in self.tool_calls]
 
-            result = await self.execute_tool(command)
+        results = []
+        for command, task in zip(self.tool_calls, tasks):
+            result, self._current_base64_image = await task
 
             if self.max_observe:
                 result = result[: self.max_observe]
@@ -161,8 +238,67 @@ class ToolCallAgent(ReActAgent):
             self.memory.add_message(tool_msg)
             results.append(result)
 
+        self._reset_tool_tasks()
         return "\n\n".join(results)
 
+    def _schedule_tool_call(self, command: ToolCall) -> asyncio.Task:
+        """Start a tool call as a task, ordered after the calls it must not overlap.
+
+        Calls of concurrency-safe tools only wait for the last unsafe call and run
+        under the agent's concurrency limit; any other call waits for every call
+        scheduled before it, preserving sequential semantics.
+        """
+        if command.id in self._tool_tasks:
+            return self._tool_tasks[command.id]
+
+        tool = self.available_tools.get_tool(command.function.name)
+        concurrent = self.parallel_tool_calls and bool(tool and tool.concurrency_safe)
+        if self._tool_semaphore is None:
+            self._tool_semaphore = asyncio.Semaphore(self.max_concurrent_tool_calls)
+        semaphore = self._tool_semaphore
+        depends_on = (
+            [self._tool_barrier] if concurrent else list(self._tool_tasks.values())
+        )
+
+        async def run() -> Tuple[str, Optional[str]]:
+            pending = [task for task in depends_on if task]
+            if pending:
+                await asyncio.wait(pending)
+            if not concurrent:
+                return await self._execute_tool_with_image(command)
+            async with semaphore:
+                return await self._execute_tool_with_image(command)
+
+        task = asyncio.create_task(run())
+        self._tool_tasks[command.id] = task
+        if not concurrent:
+            self._tool_barrier = task
+        return task
+
+    async def _execute_tool_with_image(
+        self, command: ToolCall
+    ) -> Tuple[str, Optional[str]]:
+        """Execute a tool call and return its observation and captured image"""
+        # Reset base64_image for each tool call
+        _tool_base64_image.set(None)
+        result = await self.execute_tool(command)
+        return result, _tool_base64_image.get()
+
+    def _start_tool_call_early(self, command: ToolCall) -> None:
+        """Start a tool call received while the LLM is still streaming"""
+        logger.info(f"⚡ Starting tool '{command.function.name}' while streaming")
+        self._streamed_tool_calls.append(command)
+        self._schedule_tool_call(command)
+
+    def _reset_tool_tasks(self) -> None:
+        """Cancel scheduled tool calls whose results will not be used"""
+        for task in self._tool_tasks.values():
+            task.cancel()
+        self._tool_tasks = {}
+        self._streamed_tool_calls = []
+        self._tool_barrier = None
+        self._tool_semaphore = None
+
     async def execute_tool(self, command: ToolCall) -> str:
         """Execute a single tool call with robust error handling"""
         if not command or not command.function or not command.function.name:
@@ -187,6 +323,7 @@ class ToolCallAgent(ReActAgent):
             if hasattr(result, "base64_image") and result.base64_image:
                 # Store the base64_image for later use in tool_message
                 self._current_base64_image = result.base64_image
+                _tool_base64_image.set(result.base64_image)
 
             # Format result for display (standard case)
             observation = (
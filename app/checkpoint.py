@@ -0,0 +1,155 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import CheckpointSettings, config
+from app.logger import logger
+
+
+class CheckpointStore:
+    """Append-only log of run progress, kept in a SQLite file.
+
+    Flows and agents record plan changes, step results and memory deltas
+    under a run ID, and replay them to resume an interrupted run without
+    repeating the LLM and tool calls it already made. Records are buffered
+    and written in one transaction by a timer thread, flush_interval seconds
+    after the first of them was buffered or right away once flush_records are
+    pending, so a step costs an append to a list rather than a disk sync. A
+    crash loses at most the records of the last flush_interval seconds, which
+    are then run again. flush() and load() touch the file, async callers run
+    them in a thread.
+    """
+
+    _instances: Dict[str, "CheckpointStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self, path: Path, flush_interval: float = 2.0, flush_records: int = 64
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        # (run_id, kind, data, replace) records waiting to be written
+        self._pending: List[Tuple[str, str, str, bool]] = []
+        # Flushes the pending records once flush_interval is over
+        self._timer: Optional[threading.Timer] = None
+        # Guards the pending records and the timer, never held while writing
+        self._lock = threading.Lock()
+        # Serializes writes, so records reach the file in order
+        self._write_lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, "
+            "kind TEXT NOT NULL, data TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS records_run ON records (run_id, seq)"
+        )
+        self._db.commit()
+        atexit.register(self.flush)
+
+    @classmethod
+    def for_config(
+        cls, settings: Optional[CheckpointSettings] = None
+    ) -> Optional["CheckpointStore"]:
+        """Get the configured checkpoint store, or None if checkpoints are off"""
+        settings = settings or config.checkpoint_config or CheckpointSettings()
+        if not settings.enabled:
+            return None
+
+        path = Path(
+            settings.path
+            or config.workspace_root / ".checkpoints" / "checkpoints.sqlite"
+        ).resolve()
+        with cls._instances_lock:
+            store = cls._instances.get(str(path))
+            if store is None:
+                store = cls._instances[str(path)] = cls(
+                    path,
+                    flush_interval=settings.flush_interval,
+                    flush_records=settings.flush_records,
+                )
+            return store
+
+    def record(self, run_id: str, kind: str, data: Any, replace: bool = False) -> None:
+        """Append a record to a run.
+
+        With replace, a still pending record of the same kind is dropped, for
+        snapshots where only the latest one matters.
+        """
+        payload = json.dumps(data, default=str)
+        with self._lock:
+            if replace:
+                self._pending = [
+                    pending
+                    for pending in self._pending
+                    if not (pending[0] == run_id and pending[1] == kind)
+                ]
+            self._pending.append((run_id, kind, payload, replace))
+            delay = self.flush_interval
+            if len(self._pending) >= self.flush_records:
+                delay = 0
+            if self._timer is not None and self._timer.interval > delay:
+                self._timer.cancel()
+                self._timer = None
+            if self._timer is None:
+                # The caller is usually on the event loop, the write never is
+                self._timer = threading.Timer(max(delay, 0), self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write the pending records"""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return
+            now = time.time()
+            try:
+                with self._db:
+                    for run_id, kind, data, replace in pending:
+                        if replace:
+                            self._db.execute(
+                                "DELETE FROM records WHERE run_id = ? AND kind = ?",
+                                (run_id, kind),
+                            )
+                        self._db.execute(
+                            "INSERT INTO records (run_id, kind, data, created_at) "
+                            "VALUES (?, ?, ?, ?)",
+                            (run_id, kind, data, now),
+                        )
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(pending)} checkpoint records: {e}")
+
+    def load(self, run_id: str) -> List[Tuple[str, Any]]:
+        """Get the (kind, data) records of a run, oldest first"""
+        self.flush()
+        with self._write_lock:
+            rows = self._db.execute(
+                "SELECT kind, data FROM records WHERE run_id = ? ORDER BY seq",
+                (run_id,),
+            ).fetchall()
+        return [(kind, json.loads(data)) for kind, data in rows]
+
+    def delete(self, run_id: str) -> None:
+        """Remove every record of a run"""
+        with self._write_lock:
+            with self._lock:
+                self._pending = [
+                    pending for pending in self._pending if pending[0] != run_id
+                ]
+            with self._db:
+                self._db.execute("DELETE FROM records WHERE run_id = ?", (run_id,))
@@ -28,6 +28,40 @@ class LLMSettings(BaseModel):
     temperature: float = Field(1.0, description="Sampling temperature")
     api_type: str = Field(..., description="Azure, Openai, or Ollama")
     api_version: str = Field(..., description="Azure Openai version if AzureOpenai")
+    http2: bool = Field(
+        False, description="Use HTTP/2 for API requests (requires the h2 package)"
+    )
+    max_connections: int = Field(
+        1000, description="Maximum concurrent connections per API base URL"
+    )
+    max_keepalive_connections: int = Field(
+        100, description="Maximum idle keep-alive connections per API base URL"
+    )
+    keepalive_expiry: float = Field(
+        30.0, description="Seconds an idle keep-alive connection is kept open"
+    )
+    stream_tool_calls: bool = Field(
+        False,
+        description="Stream tool requests and hand over each tool call as soon as its arguments are complete",
+    )
+    response_cache: str = Field(
+        "off",
+        description="Response cache mode: off, on (read and write) or replay (read only, misses fail)",
+    )
+    response_cache_path: Optional[str] = Field(
+        None,
+        description="SQLite file of the response cache (None for workspace/.cache/llm_responses.sqlite)",
+    )
+    response_cache_ttl: Optional[float] = Field(
+        7 * 24 * 3600,
+        description="Seconds a cached response stays valid (None for no expiry)",
+    )
+    response_cache_memory_entries: int = Field(
+        256, description="Responses kept in the in-memory LRU tier"
+    )
+    response_cache_max_size_mb: float = Field(
+        512, description="Maximum size of the on-disk cache before eviction"
+    )
 
 
 class ProxySettings(BaseModel):
@@ -58,12 +92,83 @@ class SearchSettings(BaseModel):
         default="us",
         description="Country code for search results (e.g., us, cn, uk)",
     )
+    strategy: str = Field(
+        default="sequential",
+        description="How to query engines: sequential (one after another) or race (several at once)",
+    )
+    race_engines: int = Field(
+        default=2,
+        description="Number of engines queried concurrently by the race strategy",
+    )
+    race_merge: bool = Field(
+        default=False,
+        description="Wait for every raced engine and merge their results, deduplicated by URL",
+    )
+    fetch_timeout: float = Field(
+        default=10.0,
+        description="Timeout in seconds for fetching a result page's content",
+    )
+    fetch_max_bytes: int = Field(
+        default=1024 * 1024,
+        description="Maximum number of bytes downloaded per result page",
+    )
+    fetch_max_connections: int = Field(
+        default=20,
+        description="Maximum concurrent connections used to fetch result pages",
+    )
+    fetch_max_per_host: int = Field(
+        default=4,
+        description="Maximum concurrent result page fetches per host",
+    )
+    cache: bool = Field(
+        default=False,
+        description="Cache search results and fetched page content on disk",
+    )
+    cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file of the search cache (None for workspace/.cache/web_search.sqlite)",
+    )
+    cache_results_ttl: float = Field(
+        default=3600,
+        description="Seconds cached search results for a query stay valid",
+    )
+    cache_page_ttl: float = Field(
+        default=24 * 3600,
+        description="Seconds cached page content is used before revalidating it with the server",
+    )
+    cache_max_size_mb: float = Field(
+        default=256,
+        description="Maximum size of the search cache before least recently used entries are evicted",
+    )
 
 
 class RunflowSettings(BaseModel):
     use_data_analysis_agent: bool = Field(
         default=False, description="Enable data analysis agent in run flow"
     )
+    max_parallel_steps: int = Field(
+        4, description="Maximum number of independent plan steps executed at once"
+    )
+    task_timeout: float = Field(
+        3600, description="Seconds a flow or batch task may run before it is cancelled"
+    )
+
+
+class CheckpointSettings(BaseModel):
+    enabled: bool = Field(
+        False, description="Record plan and agent progress to resume interrupted runs"
+    )
+    path: Optional[str] = Field(
+        None,
+        description="SQLite file of the checkpoints (None for workspace/.checkpoints/checkpoints.sqlite)",
+    )
+    flush_interval: float = Field(
+        2.0,
+        description="Maximum seconds checkpoint records are buffered before being written",
+    )
+    flush_records: int = Field(
+        64, description="Number of buffered checkpoint records that triggers a write"
+    )
 
 
 class BrowserSettings(BaseModel):
@@ -87,7 +192,45 @@ class BrowserSettings(BaseModel):
         None, description="Proxy settings for the browser"
     )
     max_content_length: int = Field(
-        2000, description="Maximum length for content retrieval operations"
+        2000,
+        description="Unused, content extraction is bounded by extract_chunk_tokens and extract_max_chunks",
+    )
+    extract_chunk_tokens: int = Field(
+        4000, description="Maximum tokens of page content per extraction request"
+    )
+    extract_max_chunks: int = Field(
+        8, description="Maximum chunks of a page extracted, later ones are skipped"
+    )
+    extract_concurrency: int = Field(
+        4, description="Page chunks extracted concurrently"
+    )
+    screenshot_full_page: bool = Field(
+        False, description="Capture the full page instead of only the viewport"
+    )
+    screenshot_max_width: int = Field(
+        1024, description="Maximum width of screenshots sent to the LLM"
+    )
+    screenshot_max_height: int = Field(
+        1024, description="Maximum height of screenshots sent to the LLM"
+    )
+    screenshot_quality: int = Field(70, description="JPEG quality of screenshots")
+    screenshot_dedup_threshold: Optional[int] = Field(
+        0,
+        description="Skip a screenshot whose 1024-bit perceptual hash differs from the previous one by at most this many bits (None to always send)",
+    )
+    max_images_in_memory: int = Field(
+        2, description="Screenshots kept in agent memory, older ones are dropped"
+    )
+    observation_mode: str = Field(
+        "diff",
+        description="Interactive elements in the browser prompt: full (every step) or diff (changes since the previous step on the same page)",
+    )
+    max_contexts: int = Field(
+        8, description="Maximum browser contexts leased from the shared browser at once"
+    )
+    context_idle_timeout: float = Field(
+        600.0,
+        description="Seconds after which an unused browser context is closed to free its slot",
     )
 
 
@@ -167,6 +310,9 @@ class AppConfig(BaseModel):
     run_flow_config: Optional[RunflowSettings] = Field(
         None, description="Run flow configuration"
     )
+    checkpoint_config: Optional[CheckpointSettings] = Field(
+        None, description="Checkpoint configuration"
+    )
 
     class Config:
         arbitrary_types_allowed = True
@@ -224,6 +370,20 @@ class Config:
             "temperature": base_llm.get("temperature", 1.0),
             "api_type": base_llm.get("api_type", ""),
             "api_version": base_llm.get("api_version", ""),
+            "http2": base_llm.get("http2", False),
+            "max_connections": base_llm.get("max_connections", 1000),
+            "max_keepalive_connections": base_llm.get("max_keepalive_connections", 100),
+            "keepalive_expiry": base_llm.get("keepalive_expiry", 30.0),
+            "stream_tool_calls": base_llm.get("stream_tool_calls", False),
+            "response_cache": base_llm.get("response_cache", "off"),
+            "response_cache_path": base_llm.get("response_cache_path"),
+            "response_cache_ttl": base_llm.get("response_cache_ttl", 7 * 24 * 3600),
+            "response_cache_memory_entries": base_llm.get(
+                "response_cache_memory_entries", 256
+            ),
+            "response_cache_max_size_mb": base_llm.get(
+                "response_cache_max_size_mb", 512
+            ),
         }
 
         # handle browser config.
@@ -283,6 +443,12 @@ class Config:
             run_flow_settings = RunflowSettings(**run_flow_config)
         else:
             run_flow_settings = RunflowSettings()
+
+        checkpoint_config = raw_config.get("checkpoint")
+        if checkpoint_config:
+            checkpoint_settings = CheckpointSettings(**checkpoint_config)
+        else:
+            checkpoint_settings = CheckpointSettings()
         config_dict = {
             "llm": {
                 "default": default_settings,
@@ -296,6 +462,7 @@ class Config:
             "search_config": search_settings,
             "mcp_config": mcp_settings,
             "run_flow_config": run_flow_settings,
+            "checkpoint_config": checkpoint_settings,
         }
 
         self._config = AppConfig(**config_dict)
@@ -326,6 +493,11 @@ class Config:
         """Get the Run Flow configuration"""
         return self._config.run_flow_config
 
+    @property
+    def checkpoint_config(self) -> CheckpointSettings:
+        """Get the checkpoint configuration"""
+        return self._config.checkpoint_config
+
     @property
     def workspace_root(self) -> Path:
         """Get the workspace root directory"""
@@ -11,3 +11,11 @@ class OpenManusError(Exception):
 
 class TokenLimitExceeded(OpenManusError):
     """Exception raised when the token limit is exceeded"""
+
+
+class LLMCacheMiss(OpenManusError):
+    """Exception raised when a replay-only response cache has no entry"""
+
+
+class ToolCallStreamInterrupted(OpenManusError):
+    """Exception raised when a tool call stream fails after calls were started"""
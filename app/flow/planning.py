@@ -1,16 +1,21 @@
+import asyncio
 import json
 import time
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic import Field
 
 from app.agent.base import BaseAgent
+from app.checkpoint import CheckpointStore
+from app.config import RunflowSettings, config
+from app.exceptions import ToolError
 from app.flow.base import BaseFlow
 from app.llm import LLM
 from app.logger import logger
-from app.schema import AgentState, Message, ToolChoice
+from app.schema import AgentState, Memory, Message, ToolChoice
 from app.tool import PlanningTool
+from app.tool.planning import Plan
 
 
 class PlanStepStatus(str, Enum):
@@ -50,6 +55,18 @@ class PlanningFlow(BaseFlow):
     executor_keys: List[str] = Field(default_factory=list)
     active_plan_id: str = Field(default_factory=lambda: f"plan_{int(time.time())}")
     current_step_index: Optional[int] = None
+    max_parallel_steps: int = Field(
+        default_factory=lambda: (
+            config.run_flow_config or RunflowSettings()
+        ).max_parallel_steps
+    )
+
+    # Agents running a step, and spare instances of busy executors
+    _busy_executors: set = set()
+    _spare_executors: Dict[int, List[BaseAgent]] = {}
+    _executor_origins: Dict[int, BaseAgent] = {}
+    _step_executors: Dict[int, BaseAgent] = {}
+    _checkpoint: Optional[CheckpointStore] = None
 
     def __init__(
         self, agents: Union[BaseAgent, List[BaseAgent], Dict[str, BaseAgent]], **data
@@ -91,14 +108,69 @@ class PlanningFlow(BaseFlow):
         # Fallback to primary agent
         return self.primary_agent
 
+    def _lease_executor(self, step_type: Optional[str] = None) -> BaseAgent:
+        """
+        Get an idle agent to execute a step.
+        Agents keep memory and state while running, so when the selected executor
+        is busy with another step, an instance of the same agent is used instead.
+        """
+        executor = self.get_executor(step_type)
+        if id(executor) not in self._busy_executors:
+            self._busy_executors.add(id(executor))
+            return executor
+
+        spares = self._spare_executors.setdefault(id(executor), [])
+        agent = spares.pop() if spares else self._copy_executor(executor)
+        self._executor_origins[id(agent)] = executor
+        return agent
+
+    def _release_executor(self, agent: BaseAgent) -> None:
+        """Return a leased agent, making it available for the next step."""
+        executor = self._executor_origins.pop(id(agent), None)
+        if executor is None:
+            self._busy_executors.discard(id(agent))
+            return
+        agent.memory = Memory()
+        agent.current_step = 0
+        agent.state = AgentState.IDLE
+        self._spare_executors[id(executor)].append(agent)
+
+    @staticmethod
+    def _copy_executor(executor: BaseAgent) -> BaseAgent:
+        """Create a fresh agent configured like the given one, with its own memory and tools."""
+        logger.info(f"Creating another {executor.name} agent to run steps in parallel")
+        fields = {
+            name: getattr(executor, name)
+            for name in executor.model_fields_set
+            if name not in ("memory", "state", "current_step")
+        }
+        return type(executor)(**fields)
+
     async def execute(self, input_text: str) -> str:
         """Execute the planning flow with agents."""
         try:
             if not self.primary_agent:
                 raise ValueError("No primary agent available")
 
+            self._checkpoint = CheckpointStore.for_config()
+            records = (
+                await asyncio.to_thread(self._checkpoint.load, self.checkpoint_run_id)
+                if self._checkpoint
+                else []
+            )
+            for kind, data in records:
+                if kind == "result":
+                    logger.info(f"Plan {self.active_plan_id} already finished")
+                    return data
+
+            result = ""
+            if records:
+                # Resume the plan, steps in progress when it stopped are run again
+                result = self._restore_checkpoint(records)
+                logger.info(f"Resuming plan {self.active_plan_id} from its checkpoint")
+
             # Create initial plan if input provided
-            if input_text:
+            elif input_text:
                 await self._create_initial_plan(input_text)
 
                 # Verify plan was created successfully
@@ -107,27 +179,69 @@ class PlanningFlow(BaseFlow):
                         f"Plan creation failed. Plan ID {self.active_plan_id} not found in planning tool."
                     )
                     return f"Failed to create plan for: {input_text}"
+                self._checkpoint_plan()
 
-            result = ""
-            while True:
-                # Get current step to execute
-                self.current_step_index, step_info = await self._get_current_step_info()
-
-                # Exit if no more steps or plan completed
-                if self.current_step_index is None:
-                    result += await self._finalize_plan()
-                    break
-
-                # Execute current step with appropriate agent
-                step_type = step_info.get("type") if step_info else None
-                executor = self.get_executor(step_type)
-                step_result = await self._execute_step(executor, step_info)
-                result += step_result + "\n"
-
-                # Check if agent wants to terminate
-                if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
-                    break
-
+            running: Dict[asyncio.Task, int] = {}
+            finished = False
+            try:
+                while True:
+                    # Start every step whose dependencies are completed, up to the limit
+                    if not finished:
+                        ready_steps = await self._get_ready_steps(set(running.values()))
+                        free_slots = max(self.max_parallel_steps, 1) - len(running)
+                        for step_index, step_info in ready_steps[:free_slots]:
+                            await self._set_step_status(
+                                step_index, PlanStepStatus.IN_PROGRESS
+                            )
+                            self.current_step_index = step_index
+                            executor = self._lease_executor(step_info.get("type"))
+                            task = asyncio.create_task(
+                                self._execute_step(executor, step_info, step_index)
+                            )
+                            running[task] = step_index
+                            self._step_executors[step_index] = executor
+
+                    # Exit if no more steps can run
+                    if not running:
+                        break
+
+                    done, _ = await asyncio.wait(
+                        running, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        step_index = running.pop(task)
+                        executor = self._step_executors.pop(step_index)
+                        result += task.result() + "\n"
+                        if self._checkpoint:
+                            self._checkpoint.record(
+                                self.checkpoint_run_id,
+                                "step_result",
+                                {"index": step_index, "result": task.result()},
+                            )
+
+                        # Check if agent wants to terminate, running steps are let finish
+                        if (
+                            hasattr(executor, "state")
+                            and executor.state == AgentState.FINISHED
+                        ):
+                            finished = True
+                        self._release_executor(executor)
+            finally:
+                for task in running:
+                    task.cancel()
+                for executor in self._step_executors.values():
+                    self._release_executor(executor)
+                self._step_executors.clear()
+                if self._checkpoint:
+                    await asyncio.to_thread(self._checkpoint.flush)
+
+            if not finished:
+                await self._block_unreachable_steps()
+                result += await self._finalize_plan()
+
+            if self._checkpoint:
+                self._checkpoint.record(self.checkpoint_run_id, "result", result)
+                await asyncio.to_thread(self._checkpoint.flush)
             return result
         except Exception as e:
             logger.error(f"Error in PlanningFlow: {str(e)}")
@@ -140,7 +254,9 @@ class PlanningFlow(BaseFlow):
         system_message_content = (
             "You are a planning assistant. Create a concise, actionable plan with clear steps. "
             "Focus on key milestones rather than detailed sub-steps. "
-            "Optimize for clarity and efficiency."
+            "Optimize for clarity and efficiency. "
+            "Steps that do not need each other's results can run in parallel: "
+            "list for each step the indices of the steps it depends on in `dependencies`."
         )
         agents_description = []
         for key in self.executor_keys:
@@ -200,85 +316,52 @@ class PlanningFlow(BaseFlow):
         # If execution reached here, create a default plan
         logger.warning("Creating default plan")
 
-        # Create default plan using the ToolCollection
-        await self.planning_tool.execute(
-            **{
-                "command": "create",
-                "plan_id": self.active_plan_id,
-                "title": f"Plan for: {request[:50]}{'...' if len(request) > 50 else ''}",
-                "steps": ["Analyze request", "Execute task", "Verify results"],
-            }
+        self.planning_tool.create_plan(
+            plan_id=self.active_plan_id,
+            title=f"Plan for: {request[:50]}{'...' if len(request) > 50 else ''}",
+            steps=["Analyze request", "Execute task", "Verify results"],
         )
 
-    async def _get_current_step_info(self) -> tuple[Optional[int], Optional[dict]]:
-        """
-        Parse the current plan to identify the first non-completed step's index and info.
-        Returns (None, None) if no active step is found.
-        """
-        if (
-            not self.active_plan_id
-            or self.active_plan_id not in self.planning_tool.plans
-        ):
-            logger.error(f"Plan with ID {self.active_plan_id} not found")
-            return None, None
-
+    def _get_plan(self) -> Optional[Plan]:
+        """Get the active plan from the planning tool, None if it does not exist."""
         try:
-            # Direct access to plan data from planning tool storage
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
-
-            # Find first non-completed step
-            for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
-
-                if status in PlanStepStatus.get_active_statuses():
-                    # Extract step type/category if available
-                    step_info = {"text": step}
-
-                    # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
-                    import re
-
-                    type_match = re.search(r"\[([A-Z_]+)\]", step)
-                    if type_match:
-                        step_info["type"] = type_match.group(1).lower()
-
-                    # Mark current step as in_progress
-                    try:
-                        await self.planning_tool.execute(
-                            command="mark_step",
-                            plan_id=self.active_plan_id,
-                            step_index=i,
-                            step_status=PlanStepStatus.IN_PROGRESS.value,
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error marking step as in_progress: {e}")
-                        # Update step status directly if needed
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
-
-                        plan_data["step_statuses"] = step_statuses
-
-                    return i, step_info
-
-            return None, None  # No active step found
+            return self.planning_tool.get_plan(self.active_plan_id)
+        except ToolError as e:
+            logger.error(f"Error getting plan: {e}")
+            return None
 
-        except Exception as e:
-            logger.warning(f"Error finding current step index: {e}")
-            return None, None
+    async def _get_ready_steps(
+        self, running: Optional[set] = None
+    ) -> List[tuple[int, dict]]:
+        """
+        Get the active steps whose dependencies are all completed, in plan order.
+        Steps in `running` are skipped. Returns an empty list if the plan is not found.
+        """
+        plan = self._get_plan()
+        if plan is None:
+            return []
+
+        ready_steps = []
+        for i in plan.ready_steps():
+            if running and i in running:
+                continue
+            step_info = {"text": plan.steps[i]}
+            step_type = plan.step_type(i)
+            if step_type:
+                step_info["type"] = step_type
+            ready_steps.append((i, step_info))
+        return ready_steps
+
+    async def _execute_step(
+        self, executor: BaseAgent, step_info: dict, step_index: Optional[int] = None
+    ) -> str:
+        """Execute a step with the specified agent using agent.run()."""
+        if step_index is None:
+            step_index = self.current_step_index
 
-    async def _execute_step(self, executor: BaseAgent, step_info: dict) -> str:
-        """Execute the current step with the specified agent using agent.run()."""
         # Prepare context for the agent with current plan status
         plan_status = await self._get_plan_text()
-        step_text = step_info.get("text", f"Step {self.current_step_index}")
+        step_text = step_info.get("text", f"Step {step_index}")
 
         # Create a prompt for the agent to execute the current step
         step_prompt = f"""
@@ -286,122 +369,107 @@ class PlanningFlow(BaseFlow):
         {plan_status}
 
         YOUR CURRENT TASK:
-        You are now working on step {self.current_step_index}: "{step_text}"
+        You are now working on step {step_index}: "{step_text}"
 
-        Please only execute this current step using the appropriate tools. When you're done, provide a summary of what you accomplished.
+        Please only execute this current step using the appropriate tools, other steps in progress are handled by other agents. When you're done, provide a summary of what you accomplished.
         """
 
-        # Use agent.run() to execute the step
+        # Use agent.run() to execute the step, resuming it if it was interrupted
+        if self._checkpoint:
+            executor.checkpoint_id = f"{self.active_plan_id}/step_{step_index}"
         try:
             step_result = await executor.run(step_prompt)
 
             # Mark the step as completed after successful execution
-            await self._mark_step_completed()
+            await self._mark_step_completed(step_index)
 
             return step_result
         except Exception as e:
-            logger.error(f"Error executing step {self.current_step_index}: {e}")
-            return f"Error executing step {self.current_step_index}: {str(e)}"
-
-    async def _mark_step_completed(self) -> None:
-        """Mark the current step as completed."""
-        if self.current_step_index is None:
+            logger.error(f"Error executing step {step_index}: {e}")
+            await self._set_step_status(
+                step_index, PlanStepStatus.BLOCKED, f"Failed: {str(e)}"
+            )
+            return f"Error executing step {step_index}: {str(e)}"
+        finally:
+            executor.checkpoint_id = None
+
+    async def _mark_step_completed(self, step_index: Optional[int] = None) -> None:
+        """Mark a step as completed, the current step by default."""
+        if step_index is None:
+            step_index = self.current_step_index
+        if step_index is None:
             return
 
+        await self._set_step_status(step_index, PlanStepStatus.COMPLETED)
+        logger.info(
+            f"Marked step {step_index} as completed in plan {self.active_plan_id}"
+        )
+
+    async def _set_step_status(
+        self, step_index: int, status: PlanStepStatus, notes: Optional[str] = None
+    ) -> None:
+        """Update the status and optionally the notes of a step."""
         try:
-            # Mark the step as completed
-            await self.planning_tool.execute(
-                command="mark_step",
-                plan_id=self.active_plan_id,
-                step_index=self.current_step_index,
-                step_status=PlanStepStatus.COMPLETED.value,
-            )
-            logger.info(
-                f"Marked step {self.current_step_index} as completed in plan {self.active_plan_id}"
+            self.planning_tool.mark_step(
+                self.active_plan_id, step_index, status.value, notes
             )
-        except Exception as e:
+        except ToolError as e:
             logger.warning(f"Failed to update plan status: {e}")
-            # Update step status directly in planning tool storage
-            if self.active_plan_id in self.planning_tool.plans:
-                plan_data = self.planning_tool.plans[self.active_plan_id]
-                step_statuses = plan_data.get("step_statuses", [])
-
-                # Ensure the step_statuses list is long enough
-                while len(step_statuses) <= self.current_step_index:
-                    step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-
-                # Update the status
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
-                plan_data["step_statuses"] = step_statuses
-
-    async def _get_plan_text(self) -> str:
-        """Get the current plan as formatted text."""
-        try:
-            result = await self.planning_tool.execute(
-                command="get", plan_id=self.active_plan_id
+            return
+        self._checkpoint_plan()
+
+    @property
+    def checkpoint_run_id(self) -> str:
+        """ID of the plan's records in the checkpoint store"""
+        return f"flow:{self.active_plan_id}"
+
+    def _checkpoint_plan(self) -> None:
+        """Record the current plan, replacing its previous snapshot."""
+        plan = self._get_plan()
+        if self._checkpoint and plan is not None:
+            self._checkpoint.record(
+                self.checkpoint_run_id, "plan", plan.model_dump(), replace=True
             )
-            return result.output if hasattr(result, "output") else str(result)
-        except Exception as e:
-            logger.error(f"Error getting plan: {e}")
-            return self._generate_plan_text_from_storage()
 
-    def _generate_plan_text_from_storage(self) -> str:
-        """Generate plan text directly from storage if the planning tool fails."""
-        try:
-            if self.active_plan_id not in self.planning_tool.plans:
-                return f"Error: Plan with ID {self.active_plan_id} not found"
-
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            title = plan_data.get("title", "Untitled Plan")
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
-            step_notes = plan_data.get("step_notes", [])
-
-            # Ensure step_statuses and step_notes match the number of steps
-            while len(step_statuses) < len(steps):
-                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-            while len(step_notes) < len(steps):
-                step_notes.append("")
-
-            # Count steps by status
-            status_counts = {status: 0 for status in PlanStepStatus.get_all_statuses()}
-
-            for status in step_statuses:
-                if status in status_counts:
-                    status_counts[status] += 1
-
-            completed = status_counts[PlanStepStatus.COMPLETED.value]
-            total = len(steps)
-            progress = (completed / total) * 100 if total > 0 else 0
-
-            plan_text = f"Plan: {title} (ID: {self.active_plan_id})\n"
-            plan_text += "=" * len(plan_text) + "\n\n"
+    def _restore_checkpoint(self, records: List[Tuple[str, Any]]) -> str:
+        """Restore the recorded plan, returning the results of its finished steps."""
+        result = ""
+        for kind, data in records:
+            if kind == "plan":
+                self.planning_tool.add_plan(Plan(**data))
+            elif kind == "step_result":
+                result += data["result"] + "\n"
+        return result
+
+    async def _block_unreachable_steps(self) -> None:
+        """Mark steps that wait for a blocked step as blocked too."""
+        plan = self._get_plan()
+        if plan is None:
+            return
 
-            plan_text += (
-                f"Progress: {completed}/{total} steps completed ({progress:.1f}%)\n"
-            )
-            plan_text += f"Status: {status_counts[PlanStepStatus.COMPLETED.value]} completed, {status_counts[PlanStepStatus.IN_PROGRESS.value]} in progress, "
-            plan_text += f"{status_counts[PlanStepStatus.BLOCKED.value]} blocked, {status_counts[PlanStepStatus.NOT_STARTED.value]} not started\n\n"
-            plan_text += "Steps:\n"
-
-            status_marks = PlanStepStatus.get_status_marks()
-
-            for i, (step, status, notes) in enumerate(
-                zip(steps, step_statuses, step_notes)
-            ):
-                # Use status marks to indicate step status
-                status_mark = status_marks.get(
-                    status, status_marks[PlanStepStatus.NOT_STARTED.value]
+        dependencies = plan.dependencies
+        # Dependencies always point to earlier steps, so one pass in order is enough
+        for i, status in enumerate(plan.step_statuses):
+            if status not in PlanStepStatus.get_active_statuses():
+                continue
+            blocked_by = [
+                j
+                for j in dependencies[i]
+                if plan.step_statuses[j] == PlanStepStatus.BLOCKED.value
+            ]
+            if blocked_by:
+                await self._set_step_status(
+                    i,
+                    PlanStepStatus.BLOCKED,
+                    f"Blocked by step {', '.join(map(str, blocked_by))}",
                 )
 
-                plan_text += f"{i}. {status_mark} {step}\n"
-                if notes:
-                    plan_text += f"   Notes: {notes}\n"
-
-            return plan_text
-        except Exception as e:
-            logger.error(f"Error generating plan text from storage: {e}")
-            return f"Error: Unable to retrieve plan with ID {self.active_plan_id}"
+    async def _get_plan_text(self) -> str:
+        """Get the current plan as formatted text."""
+        plan = self._get_plan()
+        if plan is None:
+            return f"Error: Plan with ID {self.active_plan_id} not found"
+        return plan.format()
 
     async def _finalize_plan(self) -> str:
         """Finalize the plan and provide a summary using the flow's LLM directly."""
@@ -1,26 +1,49 @@
+import asyncio
+import base64
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
 import math
-from typing import Dict, List, Optional, Union
-
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import httpx
 import tiktoken
 from openai import (
     APIError,
     AsyncAzureOpenAI,
     AsyncOpenAI,
     AuthenticationError,
+    DefaultAsyncHttpxClient,
     OpenAIError,
     RateLimitError,
 )
-from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionMessage,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
+from PIL import Image
 from tenacity import (
     retry,
     retry_if_exception_type,
+    retry_if_not_exception_type,
     stop_after_attempt,
     wait_random_exponential,
 )
 
 from app.bedrock import BedrockClient
 from app.config import LLMSettings, config
-from app.exceptions import TokenLimitExceeded
+from app.exceptions import LLMCacheMiss, TokenLimitExceeded, ToolCallStreamInterrupted
 from app.logger import logger  # Assuming a logger is set up in your app
 from app.schema import (
     ROLE_VALUES,
@@ -42,6 +65,41 @@ MULTIMODAL_MODELS = [
 ]
 
 
+class TokenUsage:
+    """Tokens used by the LLM requests made within `track_token_usage`"""
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.completion_tokens = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "input": self.input_tokens,
+            "completion": self.completion_tokens,
+            "total": self.input_tokens + self.completion_tokens,
+        }
+
+
+_token_usage: ContextVar[Optional[TokenUsage]] = ContextVar("token_usage", default=None)
+
+
+@contextmanager
+def track_token_usage() -> Iterator[TokenUsage]:
+    """Count the tokens of the LLM requests made in this context.
+
+    LLM instances are shared, so their totals mix every task of the process.
+    Within this context, including tasks started from it, requests are also
+    counted in the yielded TokenUsage, and max_input_tokens applies to it
+    instead of the process-wide total.
+    """
+    usage = TokenUsage()
+    token = _token_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _token_usage.reset(token)
+
+
 class TokenCounter:
     # Token constants
     BASE_MESSAGE_TOKENS = 4
@@ -54,8 +112,14 @@ class TokenCounter:
     HIGH_DETAIL_TARGET_SHORT_SIDE = 768
     TILE_SIZE = 512
 
+    # Upper bound on memoized tool schema strings
+    MAX_TEXT_CACHE_SIZE = 256
+
     def __init__(self, tokenizer):
         self.tokenizer = tokenizer
+        # Identifies the tokenizer in per-message token caches
+        self.cache_key = getattr(tokenizer, "name", None) or id(tokenizer)
+        self._text_cache: Dict[str, int] = {}
 
     def count_text(self, text: str) -> int:
         """Calculate tokens for a text string"""
@@ -87,11 +151,30 @@ class TokenCounter:
             if "dimensions" in image_item:
                 width, height = image_item["dimensions"]
                 return self._calculate_high_detail_tokens(width, height)
+            # Otherwise read them from the header of an inline image
+            image_url = image_item.get("image_url")
+            if isinstance(image_url, dict):
+                dimensions = self._data_url_dimensions(image_url.get("url", ""))
+                if dimensions:
+                    return self._calculate_high_detail_tokens(*dimensions)
 
         return (
             self._calculate_high_detail_tokens(1024, 1024) if detail == "high" else 1024
         )
 
+    @staticmethod
+    def _data_url_dimensions(url: str) -> Optional[Tuple[int, int]]:
+        """Read the dimensions of a base64 data URL image from its header"""
+        if not url.startswith("data:") or "," not in url:
+            return None
+        try:
+            # The header is at the start, so only decode the first bytes
+            head = base64.b64decode(url.split(",", 1)[1][:65536])
+            with Image.open(io.BytesIO(head)) as image:
+                return image.size
+        except Exception:
+            return None
+
     def _calculate_high_detail_tokens(self, width: int, height: int) -> int:
         """Calculate tokens for high detail images based on dimensions"""
         # Step 1: Scale to fit in MAX_SIZE x MAX_SIZE square
@@ -144,31 +227,322 @@ class TokenCounter:
                 token_count += self.count_text(function.get("arguments", ""))
         return token_count
 
-    def count_message_tokens(self, messages: List[dict]) -> int:
+    def count_text_cached(self, text: str) -> int:
+        """Calculate tokens for a text string that is expected to repeat, e.g. tool schemas"""
+        tokens = self._text_cache.get(text)
+        if tokens is None:
+            if len(self._text_cache) >= self.MAX_TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            tokens = self._text_cache[text] = self.count_text(text)
+        return tokens
+
+    def count_formatted_message(self, message: dict) -> int:
+        """Calculate tokens for a single message already in OpenAI format"""
+        tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+
+        # Add role tokens
+        tokens += self.count_text(message.get("role", ""))
+
+        # Add content tokens
+        if "content" in message:
+            tokens += self.count_content(message["content"])
+
+        # Add tool calls tokens
+        if "tool_calls" in message:
+            tokens += self.count_tool_calls(message["tool_calls"])
+
+        # Add name and tool_call_id tokens
+        tokens += self.count_text(message.get("name", ""))
+        tokens += self.count_text(message.get("tool_call_id", ""))
+
+        return tokens
+
+    def count_message(
+        self, message: Union[dict, Message], supports_images: bool = False
+    ) -> int:
+        """Calculate tokens for a single message.
+
+        Message objects memoize their count keyed by content hash, so each
+        message is tokenized once no matter how many requests include it.
+        Messages the formatter would drop count as zero.
+        """
+        if isinstance(message, Message):
+            key = (self.cache_key, supports_images)
+            tokens = message.get_cached_tokens(key)
+            if tokens is None:
+                formatted = LLM.format_messages([message], supports_images)
+                tokens = sum(self.count_formatted_message(m) for m in formatted)
+                message.set_cached_tokens(key, tokens)
+            return tokens
+
+        formatted = LLM.format_messages([dict(message)], supports_images)
+        return sum(self.count_formatted_message(m) for m in formatted)
+
+    def count_message_tokens(
+        self, messages: List[Union[dict, Message]], supports_images: bool = False
+    ) -> int:
         """Calculate the total number of tokens in a message list"""
         total_tokens = self.FORMAT_TOKENS  # Base format tokens
 
         for message in messages:
-            tokens = self.BASE_MESSAGE_TOKENS  # Base tokens per message
+            total_tokens += self.count_message(message, supports_images)
 
-            # Add role tokens
-            tokens += self.count_text(message.get("role", ""))
+        return total_tokens
 
-            # Add content tokens
-            if "content" in message:
-                tokens += self.count_content(message["content"])
 
-            # Add tool calls tokens
-            if "tool_calls" in message:
-                tokens += self.count_tool_calls(message["tool_calls"])
+class LLMClientPool:
+    """Process-wide pool of HTTP transports shared by all LLM instances.
+
+    Keeps one keep-alive `httpx.AsyncClient` per API base URL so that LLM
+    singletons for different config names, and every agent, tool and flow
+    using them, reuse the same connections instead of paying a TLS handshake
+    per client. Settings of the first LLM to reach a base URL win.
+    """
+
+    _clients: Dict[str, httpx.AsyncClient] = {}
+    _stats: Dict[str, Dict[str, int]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, llm_config: LLMSettings) -> httpx.AsyncClient:
+        """Get or create the shared HTTP client for the config's base URL"""
+        key = llm_config.base_url
+        with cls._lock:
+            client = cls._clients.get(key)
+            if client is None or client.is_closed:
+                client = cls._create_client(key, llm_config)
+                cls._clients[key] = client
+            return client
+
+    @classmethod
+    def _create_client(cls, key: str, llm_config: LLMSettings) -> httpx.AsyncClient:
+        http2 = llm_config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "HTTP/2 requested but the h2 package is not installed, using HTTP/1.1"
+            )
+            http2 = False
 
-            # Add name and tool_call_id tokens
-            tokens += self.count_text(message.get("name", ""))
-            tokens += self.count_text(message.get("tool_call_id", ""))
+        stats = cls._stats.setdefault(
+            key, {"clients_created": 0, "requests": 0, "responses": 0}
+        )
+        stats["clients_created"] += 1
+
+        async def on_request(request: httpx.Request) -> None:
+            stats["requests"] += 1
+
+        async def on_response(response: httpx.Response) -> None:
+            stats["responses"] += 1
+
+        return DefaultAsyncHttpxClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=llm_config.max_connections,
+                max_keepalive_connections=llm_config.max_keepalive_connections,
+                keepalive_expiry=llm_config.keepalive_expiry,
+            ),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
 
-            total_tokens += tokens
+    @classmethod
+    def get_stats(cls) -> Dict[str, Dict[str, int]]:
+        """Get per base URL request counters and current connection usage"""
+        stats = {}
+        for key, counters in cls._stats.items():
+            entry = dict(counters)
+            client = cls._clients.get(key)
+            # httpx does not expose pool state publicly, read it if available
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = getattr(pool, "connections", None)
+            if connections is not None:
+                entry["connections"] = len(connections)
+                entry["idle_connections"] = sum(
+                    1 for conn in connections if conn.is_idle()
+                )
+            stats[key] = entry
+        return stats
 
-        return total_tokens
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close all shared clients"""
+        with cls._lock:
+            clients = list(cls._clients.values())
+            cls._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+class LLMResponseCache:
+    """Content-addressed cache of LLM responses.
+
+    Responses are kept in an in-memory LRU in front of a SQLite file, so they
+    survive restarts and are shared between processes. Entries expire after
+    a TTL, and the least recently used ones are evicted once the file grows
+    beyond its size limit. Caches are shared by every LLM using the same file.
+    Reads only note access times, which are written with the next response
+    stored, so a lookup commits nothing. The methods block on the database,
+    async code calls them in a worker thread.
+    """
+
+    MODES = ("off", "on", "replay")
+
+    _instances: Dict[str, "LLMResponseCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: Optional[float] = None,
+        memory_entries: int = 256,
+        max_size_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_size_bytes = max_size_bytes
+        # key -> (created_at, value)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # key -> access time not yet written
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    @classmethod
+    def for_config(cls, llm_config: LLMSettings) -> Optional["LLMResponseCache"]:
+        """Get the cache configured for an LLM, or None if caching is off"""
+        mode = llm_config.response_cache
+        if mode not in cls.MODES:
+            raise ValueError(
+                f"Invalid response_cache mode: {mode}, expected one of {cls.MODES}"
+            )
+        if mode == "off":
+            return None
+
+        path = Path(
+            llm_config.response_cache_path
+            or config.workspace_root / ".cache" / "llm_responses.sqlite"
+        ).resolve()
+        with cls._instances_lock:
+            cache = cls._instances.get(str(path))
+            if cache is None:
+                cache = cls._instances[str(path)] = cls(
+                    path,
+                    ttl=llm_config.response_cache_ttl,
+                    memory_entries=llm_config.response_cache_memory_entries,
+                    max_size_bytes=int(
+                        llm_config.response_cache_max_size_mb * 1024 * 1024
+                    ),
+                )
+            return cache
+
+    @staticmethod
+    def make_key(kind: str, params: dict) -> str:
+        """Hash the parts of a request that determine its response"""
+        request = {
+            "kind": kind,
+            **{
+                name: params.get(name)
+                for name in (
+                    "model",
+                    "messages",
+                    "tools",
+                    "tool_choice",
+                    "temperature",
+                    "max_tokens",
+                    "max_completion_tokens",
+                )
+            },
+        }
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _remember(self, key: str, created_at: float, value: dict) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Get a cached response, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and not self._expired(entry[0], now):
+                self._memory.move_to_end(key)
+                self._touched[key] = now
+                return entry[1]
+            self._memory.pop(key, None)
+
+            row = self._db.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at, now):
+                self._touched.pop(key, None)
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._touched[key] = now
+            value = json.loads(value)
+            self._remember(key, created_at, value)
+            return value
+
+    def put(self, key: str, value: dict) -> None:
+        """Store a response, evicting expired and least recently used entries"""
+        now = time.time()
+        data = json.dumps(value)
+        with self._lock:
+            self._remember(key, now, value)
+            self._touched.pop(key, None)
+            # Write pending access times first, they decide what is evicted
+            self._db.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [
+                    (accessed_at, touched)
+                    for touched, accessed_at in self._touched.items()
+                ],
+            )
+            self._touched.clear()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            if self.ttl is not None:
+                self._db.execute(
+                    "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+                )
+            # Drop the least recently used entries beyond the size limit
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(size) OVER "
+                "(ORDER BY accessed_at DESC, key) AS total FROM responses) "
+                "WHERE total > ?)",
+                (self.max_size_bytes,),
+            )
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
 
 
 class LLM:
@@ -196,6 +570,9 @@ class LLM:
             self.api_key = llm_config.api_key
             self.api_version = llm_config.api_version
             self.base_url = llm_config.base_url
+            self.stream_tool_calls = llm_config.stream_tool_calls
+            # Latencies in seconds of the last streamed tool request
+            self.stream_latency: Dict[str, Optional[float]] = {}
 
             # Add token counting related attributes
             self.total_input_tokens = 0
@@ -218,38 +595,118 @@ class LLM:
                     base_url=self.base_url,
                     api_key=self.api_key,
                     api_version=self.api_version,
+                    http_client=LLMClientPool.get_client(llm_config),
                 )
             elif self.api_type == "aws":
                 self.client = BedrockClient()
             else:
-                self.client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+                self.client = AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    http_client=LLMClientPool.get_client(llm_config),
+                )
 
             self.token_counter = TokenCounter(self.tokenizer)
 
+            # Response cache, counted separately from tokens actually spent
+            self.cache_mode = llm_config.response_cache
+            self.response_cache = LLMResponseCache.for_config(llm_config)
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.cache_saved_input_tokens = 0
+            self.cache_saved_completion_tokens = 0
+
+    @staticmethod
+    def get_pool_stats() -> Dict[str, Dict[str, int]]:
+        """Get statistics of the HTTP connection pools shared by all LLMs"""
+        return LLMClientPool.get_stats()
+
+    def get_cache_stats(self) -> Dict[str, Union[int, float]]:
+        """Get response cache counters of this LLM"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "saved_input_tokens": self.cache_saved_input_tokens,
+            "saved_completion_tokens": self.cache_saved_completion_tokens,
+        }
+
+    async def _get_cached_response(self, key: Optional[str]) -> Optional[dict]:
+        """Look up a cached response, failing on a miss in replay mode"""
+        if key is None:
+            return None
+        entry = await asyncio.to_thread(self.response_cache.get, key)
+        if entry is None:
+            self.cache_misses += 1
+            if self.cache_mode == "replay":
+                raise LLMCacheMiss(f"No cached response for request {key[:12]}")
+            return None
+
+        self.cache_hits += 1
+        self.cache_saved_input_tokens += entry["input_tokens"]
+        self.cache_saved_completion_tokens += entry["completion_tokens"]
+        logger.info(
+            f"Response cache hit: Saved Input={entry['input_tokens']}, "
+            f"Completion={entry['completion_tokens']}, "
+            f"Cumulative Saved Input={self.cache_saved_input_tokens}, "
+            f"Cumulative Saved Completion={self.cache_saved_completion_tokens}"
+        )
+        return entry
+
+    async def _cache_response(
+        self, key: Optional[str], input_tokens: int, completion_tokens: int, **value
+    ) -> None:
+        if key is None or self.cache_mode != "on":
+            return
+        await asyncio.to_thread(
+            self.response_cache.put,
+            key,
+            {
+                "input_tokens": input_tokens,
+                "completion_tokens": completion_tokens,
+                **value,
+            },
+        )
+
     def count_tokens(self, text: str) -> int:
         """Calculate the number of tokens in a text"""
         if not text:
             return 0
         return len(self.tokenizer.encode(text))
 
-    def count_message_tokens(self, messages: List[dict]) -> int:
-        return self.token_counter.count_message_tokens(messages)
+    def count_message_tokens(
+        self, messages: List[Union[dict, Message]], supports_images: bool = False
+    ) -> int:
+        return self.token_counter.count_message_tokens(messages, supports_images)
 
     def update_token_count(self, input_tokens: int, completion_tokens: int = 0) -> None:
         """Update token counts"""
-        # Only track tokens if max_input_tokens is set
-        self.total_input_tokens += input_tokens
-        self.total_completion_tokens += completion_tokens
+        self._add_token_usage(input_tokens, completion_tokens)
         logger.info(
             f"Token usage: Input={input_tokens}, Completion={completion_tokens}, "
             f"Cumulative Input={self.total_input_tokens}, Cumulative Completion={self.total_completion_tokens}, "
             f"Total={input_tokens + completion_tokens}, Cumulative Total={self.total_input_tokens + self.total_completion_tokens}"
         )
 
+    def _add_token_usage(self, input_tokens: int, completion_tokens: int = 0) -> None:
+        self.total_input_tokens += input_tokens
+        self.total_completion_tokens += completion_tokens
+        usage = _token_usage.get()
+        if usage is not None:
+            usage.input_tokens += input_tokens
+            usage.completion_tokens += completion_tokens
+
+    @property
+    def used_input_tokens(self) -> int:
+        """Input tokens counted against max_input_tokens, see track_token_usage"""
+        usage = _token_usage.get()
+        return self.total_input_tokens if usage is None else usage.input_tokens
+
     def check_token_limit(self, input_tokens: int) -> bool:
         """Check if token limits are exceeded"""
         if self.max_input_tokens is not None:
-            return (self.total_input_tokens + input_tokens) <= self.max_input_tokens
+            return (self.used_input_tokens + input_tokens) <= self.max_input_tokens
         # If max_input_tokens is not set, always return True
         return True
 
@@ -257,9 +714,9 @@ class LLM:
         """Generate error message for token limit exceeded"""
         if (
             self.max_input_tokens is not None
-            and (self.total_input_tokens + input_tokens) > self.max_input_tokens
+            and (self.used_input_tokens + input_tokens) > self.max_input_tokens
         ):
-            return f"Request may exceed input token limit (Current: {self.total_input_tokens}, Needed: {input_tokens}, Max: {self.max_input_tokens})"
+            return f"Request may exceed input token limit (Current: {self.used_input_tokens}, Needed: {input_tokens}, Max: {self.max_input_tokens})"
 
         return "Token limit exceeded"
 
@@ -356,7 +813,8 @@ class LLM:
         stop=stop_after_attempt(6),
         retry=retry_if_exception_type(
             (OpenAIError, Exception, ValueError)
-        ),  # Don't retry TokenLimitExceeded
+        )  # Don't retry TokenLimitExceeded
+        & retry_if_not_exception_type(LLMCacheMiss),
     )
     async def ask(
         self,
@@ -387,6 +845,11 @@ class LLM:
             # Check if the model supports images
             supports_images = self.model in MULTIMODAL_MODELS
 
+            # Calculate input token count, reusing per-message cached counts
+            input_tokens = self.count_message_tokens(
+                (system_msgs or []) + list(messages), supports_images
+            )
+
             # Format system and user messages with image support check
             if system_msgs:
                 system_msgs = self.format_messages(system_msgs, supports_images)
@@ -394,9 +857,6 @@ class LLM:
             else:
                 messages = self.format_messages(messages, supports_images)
 
-            # Calculate input token count
-            input_tokens = self.count_message_tokens(messages)
-
             # Check if token limits are exceeded
             if not self.check_token_limit(input_tokens):
                 error_message = self.get_limit_error_message(input_tokens)
@@ -416,6 +876,15 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
+            cache_key = (
+                LLMResponseCache.make_key("ask", params)
+                if self.response_cache
+                else None
+            )
+            cached = await self._get_cached_response(cache_key)
+            if cached:
+                return cached["content"]
+
             if not stream:
                 # Non-streaming request
                 response = await self.client.chat.completions.create(
@@ -429,6 +898,12 @@ class LLM:
                 self.update_token_count(
                     response.usage.prompt_tokens, response.usage.completion_tokens
                 )
+                await self._cache_response(
+                    cache_key,
+                    response.usage.prompt_tokens,
+                    response.usage.completion_tokens,
+                    content=response.choices[0].message.content,
+                )
 
                 return response.choices[0].message.content
 
@@ -455,12 +930,15 @@ class LLM:
             logger.info(
                 f"Estimated completion tokens for streaming response: {completion_tokens}"
             )
-            self.total_completion_tokens += completion_tokens
+            self._add_token_usage(0, completion_tokens)
+            await self._cache_response(
+                cache_key, input_tokens, completion_tokens, content=full_response
+            )
 
             return full_response
 
-        except TokenLimitExceeded:
-            # Re-raise token limit errors without logging
+        except (TokenLimitExceeded, LLMCacheMiss):
+            # Re-raise token limit errors and replay misses without logging
             raise
         except ValueError:
             logger.exception(f"Validation error")
@@ -639,7 +1117,9 @@ class LLM:
         stop=stop_after_attempt(6),
         retry=retry_if_exception_type(
             (OpenAIError, Exception, ValueError)
-        ),  # Don't retry TokenLimitExceeded
+        )  # Don't retry TokenLimitExceeded
+        # Tool calls started from a failed stream must not be run again
+        & retry_if_not_exception_type((LLMCacheMiss, ToolCallStreamInterrupted)),
     )
     async def ask_tool(
         self,
@@ -649,6 +1129,7 @@ class LLM:
         tools: Optional[List[dict]] = None,
         tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
         temperature: Optional[float] = None,
+        on_tool_call: Optional[Callable[[ChatCompletionMessageToolCall], Any]] = None,
         **kwargs,
     ) -> ChatCompletionMessage | None:
         """
@@ -661,6 +1142,8 @@ class LLM:
             tools: List of tools to use
             tool_choice: Tool choice strategy
             temperature: Sampling temperature for the response
+            on_tool_call: Optional callback (sync or async) receiving each tool
+                call as soon as it is complete, when stream_tool_calls is enabled
             **kwargs: Additional completion arguments
 
         Returns:
@@ -680,6 +1163,11 @@ class LLM:
             # Check if the model supports images
             supports_images = self.model in MULTIMODAL_MODELS
 
+            # Calculate input token count, reusing per-message cached counts
+            input_tokens = self.count_message_tokens(
+                (system_msgs or []) + list(messages), supports_images
+            )
+
             # Format messages
             if system_msgs:
                 system_msgs = self.format_messages(system_msgs, supports_images)
@@ -687,14 +1175,11 @@ class LLM:
             else:
                 messages = self.format_messages(messages, supports_images)
 
-            # Calculate input token count
-            input_tokens = self.count_message_tokens(messages)
-
             # If there are tools, calculate token count for tool descriptions
             tools_tokens = 0
             if tools:
                 for tool in tools:
-                    tools_tokens += self.count_tokens(str(tool))
+                    tools_tokens += self.token_counter.count_text_cached(str(tool))
 
             input_tokens += tools_tokens
 
@@ -728,7 +1213,29 @@ class LLM:
                     temperature if temperature is not None else self.temperature
                 )
 
-            params["stream"] = False  # Always use non-streaming for tool requests
+            cache_key = (
+                LLMResponseCache.make_key("ask_tool", params)
+                if self.response_cache
+                else None
+            )
+            cached = await self._get_cached_response(cache_key)
+            if cached:
+                return ChatCompletionMessage.model_validate(cached["message"])
+
+            # Bedrock streaming returns a complete response, so only stream OpenAI APIs
+            if self.stream_tool_calls and self.api_type != "aws":
+                message = await self._stream_tool_response(
+                    params, input_tokens, on_tool_call
+                )
+                await self._cache_response(
+                    cache_key,
+                    input_tokens,
+                    self._estimate_completion_tokens(message),
+                    message=message.model_dump(),
+                )
+                return message
+
+            params["stream"] = False
             response: ChatCompletion = await self.client.chat.completions.create(
                 **params
             )
@@ -743,11 +1250,18 @@ class LLM:
             self.update_token_count(
                 response.usage.prompt_tokens, response.usage.completion_tokens
             )
+            await self._cache_response(
+                cache_key,
+                response.usage.prompt_tokens,
+                response.usage.completion_tokens,
+                message=response.choices[0].message.model_dump(),
+            )
 
             return response.choices[0].message
 
-        except TokenLimitExceeded:
-            # Re-raise token limit errors without logging
+        except (TokenLimitExceeded, LLMCacheMiss, ToolCallStreamInterrupted):
+            # Re-raise token limit errors, replay misses and interrupted streams
+            # without logging
             raise
         except ValueError as ve:
             logger.error(f"Validation error in ask_tool: {ve}")
@@ -764,3 +1278,138 @@ class LLM:
         except Exception as e:
             logger.error(f"Unexpected error in ask_tool: {e}")
             raise
+
+    async def _stream_tool_response(
+        self,
+        params: dict,
+        input_tokens: int,
+        on_tool_call: Optional[Callable[[ChatCompletionMessageToolCall], Any]] = None,
+    ) -> ChatCompletionMessage:
+        """
+        Stream a tool request, assembling tool call deltas incrementally.
+
+        A tool call is handed to `on_tool_call` as soon as its arguments form
+        complete JSON, or when the model starts the next call or the stream ends.
+        If the stream fails after a call was handed over, ToolCallStreamInterrupted
+        is raised instead of the error, so that the request is not retried and
+        the call started again.
+
+        Args:
+            params: Completion request parameters
+            input_tokens: Estimated input tokens of the request
+            on_tool_call: Optional callback receiving each completed tool call
+
+        Returns:
+            ChatCompletionMessage: The assembled response
+        """
+        # For streaming, update estimated token count before making the request
+        self.update_token_count(input_tokens)
+
+        start_time = time.perf_counter()
+        first_token_time = first_tool_time = None
+        content_parts: List[str] = []
+        calls: Dict[int, dict] = {}
+        emitted: set = set()
+
+        async def emit(index: int) -> None:
+            nonlocal first_tool_time
+            if index in emitted:
+                return
+            emitted.add(index)
+            if first_tool_time is None:
+                first_tool_time = time.perf_counter() - start_time
+            if on_tool_call:
+                result = on_tool_call(self._build_tool_call(index, calls[index]))
+                if inspect.isawaitable(result):
+                    await result
+
+        try:
+            response = await self.client.chat.completions.create(**params, stream=True)
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if first_token_time is None and (delta.content or delta.tool_calls):
+                    first_token_time = time.perf_counter() - start_time
+
+                if delta.content:
+                    content_parts.append(delta.content)
+
+                for tool_call in delta.tool_calls or []:
+                    # Calls are emitted in order, a new index closes the previous ones
+                    for index in list(calls):
+                        if index < tool_call.index:
+                            await emit(index)
+
+                    call = calls.setdefault(
+                        tool_call.index, {"id": "", "name": "", "arguments": []}
+                    )
+                    if tool_call.id:
+                        call["id"] = tool_call.id
+                    if tool_call.function:
+                        if tool_call.function.name:
+                            call["name"] += tool_call.function.name
+                        if tool_call.function.arguments:
+                            call["arguments"].append(tool_call.function.arguments)
+                            if self._arguments_complete(call["arguments"]):
+                                await emit(tool_call.index)
+
+            for index in sorted(calls):
+                await emit(index)
+        except Exception as e:
+            if emitted and on_tool_call:
+                raise ToolCallStreamInterrupted(
+                    f"Tool call stream failed after {len(emitted)} tool call(s) started: {e}"
+                ) from e
+            raise
+
+        tool_calls = [
+            self._build_tool_call(index, calls[index]) for index in sorted(calls)
+        ]
+        content = "".join(content_parts)
+
+        self.stream_latency = {
+            "first_token": first_token_time,
+            "first_tool_call": first_tool_time,
+            "total": time.perf_counter() - start_time,
+        }
+        logger.info(
+            "Streamed tool response latency: "
+            + ", ".join(
+                f"{name}={value:.2f}s" if value is not None else f"{name}=n/a"
+                for name, value in self.stream_latency.items()
+            )
+        )
+
+        message = ChatCompletionMessage(
+            role="assistant", content=content or None, tool_calls=tool_calls or None
+        )
+        # estimate completion tokens for streaming response
+        self._add_token_usage(0, self._estimate_completion_tokens(message))
+
+        return message
+
+    def _estimate_completion_tokens(self, message: ChatCompletionMessage) -> int:
+        return self.count_tokens(message.content or "") + sum(
+            self.count_tokens(call.function.name + call.function.arguments)
+            for call in message.tool_calls or []
+        )
+
+    @staticmethod
+    def _arguments_complete(argument_parts: List[str]) -> bool:
+        """Check whether streamed arguments form a complete JSON document"""
+        if not argument_parts[-1].rstrip().endswith("}"):
+            return False
+        try:
+            json.loads("".join(argument_parts))
+            return True
+        except json.JSONDecodeError:
+            return False
+
+    @staticmethod
+    def _build_tool_call(index: int, call: dict) -> ChatCompletionMessageToolCall:
+        return ChatCompletionMessageToolCall(
+            id=call["id"] or f"call_{index}",
+            type="function",
+            function=Function(name=call["name"], arguments="".join(call["arguments"])),
+        )
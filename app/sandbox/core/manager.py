@@ -1,7 +1,8 @@
 import asyncio
+import time
 import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set
 
 import docker
 from docker.errors import APIError, ImageNotFound
@@ -18,12 +19,20 @@ class SandboxManager:
     monitoring, and cleanup. Provides concurrent access control and automatic
     cleanup mechanisms for sandbox resources.
 
+    Optionally keeps a warm pool of started sandboxes with initialized
+    terminals per sandbox configuration, so acquiring one skips container
+    cold start. Pool slots are refilled in the background and released
+    sandboxes are reset and recycled.
+
     Attributes:
         max_sandboxes: Maximum allowed number of sandboxes.
         idle_timeout: Sandbox idle timeout in seconds.
         cleanup_interval: Cleanup check interval in seconds.
+        pool_min_idle: Warm sandboxes kept ready per configuration.
+        pool_max_total: Maximum warm and leased sandboxes per configuration.
         _sandboxes: Active sandbox instance mapping.
         _last_used: Last used time record for sandboxes.
+        _warm: Idle warm sandboxes per pool key.
     """
 
     def __init__(
@@ -31,6 +40,8 @@ class SandboxManager:
         max_sandboxes: int = 100,
         idle_timeout: int = 3600,
         cleanup_interval: int = 300,
+        pool_min_idle: int = 0,
+        pool_max_total: int = 10,
     ):
         """Initializes sandbox manager.
 
@@ -38,10 +49,14 @@ class SandboxManager:
             max_sandboxes: Maximum sandbox count limit.
             idle_timeout: Idle timeout in seconds.
             cleanup_interval: Cleanup check interval in seconds.
+            pool_min_idle: Warm sandboxes to keep ready per configuration, 0 disables pooling.
+            pool_max_total: Maximum warm and leased sandboxes per configuration.
         """
         self.max_sandboxes = max_sandboxes
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
+        self.pool_min_idle = pool_min_idle
+        self.pool_max_total = pool_max_total
 
         # Docker client
         self._client = docker.from_env()
@@ -55,6 +70,19 @@ class SandboxManager:
         self._global_lock = asyncio.Lock()
         self._active_operations: Set[str] = set()
 
+        # Warm pool, keyed by sandbox configuration
+        self._warm: Dict[str, List[DockerSandbox]] = {}
+        self._pool_configs: Dict[str, SandboxSettings] = {}
+        self._pool_keys: Dict[str, str] = {}  # sandbox_id -> pool key
+        self._pool_pending: Dict[str, int] = {}  # warm sandboxes being created
+        self._refill_tasks: Dict[str, asyncio.Task] = {}
+
+        # Acquire statistics
+        self._acquires = 0
+        self._pool_hits = 0
+        self._acquire_time_total = 0.0
+        self._acquire_time_max = 0.0
+
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
         self._is_shutting_down = False
@@ -118,6 +146,9 @@ class SandboxManager:
     ) -> str:
         """Creates a new sandbox instance.
 
+        Takes a warm sandbox from the pool when pooling is enabled and no
+        volume bindings are requested, otherwise starts a new container.
+
         Args:
             config: Sandbox configuration.
             volume_bindings: Volume mapping configuration.
@@ -128,27 +159,48 @@ class SandboxManager:
         Raises:
             RuntimeError: If max sandbox count reached or creation fails.
         """
+        start_time = time.perf_counter()
+        config = config or SandboxSettings()
+        pool_key = (
+            self._pool_key(config)
+            if self.pool_min_idle > 0 and not volume_bindings
+            else None
+        )
+
         async with self._global_lock:
             if len(self._sandboxes) >= self.max_sandboxes:
                 raise RuntimeError(
                     f"Maximum number of sandboxes ({self.max_sandboxes}) reached"
                 )
 
-            config = config or SandboxSettings()
-            if not await self.ensure_image(config.image):
-                raise RuntimeError(f"Failed to ensure Docker image: {config.image}")
-
             sandbox_id = str(uuid.uuid4())
+            sandbox = None
+            if pool_key:
+                self._pool_configs.setdefault(pool_key, config)
+                if self._warm.get(pool_key):
+                    sandbox = self._warm[pool_key].pop()
+                    self._pool_hits += 1
+                elif self._pool_size(pool_key) >= self.pool_max_total:
+                    raise RuntimeError(
+                        f"Maximum number of sandboxes ({self.pool_max_total}) reached for image {config.image}"
+                    )
+
             try:
-                sandbox = DockerSandbox(config, volume_bindings)
-                await sandbox.create()
+                if sandbox is None:
+                    if not await self.ensure_image(config.image):
+                        raise RuntimeError(
+                            f"Failed to ensure Docker image: {config.image}"
+                        )
+                    sandbox = DockerSandbox(config, volume_bindings)
+                    await sandbox.create()
 
                 self._sandboxes[sandbox_id] = sandbox
                 self._last_used[sandbox_id] = asyncio.get_event_loop().time()
                 self._locks[sandbox_id] = asyncio.Lock()
+                if pool_key:
+                    self._pool_keys[sandbox_id] = pool_key
 
                 logger.info(f"Created sandbox {sandbox_id}")
-                return sandbox_id
 
             except Exception as e:
                 logger.error(f"Failed to create sandbox: {e}")
@@ -156,6 +208,119 @@ class SandboxManager:
                     await self.delete_sandbox(sandbox_id)
                 raise RuntimeError(f"Failed to create sandbox: {e}")
 
+        elapsed = time.perf_counter() - start_time
+        self._acquires += 1
+        self._acquire_time_total += elapsed
+        self._acquire_time_max = max(self._acquire_time_max, elapsed)
+
+        if pool_key:
+            self._schedule_refill(pool_key)
+        return sandbox_id
+
+    async def release_sandbox(self, sandbox_id: str) -> None:
+        """Releases a sandbox, recycling it into the warm pool when possible.
+
+        Pooled sandboxes are reset and kept if their pool is below its idle
+        target, other sandboxes are deleted.
+
+        Args:
+            sandbox_id: Sandbox ID.
+        """
+        pool_key = self._pool_keys.get(sandbox_id)
+        if (
+            not pool_key
+            or self._is_shutting_down
+            or len(self._warm.get(pool_key, [])) >= self.pool_min_idle
+        ):
+            await self.delete_sandbox(sandbox_id)
+            return
+
+        async with self.sandbox_operation(sandbox_id) as sandbox:
+            try:
+                await sandbox.reset()
+            except Exception as e:
+                logger.warning(f"Failed to reset sandbox {sandbox_id}: {e}")
+                sandbox = None
+
+        if sandbox is None:
+            await self.delete_sandbox(sandbox_id)
+            return
+
+        async with self._global_lock:
+            self._sandboxes.pop(sandbox_id, None)
+            self._last_used.pop(sandbox_id, None)
+            self._locks.pop(sandbox_id, None)
+            self._pool_keys.pop(sandbox_id, None)
+            self._warm.setdefault(pool_key, []).append(sandbox)
+        logger.info(f"Recycled sandbox {sandbox_id} into the warm pool")
+
+    async def warm_up(self, config: Optional[SandboxSettings] = None) -> None:
+        """Fills the warm pool for a configuration up to its idle target.
+
+        Args:
+            config: Sandbox configuration.
+        """
+        config = config or SandboxSettings()
+        pool_key = self._pool_key(config)
+        self._pool_configs.setdefault(pool_key, config)
+        await self._refill_pool(pool_key)
+
+    @staticmethod
+    def _pool_key(config: SandboxSettings) -> str:
+        return config.model_dump_json()
+
+    def _pool_size(self, pool_key: str) -> int:
+        """Counts warm, leased and pending sandboxes of a pool."""
+        leased = sum(1 for key in self._pool_keys.values() if key == pool_key)
+        return (
+            leased
+            + len(self._warm.get(pool_key, []))
+            + self._pool_pending.get(pool_key, 0)
+        )
+
+    def _schedule_refill(self, pool_key: str) -> None:
+        """Starts a background refill of a pool unless one is running."""
+        task = self._refill_tasks.get(pool_key)
+        if task is None or task.done():
+            self._refill_tasks[pool_key] = asyncio.create_task(
+                self._refill_pool(pool_key)
+            )
+
+    async def _refill_pool(self, pool_key: str) -> None:
+        """Creates warm sandboxes until the pool reaches its idle target."""
+        config = self._pool_configs[pool_key]
+        if not await self.ensure_image(config.image):
+            logger.error(
+                f"Cannot refill sandbox pool, image unavailable: {config.image}"
+            )
+            return
+
+        while True:
+            # Reserve a slot, so concurrent acquires count this sandbox
+            async with self._global_lock:
+                if (
+                    self._is_shutting_down
+                    or len(self._warm.get(pool_key, [])) >= self.pool_min_idle
+                    or self._pool_size(pool_key) >= self.pool_max_total
+                ):
+                    return
+                self._pool_pending[pool_key] = self._pool_pending.get(pool_key, 0) + 1
+
+            sandbox = DockerSandbox(config)
+            try:
+                await sandbox.create()
+            except Exception as e:
+                logger.error(f"Failed to create warm sandbox: {e}")
+                return
+            finally:
+                self._pool_pending[pool_key] -= 1
+            if self._is_shutting_down:
+                await sandbox.cleanup()
+                return
+            # Added without awaiting after the reservation ends, so it is always counted
+            self._warm.setdefault(pool_key, []).append(sandbox)
+            logger.info(f"Added warm sandbox for image {config.image}")
+
     async def get_sandbox(self, sandbox_id: str) -> DockerSandbox:
         """Gets a sandbox instance.
 
@@ -216,15 +381,28 @@ class SandboxManager:
             except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
 
+        # Stop pool refills
+        for task in self._refill_tasks.values():
+            task.cancel()
+        if self._refill_tasks:
+            await asyncio.wait(self._refill_tasks.values(), timeout=1.0)
+        self._refill_tasks.clear()
+
         # Get all sandbox IDs to clean up
         async with self._global_lock:
             sandbox_ids = list(self._sandboxes.keys())
+            warm_sandboxes = [
+                sandbox for sandboxes in self._warm.values() for sandbox in sandboxes
+            ]
+            self._warm.clear()
 
         # Concurrently clean up all sandboxes
         cleanup_tasks = []
         for sandbox_id in sandbox_ids:
             task = asyncio.create_task(self._safe_delete_sandbox(sandbox_id))
             cleanup_tasks.append(task)
+        for sandbox in warm_sandboxes:
+            cleanup_tasks.append(asyncio.create_task(sandbox.cleanup()))
 
         if cleanup_tasks:
             # Wait for all cleanup tasks to complete, with timeout to avoid infinite waiting
@@ -238,6 +416,7 @@ class SandboxManager:
         self._last_used.clear()
         self._locks.clear()
         self._active_operations.clear()
+        self._pool_keys.clear()
 
         logger.info("Manager cleanup completed")
 
@@ -271,6 +450,7 @@ class SandboxManager:
                     self._sandboxes.pop(sandbox_id, None)
                     self._last_used.pop(sandbox_id, None)
                     self._locks.pop(sandbox_id, None)
+                    self._pool_keys.pop(sandbox_id, None)
                     logger.info(f"Deleted sandbox {sandbox_id}")
         except Exception as e:
             logger.error(f"Error during cleanup of sandbox {sandbox_id}: {e}")
@@ -303,6 +483,13 @@ class SandboxManager:
         Returns:
             Dict: Statistics information.
         """
+        pools = {}
+        for pool_key, config in self._pool_configs.items():
+            warm = len(self._warm.get(pool_key, []))
+            pool = pools.setdefault(config.image, {"warm": 0, "leased": 0})
+            pool["warm"] += warm
+            pool["leased"] += self._pool_size(pool_key) - warm
+
         return {
             "total_sandboxes": len(self._sandboxes),
             "active_operations": len(self._active_operations),
@@ -310,4 +497,16 @@ class SandboxManager:
             "idle_timeout": self.idle_timeout,
             "cleanup_interval": self.cleanup_interval,
             "is_shutting_down": self._is_shutting_down,
+            "pool_min_idle": self.pool_min_idle,
+            "pool_max_total": self.pool_max_total,
+            "pools": pools,
+            "acquires": self._acquires,
+            "pool_hits": self._pool_hits,
+            "pool_hit_rate": (
+                self._pool_hits / self._acquires if self._acquires else 0.0
+            ),
+            "avg_acquire_latency": (
+                self._acquire_time_total / self._acquires if self._acquires else 0.0
+            ),
+            "max_acquire_latency": self._acquire_time_max,
         }
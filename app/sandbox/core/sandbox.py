@@ -1,10 +1,11 @@
 import asyncio
 import io
 import os
+import shutil
 import tarfile
 import tempfile
 import uuid
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, Optional
 
 import docker
 from docker.errors import NotFound
@@ -15,6 +16,36 @@ from app.sandbox.core.exceptions import SandboxTimeoutError
 from app.sandbox.core.terminal import AsyncDockerizedTerminal
 
 
+# Size of the file reads streamed into tar archives
+TAR_CHUNK_SIZE = 1024 * 1024
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only file object over an iterable of byte chunks.
+
+    Lets tarfile consume the chunks yielded by the Docker API in stream mode
+    without buffering the whole archive.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = memoryview(next(self._chunks))
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
 class DockerSandbox:
     """Docker sandbox environment.
 
@@ -102,6 +133,37 @@ class DockerSandbox:
             await self.cleanup()  # Ensure resources are cleaned up
             raise RuntimeError(f"Failed to create sandbox: {e}") from e
 
+    async def reset(self) -> None:
+        """Resets the sandbox for reuse.
+
+        Clears the working directory and replaces the terminal session so that
+        no files or shell state leak to the next user.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or reset fails.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+
+        try:
+            if self.terminal:
+                await self.terminal.close()
+                self.terminal = None
+
+            await asyncio.to_thread(
+                self.container.exec_run,
+                ["find", self.config.work_dir, "-mindepth", "1", "-delete"],
+            )
+
+            self.terminal = AsyncDockerizedTerminal(
+                self.container.id,
+                self.config.work_dir,
+                env_vars={"PYTHONUNBUFFERED": "1"},
+            )
+            await self.terminal.init()
+        except Exception as e:
+            raise RuntimeError(f"Failed to reset sandbox: {e}") from e
+
     def _prepare_volume_bindings(self) -> Dict[str, Dict[str, str]]:
         """Prepares volume binding configuration.
 
@@ -275,37 +337,10 @@ class DockerSandbox:
                 self.container.get_archive, resolved_src
             )
 
-            # Create temporary directory to extract file
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                # Write stream to temporary file
-                tar_path = os.path.join(tmp_dir, "temp.tar")
-                with open(tar_path, "wb") as f:
-                    for chunk in stream:
-                        f.write(chunk)
-
-                # Extract file
-                with tarfile.open(tar_path) as tar:
-                    members = tar.getmembers()
-                    if not members:
-                        raise FileNotFoundError(f"Source file is empty: {src_path}")
-
-                    # If destination is a directory, we should preserve relative path structure
-                    if os.path.isdir(dst_path):
-                        tar.extractall(dst_path)
-                    else:
-                        # If destination is a file, we only extract the source file's content
-                        if len(members) > 1:
-                            raise RuntimeError(
-                                f"Source path is a directory but destination is a file: {src_path}"
-                            )
-
-                        with open(dst_path, "wb") as dst:
-                            src_file = tar.extractfile(members[0])
-                            if src_file is None:
-                                raise RuntimeError(
-                                    f"Failed to extract file: {src_path}"
-                                )
-                            dst.write(src_file.read())
+            # Extract while the archive is downloaded, without a temporary copy
+            await asyncio.to_thread(
+                self._extract_tar_stream, stream, src_path, dst_path
+            )
 
         except docker.errors.NotFound:
             raise FileNotFoundError(f"Source file not found: {src_path}")
@@ -333,41 +368,18 @@ class DockerSandbox:
             if container_dir:
                 await self.run_command(f"mkdir -p {container_dir}")
 
-            # Create tar file to upload
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                tar_path = os.path.join(tmp_dir, "temp.tar")
-                with tarfile.open(tar_path, "w") as tar:
-                    # Handle directory source path
-                    if os.path.isdir(src_path):
-                        os.path.basename(src_path.rstrip("/"))
-                        for root, _, files in os.walk(src_path):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.join(
-                                    os.path.basename(dst_path),
-                                    os.path.relpath(file_path, src_path),
-                                )
-                                tar.add(file_path, arcname=arcname)
-                    else:
-                        # Add single file to tar
-                        tar.add(src_path, arcname=os.path.basename(dst_path))
-
-                # Read tar file content
-                with open(tar_path, "rb") as f:
-                    data = f.read()
-
-                # Upload to container
-                await asyncio.to_thread(
-                    self.container.put_archive,
-                    os.path.dirname(resolved_dst) or "/",
-                    data,
-                )
+            # Upload a tar stream generated while it is being sent
+            await asyncio.to_thread(
+                self.container.put_archive,
+                os.path.dirname(resolved_dst) or "/",
+                self._iter_tar_chunks(src_path, os.path.basename(dst_path)),
+            )
 
-                # Verify file was created successfully
-                try:
-                    await self.run_command(f"test -e {resolved_dst}")
-                except Exception:
-                    raise RuntimeError(f"Failed to verify file creation: {dst_path}")
+            # Verify file was created successfully
+            try:
+                await self.run_command(f"test -e {resolved_dst}")
+            except Exception:
+                raise RuntimeError(f"Failed to verify file creation: {dst_path}")
 
         except FileNotFoundError:
             raise
@@ -406,21 +418,111 @@ class DockerSandbox:
         Raises:
             RuntimeError: If read operation fails.
         """
-        with tempfile.NamedTemporaryFile() as tmp:
-            for chunk in tar_stream:
-                tmp.write(chunk)
-            tmp.seek(0)
+        with tarfile.open(fileobj=_ChunkReader(tar_stream), mode="r|") as tar:
+            member = tar.next()
+            if not member:
+                raise RuntimeError("Empty tar archive")
 
-            with tarfile.open(fileobj=tmp) as tar:
-                member = tar.next()
-                if not member:
-                    raise RuntimeError("Empty tar archive")
+            file_content = tar.extractfile(member)
+            if not file_content:
+                raise RuntimeError("Failed to extract file content")
 
-                file_content = tar.extractfile(member)
-                if not file_content:
-                    raise RuntimeError("Failed to extract file content")
+            return file_content.read()
 
-                return file_content.read()
+    @staticmethod
+    def _iter_tar_chunks(src_path: str, arcname: str) -> Iterator[bytes]:
+        """Generates a tar archive of a host path chunk by chunk.
+
+        Headers and file contents are yielded as they are read, so memory use
+        does not depend on the size of the source.
+
+        Args:
+            src_path: Source file or directory (host).
+            arcname: Name of the source inside the archive.
+
+        Yields:
+            Consecutive chunks of the tar archive.
+        """
+        if os.path.isdir(src_path):
+            paths = (
+                (
+                    os.path.join(root, file),
+                    os.path.join(
+                        arcname, os.path.relpath(os.path.join(root, file), src_path)
+                    ),
+                )
+                for root, _, files in os.walk(src_path)
+                for file in files
+            )
+        else:
+            paths = iter([(src_path, arcname)])
+
+        tar = tarfile.TarFile(fileobj=io.BytesIO(), mode="w")
+        for path, name in paths:
+            tarinfo = tar.gettarinfo(path, arcname=name)
+            yield tarinfo.tobuf(tar.format, tar.encoding, tar.errors)
+            if not tarinfo.isreg():
+                continue
+
+            remaining = tarinfo.size
+            with open(path, "rb") as f:
+                while remaining > 0:
+                    chunk = f.read(min(TAR_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise RuntimeError(f"File changed while copying: {path}")
+                    remaining -= len(chunk)
+                    yield chunk
+
+            padding = -tarinfo.size % tarfile.BLOCKSIZE
+            if padding:
+                yield tarfile.NUL * padding
+
+        # End of archive marker
+        yield tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+
+    @staticmethod
+    def _extract_tar_stream(
+        tar_stream: Iterable[bytes], src_path: str, dst_path: str
+    ) -> None:
+        """Extracts a tar stream from the Docker API to a host path.
+
+        Args:
+            tar_stream: Tar archive chunks.
+            src_path: Source path (container), used in error messages.
+            dst_path: Destination path (host).
+
+        Raises:
+            FileNotFoundError: If the archive is empty.
+            RuntimeError: If a directory would be copied onto a file.
+        """
+        with tarfile.open(fileobj=_ChunkReader(tar_stream), mode="r|") as tar:
+            # If destination is a directory, we should preserve relative path structure
+            if os.path.isdir(dst_path):
+                if not tar.next():
+                    raise FileNotFoundError(f"Source file is empty: {src_path}")
+                tar.extractall(dst_path)
+                return
+
+            # If destination is a file, we only extract the source file's content
+            member = tar.next()
+            if not member:
+                raise FileNotFoundError(f"Source file is empty: {src_path}")
+            if member.isdir():
+                raise RuntimeError(
+                    f"Source path is a directory but destination is a file: {src_path}"
+                )
+
+            src_file = tar.extractfile(member)
+            if src_file is None:
+                raise RuntimeError(f"Failed to extract file: {src_path}")
+            with open(dst_path, "wb") as dst:
+                shutil.copyfileobj(src_file, dst, TAR_CHUNK_SIZE)
+
+            if tar.next():
+                os.remove(dst_path)
+                raise RuntimeError(
+                    f"Source path is a directory but destination is a file: {src_path}"
+                )
 
     async def cleanup(self) -> None:
         """Cleans up sandbox resources."""
@@ -8,6 +8,7 @@ allowing interactive command execution with timeout control.
 import asyncio
 import re
 import socket
+import ssl
 from typing import Dict, Optional, Tuple, Union
 
 import docker
@@ -16,6 +17,12 @@ from docker.errors import APIError
 from docker.models.containers import Container
 
 
+PROMPT = b"$ "
+READ_CHUNK_SIZE = 65536
+# Consumed bytes are dropped from the read buffer once they exceed this size
+BUFFER_COMPACT_THRESHOLD = 65536
+
+
 class DockerSession:
     def __init__(self, container_id: str) -> None:
         """Initializes a Docker session.
@@ -114,6 +121,35 @@ class DockerSession:
             # Log error but don't raise, ensure cleanup continues
             print(f"Warning: Error during session cleanup: {e}")
 
+    async def _recv(self) -> bytes:
+        """Waits until the socket is readable and returns the available data.
+
+        Returns:
+            Received bytes, empty if the connection was closed.
+
+        Raises:
+            socket.error: If socket communication fails.
+        """
+        loop = asyncio.get_running_loop()
+        if not isinstance(self.socket, ssl.SSLSocket):
+            return await loop.sock_recv(self.socket, READ_CHUNK_SIZE)
+
+        # SSL sockets may hold decrypted data the selector cannot see, so try
+        # reading first and only wait for readability when nothing is buffered
+        while True:
+            try:
+                return self.socket.recv(READ_CHUNK_SIZE)
+            except (ssl.SSLWantReadError, BlockingIOError):
+                readable = loop.create_future()
+                loop.add_reader(
+                    self.socket.fileno(),
+                    lambda: readable.done() or readable.set_result(None),
+                )
+                try:
+                    await readable
+                finally:
+                    loop.remove_reader(self.socket.fileno())
+
     async def _read_until_prompt(self) -> str:
         """Reads output until prompt is found.
 
@@ -123,17 +159,16 @@ class DockerSession:
         Raises:
             socket.error: If socket communication fails.
         """
-        buffer = b""
-        while b"$ " not in buffer:
-            try:
-                chunk = self.socket.recv(4096)
-                if chunk:
-                    buffer += chunk
-            except socket.error as e:
-                if e.errno == socket.EWOULDBLOCK:
-                    await asyncio.sleep(0.1)
-                    continue
-                raise
+        buffer = bytearray()
+        while True:
+            chunk = await self._recv()
+            if not chunk:
+                break
+            # Only the new bytes and one byte before them can complete the prompt
+            search_from = max(len(buffer) - len(PROMPT) + 1, 0)
+            buffer += chunk
+            if buffer.find(PROMPT, search_from) != -1:
+                break
         return buffer.decode("utf-8")
 
     async def execute(self, command: str, timeout: Optional[int] = None) -> str:
@@ -160,43 +195,43 @@ class DockerSession:
             self.socket.sendall(full_command.encode())
 
             async def read_output() -> str:
-                buffer = b""
+                buffer = bytearray()
+                line_start = 0  # Start of the first unprocessed line in buffer
                 result_lines = []
                 command_sent = False
 
                 while True:
-                    try:
-                        chunk = self.socket.recv(4096)
-                        if not chunk:
-                            break
+                    chunk = await self._recv()
+                    if not chunk:
+                        break
 
-                        buffer += chunk
-                        lines = buffer.split(b"\n")
-
-                        buffer = lines[-1]
-                        lines = lines[:-1]
+                    scan_from = len(buffer)
+                    buffer += chunk
 
-                        for line in lines:
-                            line = line.rstrip(b"\r")
+                    # Only scan the new bytes for line breaks
+                    newline = buffer.find(b"\n", scan_from)
+                    while newline != -1:
+                        line = bytes(buffer[line_start:newline]).rstrip(b"\r")
+                        line_start = newline + 1
+                        newline = buffer.find(b"\n", line_start)
 
-                            if not command_sent:
-                                command_sent = True
-                                continue
+                        if not command_sent:
+                            command_sent = True
+                            continue
 
-                            if line.strip() == b"echo $?" or line.strip().isdigit():
-                                continue
+                        stripped = line.strip()
+                        if stripped == b"echo $?" or stripped.isdigit():
+                            continue
 
-                            if line.strip():
-                                result_lines.append(line)
+                        if stripped:
+                            result_lines.append(line)
 
-                        if buffer.endswith(b"$ "):
-                            break
+                    if line_start >= BUFFER_COMPACT_THRESHOLD:
+                        del buffer[:line_start]
+                        line_start = 0
 
-                    except socket.error as e:
-                        if e.errno == socket.EWOULDBLOCK:
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
+                    if buffer.endswith(PROMPT):
+                        break
 
                 output = b"\n".join(result_lines).decode("utf-8")
                 output = re.sub(r"\n\$ echo \$\$?.*$", "", output)
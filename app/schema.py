@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import Any, List, Literal, Optional, Union
+from typing import Any, Dict, Hashable, List, Literal, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class Role(str, Enum):
@@ -61,6 +61,9 @@ class Message(BaseModel):
     tool_call_id: Optional[str] = Field(default=None)
     base64_image: Optional[str] = Field(default=None)
 
+    # Memoized token counts: counter key -> (content hash, tokens)
+    _token_cache: Dict[Hashable, Tuple[int, int]] = PrivateAttr(default_factory=dict)
+
     def __add__(self, other) -> List["Message"]:
         """支持 Message + list 或 Message + Message 的操作"""
         if isinstance(other, list):
@@ -96,6 +99,35 @@ class Message(BaseModel):
             message["base64_image"] = self.base64_image
         return message
 
+    def content_hash(self) -> int:
+        """Hash of the fields that contribute to the message's token count"""
+        tool_calls = tuple(
+            (call.function.name, call.function.arguments)
+            for call in self.tool_calls or ()
+        )
+        content = self.content if isinstance(self.content, str) else repr(self.content)
+        return hash(
+            (
+                self.role,
+                content,
+                tool_calls,
+                self.name,
+                self.tool_call_id,
+                self.base64_image is not None,
+            )
+        )
+
+    def get_cached_tokens(self, key: Hashable) -> Optional[int]:
+        """Get the memoized token count for a counter key, if still valid"""
+        cached = self._token_cache.get(key)
+        if cached is None or cached[0] != self.content_hash():
+            return None
+        return cached[1]
+
+    def set_cached_tokens(self, key: Hashable, tokens: int) -> None:
+        """Memoize the token count for a counter key"""
+        self._token_cache[key] = (self.content_hash(), tokens)
+
     @classmethod
     def user_message(
         cls, content: str, base64_image: Optional[str] = None
@@ -160,23 +192,213 @@ class Memory(BaseModel):
     messages: List[Message] = Field(default_factory=list)
     max_messages: int = Field(default=100)
 
+    # Running token total, maintained incrementally once a counter is attached
+    _token_counter: Any = PrivateAttr(default=None)
+    _token_key: Optional[Hashable] = PrivateAttr(default=None)
+    _token_total: int = PrivateAttr(default=0)
+    _token_counted: int = PrivateAttr(default=0)
+    _token_list_id: Optional[int] = PrivateAttr(default=None)
+
     def add_message(self, message: Message) -> None:
         """Add a message to memory"""
         self.messages.append(message)
+        self._count_new_messages()
         # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._trim()
 
     def add_messages(self, messages: List[Message]) -> None:
         """Add multiple messages to memory"""
         self.messages.extend(messages)
+        self._count_new_messages()
         # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._trim()
 
     def clear(self) -> None:
         """Clear all messages"""
         self.messages.clear()
+        self._reset_token_total()
+
+    def count_tokens(self, token_counter: Any, supports_images: bool = False) -> int:
+        """Get the token count of all messages in memory.
+
+        The first call attaches the counter; afterwards only messages added since
+        the previous count are tokenized. The total excludes the per-request
+        format overhead added by `TokenCounter.count_message_tokens`.
+
+        Args:
+            token_counter: Counter exposing `cache_key` and `count_message`
+            supports_images: Whether image payloads are sent to the model
+        """
+        key = (token_counter.cache_key, supports_images)
+        if (
+            key != self._token_key
+            or id(self.messages) != self._token_list_id
+            or self._token_counted > len(self.messages)
+        ):
+            self._token_counter = token_counter
+            self._token_key = key
+            self._reset_token_total()
+        self._count_new_messages()
+        return self._token_total
+
+    def _reset_token_total(self) -> None:
+        self._token_total = 0
+        self._token_counted = 0
+        self._token_list_id = id(self.messages)
+
+    def _count_new_messages(self) -> None:
+        """Add the tokens of not yet counted messages to the running total"""
+        if self._token_counter is None or id(self.messages) != self._token_list_id:
+            return
+        supports_images = self._token_key[1]
+        for message in self.messages[self._token_counted :]:
+            self._token_total += self._token_counter.count_message(
+                message, supports_images
+            )
+        self._token_counted = len(self.messages)
+
+    def _trim(self) -> None:
+        """Drop the oldest messages beyond max_messages, keeping the total in sync"""
+        excess = len(self.messages) - self.max_messages
+        if excess <= 0:
+            return
+        # Never keep tool results whose tool_calls message was dropped
+        while excess < len(self.messages) and self.messages[excess].role == Role.TOOL:
+            excess += 1
+        if self._token_counter is not None and self._token_counted >= excess:
+            supports_images = self._token_key[1]
+            for message in self.messages[:excess]:
+                self._token_total -= self._token_counter.count_message(
+                    message, supports_images
+                )
+            self._token_counted -= excess
+        else:
+            # Force a full recount on the next count_tokens call
+            self._token_counter = None
+            self._token_key = None
+        del self.messages[:excess]
+
+    def compact(
+        self,
+        token_counter: Any,
+        budget: int,
+        supports_images: bool = False,
+        keep_recent: int = 6,
+        observation_chars: int = 500,
+    ) -> int:
+        """Shrink memory until its tokens fit within budget.
+
+        Messages are compacted oldest first, stopping as soon as the budget is
+        met, so each call only touches what the latest step pushed over it:
+
+        1. Drop base64 images of older messages
+        2. Cut older tool observations down to their first characters
+        3. Evict older turns, removing a tool_calls message together with its
+           tool results, so no call or result is left without its pair
+
+        The first user message (the task request) and the most recent
+        keep_recent messages are never touched.
+
+        Args:
+            token_counter: Counter exposing `cache_key`, `count_message` and
+                `count_text`
+            budget: Token budget for the messages in memory
+            supports_images: Whether image payloads are sent to the model
+            keep_recent: Number of most recent messages left intact
+            observation_chars: Characters kept of a compacted tool observation
+
+        Returns:
+            The token count of memory after compaction
+        """
+        total = self.count_tokens(token_counter, supports_images)
+        if total <= budget:
+            return total
+
+        # Keep the recent window together with the tool_calls message it answers
+        protected = max(len(self.messages) - keep_recent, 0)
+        while (
+            0 < protected < len(self.messages)
+            and self.messages[protected].role == Role.TOOL
+        ):
+            protected -= 1
+        pinned = next(
+            (msg for msg in self.messages[:protected] if msg.role == Role.USER), None
+        )
+
+        for index in range(protected):
+            if self._token_total <= budget:
+                return self._token_total
+            if self.messages[index].base64_image:
+                self._update_message(index, base64_image=None)
+
+        for index in range(protected):
+            if self._token_total <= budget:
+                return self._token_total
+            message = self.messages[index]
+            if message.role != Role.TOOL or not message.content:
+                continue
+            if len(message.content) <= observation_chars:
+                continue
+            kept = message.content[:observation_chars]
+            counter = self._token_counter
+            removed = counter.count_text(message.content) - counter.count_text(kept)
+            self._update_message(
+                index,
+                content=f"{kept}\n"
+                f"... [observation truncated, {removed} tokens removed to save context]",
+            )
+
+        index = 0
+        while self._token_total > budget and index < protected:
+            message = self.messages[index]
+            if message is pinned:
+                index += 1
+                continue
+            end = index + 1
+            while end < len(self.messages) and self.messages[end].role == Role.TOOL:
+                end += 1
+            if end > protected:
+                break
+            self._remove_messages(index, end)
+            protected -= end - index
+        return self._token_total
+
+    def keep_latest_images(self, count: int) -> None:
+        """Drop base64 images from all but the latest count messages with one"""
+        seen = 0
+        for index in range(len(self.messages) - 1, -1, -1):
+            if not self.messages[index].base64_image:
+                continue
+            seen += 1
+            if seen <= count:
+                continue
+            if (
+                self._token_counter is not None
+                and id(self.messages) == self._token_list_id
+                and index < self._token_counted
+            ):
+                self._update_message(index, base64_image=None)
+            else:
+                self.messages[index].base64_image = None
+
+    def _update_message(self, index: int, **updates) -> None:
+        """Modify a counted message in place, keeping the total in sync"""
+        message = self.messages[index]
+        supports_images = self._token_key[1]
+        self._token_total -= self._token_counter.count_message(message, supports_images)
+        for field, value in updates.items():
+            setattr(message, field, value)
+        self._token_total += self._token_counter.count_message(message, supports_images)
+
+    def _remove_messages(self, start: int, end: int) -> None:
+        """Remove counted messages[start:end], keeping the total in sync"""
+        supports_images = self._token_key[1]
+        for message in self.messages[start:end]:
+            self._token_total -= self._token_counter.count_message(
+                message, supports_images
+            )
+        del self.messages[start:end]
+        self._token_counted -= end - start
 
     def get_recent_messages(self, n: int) -> List[Message]:
         """Get n most recent messages"""
@@ -8,6 +8,8 @@ class BaseTool(ABC, BaseModel):
     name: str
     description: str
     parameters: Optional[dict] = None
+    # Side-effect-free tools that may run concurrently with other calls
+    concurrency_safe: bool = False
 
     class Config:
         arbitrary_types_allowed = True
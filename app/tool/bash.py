@@ -1,5 +1,6 @@
 import asyncio
 import os
+import uuid
 from typing import Optional
 
 from app.exceptions import ToolError
@@ -13,6 +14,86 @@ _BASH_DESCRIPTION = """Execute a bash command in the terminal.
 """
 
 
+class _StreamCapture:
+    """Consumes a pipe in the background and collects one command's output.
+
+    Bytes are kept in a bounded buffer, and completion is signalled as soon as
+    the command's sentinel line shows up, so no polling is needed.
+    """
+
+    _chunk_size: int = 65536
+
+    def __init__(self, stream: asyncio.StreamReader, max_bytes: int):
+        self._stream = stream
+        self._max_bytes = max_bytes
+        self._buffer = bytearray()
+        self._sentinel = b""
+        self._end: Optional[int] = None
+        self._truncated = 0  # Bytes dropped from the front of the buffer
+        self._truncated_next = 0  # Bytes dropped after the sentinel
+        self.done = asyncio.Event()
+        self.eof = False
+        self._task = asyncio.create_task(self._pump())
+
+    def begin(self, sentinel: str):
+        """Start collecting the output of a new command ending with sentinel"""
+        if self._end is not None:
+            # Keep whatever arrived after the previous command's sentinel
+            del self._buffer[: self._end + len(self._sentinel)]
+        self._sentinel = f"{sentinel}\n".encode()
+        self._end = None
+        self._truncated, self._truncated_next = self._truncated_next, 0
+        if not self.eof:
+            self.done.clear()
+        self._scan(0)
+
+    def output(self) -> str:
+        """Output of the current command, without the sentinel"""
+        end = len(self._buffer) if self._end is None else self._end
+        output = self._buffer[:end].decode(errors="replace")
+        if self._truncated:
+            output = f"[... {self._truncated} bytes of output truncated ...]\n{output}"
+        return output
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+    async def _pump(self) -> None:
+        while True:
+            chunk = await self._stream.read(self._chunk_size)
+            if not chunk:
+                break
+            search_from = max(len(self._buffer) - len(self._sentinel) + 1, 0)
+            self._buffer += chunk
+            self._scan(search_from)
+        self.eof = True
+        self.done.set()
+
+    def _scan(self, search_from: int) -> None:
+        if self._sentinel and self._end is None:
+            index = self._buffer.find(self._sentinel, search_from)
+            if index != -1:
+                self._end = index
+                self.done.set()
+        self._trim()
+
+    def _trim(self) -> None:
+        """Drop the oldest bytes beyond max_bytes"""
+        if self._end is None:
+            overflow = len(self._buffer) - self._max_bytes
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self._truncated += overflow
+            return
+        # Output after the sentinel, e.g. of background jobs, waits for the
+        # next command and is bounded on its own
+        start = self._end + len(self._sentinel)
+        overflow = len(self._buffer) - start - self._max_bytes
+        if overflow > 0:
+            del self._buffer[start : start + overflow]
+            self._truncated_next += overflow
+
+
 class _BashSession:
     """A session of a bash shell."""
 
@@ -20,9 +101,8 @@ class _BashSession:
     _process: asyncio.subprocess.Process
 
     command: str = "/bin/bash"
-    _output_delay: float = 0.2  # seconds
     _timeout: float = 120.0  # seconds
-    _sentinel: str = "<<exit>>"
+    _max_output_bytes: int = 1024 * 1024  # per stream and command
 
     def __init__(self):
         self._started = False
@@ -41,6 +121,11 @@ class _BashSession:
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
         )
+        # we know these are not None because we created the process with PIPEs
+        assert self._process.stdout
+        assert self._process.stderr
+        self._stdout = _StreamCapture(self._process.stdout, self._max_output_bytes)
+        self._stderr = _StreamCapture(self._process.stderr, self._max_output_bytes)
 
         self._started = True
 
@@ -48,6 +133,8 @@ class _BashSession:
         """Terminate the bash shell."""
         if not self._started:
             raise ToolError("Session has not started.")
+        self._stdout.stop()
+        self._stderr.stop()
         if self._process.returncode is not None:
             return
         self._process.terminate()
@@ -66,51 +153,45 @@ class _BashSession:
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
             )
 
-        # we know these are not None because we created the process with PIPEs
         assert self._process.stdin
-        assert self._process.stdout
-        assert self._process.stderr
 
-        # send command to the process
+        # a unique sentinel per command cannot be matched by earlier output
+        sentinel = f"<<exit-{uuid.uuid4().hex}>>"
+        self._stdout.begin(sentinel)
+        self._stderr.begin(sentinel)
+
+        # send command to the process, marking its end on both streams
         self._process.stdin.write(
-            command.encode() + f"; echo '{self._sentinel}'\n".encode()
+            command.encode() + f"; echo '{sentinel}'; echo '{sentinel}' >&2\n".encode()
         )
         await self._process.stdin.drain()
 
-        # read output from the process, until the sentinel is found
+        # wait until both readers have seen the sentinel
         try:
             async with asyncio.timeout(self._timeout):
-                while True:
-                    await asyncio.sleep(self._output_delay)
-                    # if we read directly from stdout/stderr, it will wait forever for
-                    # EOF. use the StreamReader buffer directly instead.
-                    output = (
-                        self._process.stdout._buffer.decode()
-                    )  # pyright: ignore[reportAttributeAccessIssue]
-                    if self._sentinel in output:
-                        # strip the sentinel and break
-                        output = output[: output.index(self._sentinel)]
-                        break
+                await self._stdout.done.wait()
+                await self._stderr.done.wait()
         except asyncio.TimeoutError:
             self._timed_out = True
             raise ToolError(
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted",
             ) from None
 
+        system = None
+        if self._stdout.eof:
+            # the command ended the shell itself, e.g. with `exit`
+            await self._process.wait()
+            system = "tool must be restarted"
+
+        output = self._stdout.output()
         if output.endswith("\n"):
             output = output[:-1]
 
-        error = (
-            self._process.stderr._buffer.decode()
-        )  # pyright: ignore[reportAttributeAccessIssue]
+        error = self._stderr.output()
         if error.endswith("\n"):
             error = error[:-1]
 
-        # clear the buffers so that the next output can be read correctly
-        self._process.stdout._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-        self._process.stderr._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-
-        return CLIResult(output=output, error=error)
+        return CLIResult(output=output, error=error, system=system)
 
 
 class Bash(BaseTool):
@@ -0,0 +1,199 @@
+import asyncio
+from typing import Dict, Optional
+
+from browser_use import Browser as BrowserUseBrowser
+from browser_use import BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+from app.config import BrowserSettings, config
+from app.logger import logger
+
+
+class _Lease:
+    """A browser context leased to one owner, e.g. a BrowserUseTool"""
+
+    def __init__(self, context: BrowserContext, generation: int, now: float):
+        self.context = context
+        self.generation = generation
+        self.last_used = now
+
+
+class BrowserPool:
+    """Shared browser process handing out isolated contexts.
+
+    Every BrowserUseTool leases its own BrowserContext, so agents keep
+    separate cookies, tabs and history and can browse in parallel, while
+    only one Chromium is launched per event loop. The number of contexts is
+    capped by max_contexts; contexts unused for context_idle_timeout seconds
+    are closed to free their slot, and the browser exits with the last
+    released context. If the browser crashes it is relaunched, and owners
+    get a fresh context on their next lease.
+    """
+
+    _pools: Dict[asyncio.AbstractEventLoop, "BrowserPool"] = {}
+
+    def __init__(self, max_contexts: int = 8, context_idle_timeout: float = 600.0):
+        self.max_contexts = max_contexts
+        self.context_idle_timeout = context_idle_timeout
+        self.browser: Optional[BrowserUseBrowser] = None
+        # Incremented on every browser launch, to spot contexts of a dead one
+        self.generation = 0
+        self._leases: Dict[int, _Lease] = {}
+        self._slots = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+
+    @classmethod
+    def get_pool(cls) -> "BrowserPool":
+        """Get the browser pool of the running event loop"""
+        loop = asyncio.get_running_loop()
+        pool = cls._pools.get(loop)
+        if pool is None:
+            for other in [other for other in cls._pools if other.is_closed()]:
+                cls._pools.pop(other)
+            settings = config.browser_config or BrowserSettings()
+            pool = cls._pools[loop] = cls(
+                max_contexts=settings.max_contexts,
+                context_idle_timeout=settings.context_idle_timeout,
+            )
+        return pool
+
+    @staticmethod
+    def _browser_config() -> BrowserConfig:
+        browser_config_kwargs = {"headless": False, "disable_security": True}
+
+        if config.browser_config:
+            from browser_use.browser.browser import ProxySettings
+
+            # handle proxy settings.
+            if config.browser_config.proxy and config.browser_config.proxy.server:
+                browser_config_kwargs["proxy"] = ProxySettings(
+                    server=config.browser_config.proxy.server,
+                    username=config.browser_config.proxy.username,
+                    password=config.browser_config.proxy.password,
+                )
+
+            browser_attrs = [
+                "headless",
+                "disable_security",
+                "extra_chromium_args",
+                "chrome_instance_path",
+                "wss_url",
+                "cdp_url",
+            ]
+
+            for attr in browser_attrs:
+                value = getattr(config.browser_config, attr, None)
+                if value is not None:
+                    if not isinstance(value, list) or value:
+                        browser_config_kwargs[attr] = value
+
+        return BrowserConfig(**browser_config_kwargs)
+
+    @staticmethod
+    def _context_config() -> BrowserContextConfig:
+        # if there is context config in the config, use it.
+        if (
+            config.browser_config
+            and hasattr(config.browser_config, "new_context_config")
+            and config.browser_config.new_context_config
+        ):
+            return config.browser_config.new_context_config
+        return BrowserContextConfig()
+
+    def _browser_alive(self) -> bool:
+        playwright_browser = getattr(self.browser, "playwright_browser", None)
+        # A browser that was not launched yet will be on first use
+        return playwright_browser is None or playwright_browser.is_connected()
+
+    async def _ensure_browser(self) -> BrowserUseBrowser:
+        async with self._lock:
+            if self.browser is not None and not self._browser_alive():
+                logger.warning("Shared browser is not running anymore, relaunching it")
+                browser, self.browser = self.browser, None
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.debug(f"Error closing crashed browser: {e}")
+            if self.browser is None:
+                self.browser = BrowserUseBrowser(self._browser_config())
+                self.generation += 1
+            return self.browser
+
+    async def acquire(self, owner: object) -> BrowserContext:
+        """Get the owner's context, creating it if needed.
+
+        Waits for a free slot when max_contexts contexts are leased. The
+        context stays leased until release, or until it has not been acquired
+        for context_idle_timeout seconds.
+        """
+        loop = asyncio.get_running_loop()
+        browser = await self._ensure_browser()
+        lease = self._leases.get(id(owner))
+        if lease is not None and lease.generation != self.generation:
+            logger.warning("Browser was relaunched, opening a new context")
+            await self._close_lease(id(owner))
+            lease = None
+
+        if lease is None:
+            await self._slots.acquire()
+            try:
+                context = await browser.new_context(self._context_config())
+            except BaseException:
+                self._slots.release()
+                raise
+            lease = self._leases[id(owner)] = _Lease(
+                context, self.generation, loop.time()
+            )
+            logger.debug(
+                f"Leased browser context {len(self._leases)}/{self.max_contexts}"
+            )
+            if self._reaper is None or self._reaper.done():
+                self._reaper = asyncio.create_task(self._reap_idle_contexts())
+
+        lease.last_used = loop.time()
+        return lease.context
+
+    async def release(self, owner: object) -> None:
+        """Close the owner's context and free its slot.
+
+        The browser is closed along with the last context, it is launched
+        again on the next lease.
+        """
+        await self._close_lease(id(owner))
+        if not self._leases:
+            async with self._lock:
+                if self.browser is not None and not self._leases:
+                    await self.browser.close()
+
+    async def _close_lease(self, key: int) -> None:
+        lease = self._leases.pop(key, None)
+        if lease is None:
+            return
+        self._slots.release()
+        try:
+            await lease.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser context: {e}")
+
+    async def _reap_idle_contexts(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._leases:
+            await asyncio.sleep(max(self.context_idle_timeout / 4, 1))
+            now = loop.time()
+            for key, lease in list(self._leases.items()):
+                if now - lease.last_used >= self.context_idle_timeout:
+                    logger.info("Closing idle browser context")
+                    await self._close_lease(key)
+
+    async def close(self) -> None:
+        """Close every context and the browser"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for key in list(self._leases):
+            await self._close_lease(key)
+        async with self._lock:
+            if self.browser is not None:
+                await self.browser.close()
+                self.browser = None
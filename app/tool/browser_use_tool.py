@@ -1,18 +1,23 @@
 import asyncio
 import base64
+import hashlib
+import io
 import json
-from typing import Generic, Optional, TypeVar
+import math
+import re
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
 
-from browser_use import Browser as BrowserUseBrowser
-from browser_use import BrowserConfig
-from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.context import BrowserContext
 from browser_use.dom.service import DomService
+from PIL import Image
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
-from app.config import config
+from app.config import BrowserSettings, config
 from app.llm import LLM
+from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
+from app.tool.browser_pool import BrowserPool
 from app.tool.web_search import WebSearch
 
 
@@ -36,6 +41,64 @@ Note: When using element indices, refer to the numbered elements shown in the cu
 Context = TypeVar("Context")
 
 
+def _perceptual_hash(image: Image.Image, size: int = 32) -> int:
+    """Difference hash of size * size bits, insensitive to JPEG noise.
+
+    The grid is fine enough that typing into a field or scrolling a little
+    flips bits, so only pages that really look the same compare equal.
+    """
+    pixels = list(
+        image.convert("L").resize((size + 1, size), Image.Resampling.BILINEAR).getdata()
+    )
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+_ELEMENT_INDEX = re.compile(r"^\t*\*?\[(\d+)\]")
+
+
+def _index_elements(
+    elements: str, selector_map: Dict[int, Any]
+) -> Dict[str, Tuple[int, str]]:
+    """Map xpaths of interactive elements to their index and line without it"""
+    indexed = {}
+    for line in elements.splitlines():
+        match = _ELEMENT_INDEX.match(line)
+        if not match:
+            continue
+        index = int(match.group(1))
+        node = selector_map.get(index)
+        xpath = getattr(node, "xpath", None) or f"[{index}]"
+        # Dropping the index also drops the mark of elements new in this state
+        indexed[xpath] = (index, line[match.end() :].lstrip("*"))
+    return indexed
+
+
+def _process_screenshot(
+    data: bytes, max_width: int, max_height: int, quality: int
+) -> Tuple[bytes, int, Tuple[int, int]]:
+    """Downscale a JPEG screenshot to fit the maximum dimensions.
+
+    Returns the JPEG to send, its perceptual hash and its dimensions.
+    """
+    image = Image.open(io.BytesIO(data))
+    if image.width <= max_width and image.height <= max_height:
+        size = image.size
+        # Decoding at reduced scale is enough for hashing
+        image.draft("L", (image.width // 8, image.height // 8))
+        return data, _perceptual_hash(image), size
+
+    image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    image.convert("RGB").save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue(), _perceptual_hash(image), image.size
+
+
 class BrowserUseTool(BaseTool, Generic[Context]):
     name: str = "browser_use"
     description: str = _BROWSER_DESCRIPTION
@@ -122,7 +185,7 @@ class BrowserUseTool(BaseTool, Generic[Context]):
     }
 
     lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
-    browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
+    # Context leased from the shared BrowserPool
     context: Optional[BrowserContext] = Field(default=None, exclude=True)
     dom_service: Optional[DomService] = Field(default=None, exclude=True)
     web_search_tool: WebSearch = Field(default_factory=WebSearch, exclude=True)
@@ -132,6 +195,21 @@ class BrowserUseTool(BaseTool, Generic[Context]):
 
     llm: Optional[LLM] = Field(default_factory=LLM)
 
+    _pool: Optional[BrowserPool] = None
+
+    # URL, tree hash and indexed interactive elements of the last state sent
+    _last_elements: Optional[Tuple[str, str, Dict[str, Tuple[int, str]]]] = None
+
+    # Perceptual hash and URL of the last screenshot sent, to skip unchanged pages
+    _last_screenshot: Optional[Tuple[str, int]] = None
+    _screenshot_stats: Dict[str, int] = {
+        "captured": 0,
+        "sent": 0,
+        "deduplicated": 0,
+        "captured_bytes": 0,
+        "sent_bytes": 0,
+    }
+
     @field_validator("parameters", mode="before")
     def validate_parameters(cls, v: dict, info: ValidationInfo) -> dict:
         if not v:
@@ -139,53 +217,15 @@ class BrowserUseTool(BaseTool, Generic[Context]):
         return v
 
     async def _ensure_browser_initialized(self) -> BrowserContext:
-        """Ensure browser and context are initialized."""
-        if self.browser is None:
-            browser_config_kwargs = {"headless": False, "disable_security": True}
-
-            if config.browser_config:
-                from browser_use.browser.browser import ProxySettings
-
-                # handle proxy settings.
-                if config.browser_config.proxy and config.browser_config.proxy.server:
-                    browser_config_kwargs["proxy"] = ProxySettings(
-                        server=config.browser_config.proxy.server,
-                        username=config.browser_config.proxy.username,
-                        password=config.browser_config.proxy.password,
-                    )
-
-                browser_attrs = [
-                    "headless",
-                    "disable_security",
-                    "extra_chromium_args",
-                    "chrome_instance_path",
-                    "wss_url",
-                    "cdp_url",
-                ]
-
-                for attr in browser_attrs:
-                    value = getattr(config.browser_config, attr, None)
-                    if value is not None:
-                        if not isinstance(value, list) or value:
-                            browser_config_kwargs[attr] = value
-
-            self.browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
-
-        if self.context is None:
-            context_config = BrowserContextConfig()
-
-            # if there is context config in the config, use it.
-            if (
-                config.browser_config
-                and hasattr(config.browser_config, "new_context_config")
-                and config.browser_config.new_context_config
-            ):
-                context_config = config.browser_config.new_context_config
-
-            self.context = await self.browser.new_context(context_config)
-            self.dom_service = DomService(await self.context.get_current_page())
-
-        return self.context
+        """Ensure this tool holds a context of the shared browser."""
+        if self._pool is None:
+            self._pool = BrowserPool.get_pool()
+        context = await self._pool.acquire(self)
+        if context is not self.context:
+            # First use, or the previous context was reaped or lost in a crash
+            self.context = context
+            self.dom_service = DomService(await context.get_current_page())
+        return context
 
     async def execute(
         self,
@@ -224,11 +264,6 @@ class BrowserUseTool(BaseTool, Generic[Context]):
             try:
                 context = await self._ensure_browser_initialized()
 
-                # Get max content length from config
-                max_content_length = getattr(
-                    config.browser_config, "max_content_length", 2000
-                )
-
                 # Navigation actions
                 if action == "go_to_url":
                     if not url:
@@ -379,69 +414,7 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                         )
 
                     page = await context.get_current_page()
-                    import markdownify
-
-                    content = markdownify.markdownify(await page.content())
-
-                    prompt = f"""\
-Your task is to extract the content of the page. You will be given a page and a goal, and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format.
-Extraction goal: {goal}
-
-Page content:
-{content[:max_content_length]}
-"""
-                    messages = [{"role": "system", "content": prompt}]
-
-                    # Define extraction function schema
-                    extraction_function = {
-                        "type": "function",
-                        "function": {
-                            "name": "extract_content",
-                            "description": "Extract specific information from a webpage based on a goal",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {
-                                    "extracted_content": {
-                                        "type": "object",
-                                        "description": "The content extracted from the page according to the goal",
-                                        "properties": {
-                                            "text": {
-                                                "type": "string",
-                                                "description": "Text content extracted from the page",
-                                            },
-                                            "metadata": {
-                                                "type": "object",
-                                                "description": "Additional metadata about the extracted content",
-                                                "properties": {
-                                                    "source": {
-                                                        "type": "string",
-                                                        "description": "Source of the extracted content",
-                                                    }
-                                                },
-                                            },
-                                        },
-                                    }
-                                },
-                                "required": ["extracted_content"],
-                            },
-                        },
-                    }
-
-                    # Use LLM to extract content with required function calling
-                    response = await self.llm.ask_tool(
-                        messages,
-                        tools=[extraction_function],
-                        tool_choice="required",
-                    )
-
-                    if response and response.tool_calls:
-                        args = json.loads(response.tool_calls[0].function.arguments)
-                        extracted_content = args.get("extracted_content", {})
-                        return ToolResult(
-                            output=f"Extracted from page:\n{extracted_content}\n"
-                        )
-
-                    return ToolResult(output="No content was extracted from the page.")
+                    return await self._extract_content(await page.content(), goal)
 
                 # Tab management actions
                 elif action == "switch_tab":
@@ -476,6 +449,170 @@ Page content:
             except Exception as e:
                 return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
 
+    async def _extract_content(self, html: str, goal: str) -> ToolResult:
+        """Extract content for a goal from a page, chunk by chunk.
+
+        The page is converted to markdown and split into token-bounded chunks
+        in a worker thread. Chunks are extracted concurrently, in page order,
+        and extraction stops early once a chunk fully satisfies the goal. The
+        results of all extracted chunks are merged in page order.
+        """
+        settings = config.browser_config or BrowserSettings()
+        chunks = await asyncio.to_thread(
+            self._markdown_chunks, html, settings.extract_chunk_tokens
+        )
+        if len(chunks) > settings.extract_max_chunks:
+            logger.warning(
+                f"Page has {len(chunks)} chunks, extracting the first "
+                f"{settings.extract_max_chunks}"
+            )
+            chunks = chunks[: settings.extract_max_chunks]
+
+        # Define extraction function schema
+        extraction_function = {
+            "type": "function",
+            "function": {
+                "name": "extract_content",
+                "description": "Extract specific information from a webpage based on a goal",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "extracted_content": {
+                            "type": "object",
+                            "description": "The content extracted from the page according to the goal",
+                            "properties": {
+                                "text": {
+                                    "type": "string",
+                                    "description": "Text content extracted from the page",
+                                },
+                                "metadata": {
+                                    "type": "object",
+                                    "description": "Additional metadata about the extracted content",
+                                    "properties": {
+                                        "source": {
+                                            "type": "string",
+                                            "description": "Source of the extracted content",
+                                        }
+                                    },
+                                },
+                            },
+                        },
+                        "goal_satisfied": {
+                            "type": "boolean",
+                            "description": "Whether the extracted content fully satisfies the goal, so that the rest of the page is not needed",
+                        },
+                    },
+                    "required": ["extracted_content"],
+                },
+            },
+        }
+
+        limit = asyncio.Semaphore(max(1, settings.extract_concurrency))
+
+        async def extract(index: int) -> Optional[dict]:
+            async with limit:
+                part = (
+                    f" This is part {index + 1} of {len(chunks)} of the page."
+                    if len(chunks) > 1
+                    else ""
+                )
+                prompt = f"""\
+Your task is to extract the content of the page. You will be given a page and a goal, and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format.{part}
+Extraction goal: {goal}
+
+Page content:
+{chunks[index]}
+"""
+                messages = [{"role": "system", "content": prompt}]
+
+                # Use LLM to extract content with required function calling
+                try:
+                    response = await self.llm.ask_tool(
+                        messages,
+                        tools=[extraction_function],
+                        tool_choice="required",
+                    )
+                    if response and response.tool_calls:
+                        args = json.loads(response.tool_calls[0].function.arguments)
+                        if isinstance(args, dict):
+                            return args
+                except Exception as e:
+                    # Skip the chunk, the others still make a partial result
+                    logger.warning(
+                        f"Failed to extract part {index + 1} of the page: {e}"
+                    )
+                return None
+
+        tasks = [asyncio.create_task(extract(i)) for i in range(len(chunks))]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                args = await finished
+                if args and args.get("goal_satisfied"):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        extracted = [
+            task.result().get("extracted_content")
+            for task in tasks
+            if not task.cancelled() and task.exception() is None and task.result()
+        ]
+        extracted = [part for part in extracted if isinstance(part, dict)]
+        if not extracted:
+            return ToolResult(output="No content was extracted from the page.")
+        if len(extracted) == 1:
+            return ToolResult(output=f"Extracted from page:\n{extracted[0]}\n")
+
+        merged = {
+            "text": "\n\n".join(
+                str(part["text"]) for part in extracted if part.get("text")
+            ),
+            "metadata": {
+                "source": next(
+                    (
+                        part["metadata"]["source"]
+                        for part in extracted
+                        if isinstance(part.get("metadata"), dict)
+                        and part["metadata"].get("source")
+                    ),
+                    "",
+                ),
+                "chunks": f"{len(extracted)} of {len(chunks)}",
+            },
+        }
+        return ToolResult(output=f"Extracted from page:\n{merged}\n")
+
+    def _markdown_chunks(self, html: str, max_tokens: int) -> List[str]:
+        """Convert a page to markdown and split it into chunks of max_tokens"""
+        import markdownify
+
+        content = markdownify.markdownify(html)
+        chunks, current, current_tokens = [], [], 0
+        for block in re.split(r"\n\s*\n", content):
+            block = block.strip()
+            if not block:
+                continue
+            tokens = self.llm.count_tokens(block)
+            if tokens > max_tokens:
+                # Split oversized blocks evenly by characters
+                pieces = math.ceil(tokens / max_tokens)
+                size = math.ceil(len(block) / pieces)
+                blocks = [block[i : i + size] for i in range(0, len(block), size)]
+                tokens = max_tokens
+            else:
+                blocks = [block]
+            for piece in blocks:
+                if current and current_tokens + tokens > max_tokens:
+                    chunks.append("\n\n".join(current))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
     async def get_current_state(
         self, context: Optional[BrowserContext] = None
     ) -> ToolResult:
@@ -484,8 +621,10 @@ Page content:
         If context is not provided, uses self.context.
         """
         try:
-            # Use provided context or fall back to self.context
-            ctx = context or self.context
+            # Use provided context or fall back to the tool's leased context
+            ctx = context or (
+                await self._ensure_browser_initialized() if self.context else None
+            )
             if not ctx:
                 return ToolResult(error="Browser context not initialized")
 
@@ -504,11 +643,18 @@ Page content:
             await page.bring_to_front()
             await page.wait_for_load_state()
 
-            screenshot = await page.screenshot(
-                full_page=True, animations="disabled", type="jpeg", quality=100
+            screenshot, screenshot_note = await self._capture_screenshot(
+                page, state.url
             )
 
-            screenshot = base64.b64encode(screenshot).decode("utf-8")
+            elements = (
+                state.element_tree.clickable_elements_to_string()
+                if state.element_tree
+                else ""
+            )
+            elements_diff = self._diff_elements(
+                state.url, elements, getattr(state, "selector_map", None) or {}
+            )
 
             # Build the state info with all required fields
             state_info = {
@@ -516,11 +662,7 @@ Page content:
                 "title": state.title,
                 "tabs": [tab.model_dump() for tab in state.tabs],
                 "help": "[0], [1], [2], etc., represent clickable indices corresponding to the elements listed. Clicking on these indices will navigate to or interact with the respective content behind them.",
-                "interactive_elements": (
-                    state.element_tree.clickable_elements_to_string()
-                    if state.element_tree
-                    else ""
-                ),
+                "interactive_elements": elements,
                 "scroll_info": {
                     "pixels_above": getattr(state, "pixels_above", 0),
                     "pixels_below": getattr(state, "pixels_below", 0),
@@ -530,34 +672,171 @@ Page content:
                 },
                 "viewport_height": viewport_height,
             }
+            if elements_diff is not None:
+                state_info["interactive_elements_diff"] = elements_diff
+            if screenshot_note:
+                state_info["screenshot"] = screenshot_note
 
             return ToolResult(
-                output=json.dumps(state_info, indent=4, ensure_ascii=False),
+                output=json.dumps(
+                    state_info, separators=(",", ":"), ensure_ascii=False
+                ),
                 base64_image=screenshot,
             )
         except Exception as e:
             return ToolResult(error=f"Failed to get browser state: {str(e)}")
 
+    def _diff_elements(
+        self, url: str, elements: str, selector_map: Dict[int, Any]
+    ) -> Optional[dict]:
+        """Diff interactive elements against the previous state of the same page.
+
+        Elements are matched by xpath. Returns their changes since the last
+        state, or None when the full element list should be sent: on the
+        first state, after navigation, in full observation mode, or when most
+        elements changed anyway. The baseline is the last state this tool
+        returned, a caller that no longer has it in context, e.g. after
+        trimming memory or for a new conversation, must call
+        reset_observations() first.
+        """
+        settings = config.browser_config or BrowserSettings()
+        current = _index_elements(elements, selector_map)
+        tree_hash = hashlib.sha1(elements.encode("utf-8")).hexdigest()
+        previous, self._last_elements = self._last_elements, (url, tree_hash, current)
+        if (
+            settings.observation_mode != "diff"
+            or previous is None
+            or previous[0] != url
+        ):
+            return None
+        if previous[1] == tree_hash:
+            return {"unchanged": True}
+
+        before = previous[2]
+        added, changed, moved = [], [], []
+        for xpath, (index, line) in current.items():
+            if xpath not in before:
+                added.append(f"[{index}]{line}")
+            elif before[xpath][1] != line:
+                changed.append(f"[{index}]{line}")
+            elif before[xpath][0] != index:
+                moved.append((before[xpath][0], index))
+        removed = [
+            index for xpath, (index, _) in before.items() if xpath not in current
+        ]
+        if 2 * (len(added) + len(changed) + len(removed)) > len(current):
+            return None
+
+        # Describe unchanged elements that got new indices as shifted runs
+        renumbered = []
+        run_start = 0
+        for i in range(1, len(moved) + 1):
+            if (
+                i < len(moved)
+                and moved[i][0] == moved[i - 1][0] + 1
+                and moved[i][1] == moved[i - 1][1] + 1
+            ):
+                continue
+            (old_first, new_first), (old_last, new_last) = (
+                moved[run_start],
+                moved[i - 1],
+            )
+            if old_first == old_last:
+                renumbered.append(f"[{old_first}] is now [{new_first}]")
+            else:
+                renumbered.append(
+                    f"[{old_first}]-[{old_last}] are now [{new_first}]-[{new_last}]"
+                )
+            run_start = i
+
+        return {
+            "added": "\n".join(added),
+            "changed": "\n".join(changed),
+            "removed": removed,
+            "renumbered": renumbered,
+        }
+
+    async def _capture_screenshot(self, page, url: str) -> Tuple[Optional[str], str]:
+        """Capture a downscaled screenshot of the page.
+
+        Returns the base64 JPEG, or None with a note when the page looks the
+        same as in the last screenshot sent.
+        """
+        settings = config.browser_config or BrowserSettings()
+        viewport = page.viewport_size
+        # Encode at the final quality directly when no downscaling is needed
+        fits = (
+            not settings.screenshot_full_page
+            and viewport is not None
+            and viewport["width"] <= settings.screenshot_max_width
+            and viewport["height"] <= settings.screenshot_max_height
+        )
+        data = await page.screenshot(
+            full_page=settings.screenshot_full_page,
+            animations="disabled",
+            type="jpeg",
+            quality=settings.screenshot_quality if fits else 100,
+            scale="css",
+        )
+        image, image_hash, size = await asyncio.to_thread(
+            _process_screenshot,
+            data,
+            settings.screenshot_max_width,
+            settings.screenshot_max_height,
+            settings.screenshot_quality,
+        )
+
+        stats = self._screenshot_stats
+        stats["captured"] += 1
+        stats["captured_bytes"] += len(data)
+
+        threshold = settings.screenshot_dedup_threshold
+        if threshold is not None and self._last_screenshot:
+            last_url, last_hash = self._last_screenshot
+            if last_url == url and bin(last_hash ^ image_hash).count("1") <= threshold:
+                stats["deduplicated"] += 1
+                logger.debug(f"Screenshot of {url} unchanged, not sending it again")
+                return None, "unchanged since the previous screenshot"
+
+        self._last_screenshot = (url, image_hash)
+        stats["sent"] += 1
+        stats["sent_bytes"] += len(image)
+        logger.debug(
+            f"Screenshot {size[0]}x{size[1]}: {len(image)} bytes sent, "
+            f"{len(data)} bytes captured"
+        )
+        return base64.b64encode(image).decode("utf-8"), ""
+
+    def get_screenshot_stats(self) -> Dict[str, float]:
+        """Get screenshot counters, including average bytes sent per screenshot"""
+        stats = dict(self._screenshot_stats)
+        stats["avg_sent_bytes"] = (
+            stats["sent_bytes"] / stats["sent"] if stats["sent"] else 0
+        )
+        return stats
+
+    def reset_observations(self) -> None:
+        """Forget the last state sent, so the next one is sent in full."""
+        self._last_elements = None
+        self._last_screenshot = None
+
     async def cleanup(self):
-        """Clean up browser resources."""
+        """Return the browser context to the shared pool."""
         async with self.lock:
+            self.reset_observations()
             if self.context is not None:
-                await self.context.close()
+                await self._pool.release(self)
                 self.context = None
                 self.dom_service = None
-            if self.browser is not None:
-                await self.browser.close()
-                self.browser = None
 
     def __del__(self):
-        """Ensure cleanup when object is destroyed."""
-        if self.browser is not None or self.context is not None:
+        """Ensure the context is returned to the pool when object is destroyed."""
+        if self.context is not None and self._pool is not None:
             try:
-                asyncio.run(self.cleanup())
+                asyncio.get_running_loop().create_task(self._pool.release(self))
             except RuntimeError:
-                loop = asyncio.new_event_loop()
-                loop.run_until_complete(self.cleanup())
-                loop.close()
+                # The pool's event loop is gone, and its contexts with it
+                pass
 
     @classmethod
     def create_with_context(cls, context: Context) -> "BrowserUseTool[Context]":
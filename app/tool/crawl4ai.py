@@ -6,7 +6,7 @@ providing fast, precise, and AI-ready data extraction with clean Markdown genera
 """
 
 import asyncio
-from typing import List, Union
+from typing import Any, List, Optional, Union
 from urllib.parse import urlparse
 
 from app.logger import logger
@@ -26,7 +26,7 @@ class Crawl4aiTool(BaseTool):
     Features:
     - Extracts clean markdown content optimized for LLMs
     - Handles JavaScript-heavy sites and dynamic content
-    - Supports multiple URLs in a single request
+    - Supports multiple URLs in a single request, crawled concurrently
     - Fast and reliable with built-in error handling
 
     Perfect for content analysis, research, and feeding web content to AI models."""
@@ -61,6 +61,22 @@ class Crawl4aiTool(BaseTool):
         },
         "required": ["urls"],
     }
+    concurrency_safe: bool = True
+
+    # Crawl limits: URLs crawled at once, and at once per domain, and the
+    # minimum delay in seconds between starting requests to the same domain
+    max_concurrency: int = 5
+    max_per_domain: int = 2
+    domain_delay: float = 0.5
+    # Seconds without crawls after which the shared browser is closed
+    idle_timeout: float = 300.0
+
+    _crawler: Optional[Any] = None
+    _crawler_loop: Optional[asyncio.AbstractEventLoop] = None
+    _crawler_lock: Optional[asyncio.Lock] = None
+    _idle_task: Optional[asyncio.Task] = None
+    _active_calls: int = 0
+    _last_used: float = 0.0
 
     async def execute(
         self,
@@ -100,21 +116,7 @@ class Crawl4aiTool(BaseTool):
 
         try:
             # Import crawl4ai components
-            from crawl4ai import (
-                AsyncWebCrawler,
-                BrowserConfig,
-                CacheMode,
-                CrawlerRunConfig,
-            )
-
-            # Configure browser settings
-            browser_config = BrowserConfig(
-                headless=True,
-                verbose=False,
-                browser_type="chromium",
-                ignore_https_errors=True,
-                java_script_enabled=True,
-            )
+            from crawl4ai import CacheMode, CrawlerRunConfig
 
             # Configure crawler settings
             run_config = CrawlerRunConfig(
@@ -128,90 +130,50 @@ class Crawl4aiTool(BaseTool):
                 wait_until="domcontentloaded",
             )
 
-            results = []
-            successful_count = 0
-            failed_count = 0
-
-            # Process each URL
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                for url in valid_urls:
-                    try:
-                        logger.info(f"🕷️ Crawling URL: {url}")
-                        start_time = asyncio.get_event_loop().time()
-
-                        result = await crawler.arun(url=url, config=run_config)
-
-                        end_time = asyncio.get_event_loop().time()
-                        execution_time = end_time - start_time
-
-                        if result.success:
-                            # Count words in markdown
-                            word_count = 0
-                            if hasattr(result, "markdown") and result.markdown:
-                                word_count = len(result.markdown.split())
-
-                            # Count links
-                            links_count = 0
-                            if hasattr(result, "links") and result.links:
-                                internal_links = result.links.get("internal", [])
-                                external_links = result.links.get("external", [])
-                                links_count = len(internal_links) + len(external_links)
-
-                            # Count images
-                            images_count = 0
-                            if hasattr(result, "media") and result.media:
-                                images = result.media.get("images", [])
-                                images_count = len(images)
-
-                            results.append(
-                                {
-                                    "url": url,
-                                    "success": True,
-                                    "status_code": getattr(result, "status_code", 200),
-                                    "title": result.metadata.get("title")
-                                    if result.metadata
-                                    else None,
-                                    "markdown": result.markdown
-                                    if hasattr(result, "markdown")
-                                    else None,
-                                    "word_count": word_count,
-                                    "links_count": links_count,
-                                    "images_count": images_count,
-                                    "execution_time": execution_time,
-                                }
-                            )
-                            successful_count += 1
-                            logger.info(
-                                f"✅ Successfully crawled {url} in {execution_time:.2f}s"
-                            )
-
-                        else:
-                            results.append(
-                                {
-                                    "url": url,
-                                    "success": False,
-                                    "error_message": getattr(
-                                        result, "error_message", "Unknown error"
-                                    ),
-                                    "execution_time": execution_time,
-                                }
-                            )
-                            failed_count += 1
-                            logger.warning(f"❌ Failed to crawl {url}")
-
-                    except Exception as e:
-                        error_msg = f"Error crawling {url}: {str(e)}"
-                        logger.error(error_msg)
-                        results.append(
-                            {"url": url, "success": False, "error_message": error_msg}
-                        )
-                        failed_count += 1
+            # Crawl concurrently, bounded overall and per domain, sharing the
+            # tool's browser. Results are reported as they complete and listed in the
+            # order of the given URLs.
+            concurrency = asyncio.Semaphore(max(1, self.max_concurrency))
+            domain_limits = {}
+            domain_last_start = {}
+
+            async def crawl(url: str) -> dict:
+                domain = urlparse(url).netloc.lower()
+                if domain not in domain_limits:
+                    domain_limits[domain] = asyncio.Semaphore(
+                        max(1, self.max_per_domain)
+                    )
+                async with domain_limits[domain]:
+                    # Space out requests to the same domain
+                    loop = asyncio.get_running_loop()
+                    next_start = domain_last_start.get(domain, 0) + self.domain_delay
+                    domain_last_start[domain] = max(loop.time(), next_start)
+                    await asyncio.sleep(max(0, next_start - loop.time()))
+                    async with concurrency:
+                        result = await self._crawl_url(url, run_config)
+                return result
+
+            wall_start = asyncio.get_event_loop().time()
+            self._active_calls += 1
+            try:
+                results = await asyncio.gather(*(crawl(url) for url in valid_urls))
+            finally:
+                self._active_calls -= 1
+                self._last_used = asyncio.get_event_loop().time()
+            wall_time = asyncio.get_event_loop().time() - wall_start
+
+            successful_count = sum(1 for result in results if result["success"])
+            failed_count = len(results) - successful_count
 
             # Format output
             output_lines = [f"🕷️ Crawl4AI Results Summary:"]
             output_lines.append(f"📊 Total URLs: {len(valid_urls)}")
             output_lines.append(f"✅ Successful: {successful_count}")
             output_lines.append(f"❌ Failed: {failed_count}")
+            crawl_time = sum(result["execution_time"] for result in results)
+            output_lines.append(
+                f"⏱️ Total time: {wall_time:.2f}s ({crawl_time:.2f}s of crawling)"
+            )
             output_lines.append("")
 
             for i, result in enumerate(results, 1):
@@ -257,6 +219,149 @@ class Crawl4aiTool(BaseTool):
             logger.error(error_msg)
             return ToolResult(error=error_msg)
 
+    async def _get_crawler(self):
+        """Get the shared crawler, starting a new browser if it is not running."""
+        loop = asyncio.get_running_loop()
+        if self._crawler_lock is None or self._crawler_loop not in (None, loop):
+            # Locks and browsers are bound to the event loop they were used in
+            self._crawler_lock = asyncio.Lock()
+        async with self._crawler_lock:
+            if self._crawler is not None and (
+                self._crawler_loop is not loop or not self._is_healthy(self._crawler)
+            ):
+                logger.warning("🕷️ Crawler browser is not running, restarting it")
+                await self._close_crawler()
+            if self._crawler is None:
+                from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+                # Configure browser settings
+                browser_config = BrowserConfig(
+                    headless=True,
+                    verbose=False,
+                    browser_type="chromium",
+                    ignore_https_errors=True,
+                    java_script_enabled=True,
+                )
+                crawler = AsyncWebCrawler(config=browser_config)
+                await crawler.start()
+                self._crawler = crawler
+                self._crawler_loop = loop
+                self._last_used = loop.time()
+                self._idle_task = asyncio.create_task(self._close_when_idle())
+            return self._crawler
+
+    @staticmethod
+    def _is_healthy(crawler) -> bool:
+        """Check whether the crawler's browser is still connected."""
+        browser_manager = getattr(crawler.crawler_strategy, "browser_manager", None)
+        browser = getattr(browser_manager, "browser", None)
+        if browser is None:
+            # Persistent contexts have no browser object to check
+            return getattr(crawler, "ready", True)
+        return browser.is_connected()
+
+    async def _close_when_idle(self) -> None:
+        """Close the browser once no crawl has used it for idle_timeout seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            idle_for = loop.time() - self._last_used
+            if self._active_calls == 0 and idle_for >= self.idle_timeout:
+                async with self._crawler_lock:
+                    # A crawl may have started while waiting for the lock
+                    idle_for = loop.time() - self._last_used
+                    if self._active_calls == 0 and idle_for >= self.idle_timeout:
+                        logger.info("🕷️ Closing idle crawler browser")
+                        self._idle_task = None
+                        await self._close_crawler()
+                        return
+            await asyncio.sleep(max(self.idle_timeout - idle_for, 1))
+
+    async def _close_crawler(self) -> None:
+        crawler, self._crawler = self._crawler, None
+        if self._idle_task and self._idle_task is not asyncio.current_task():
+            self._idle_task.cancel()
+        self._idle_task = None
+        if crawler is None:
+            return
+        try:
+            await crawler.close()
+        except Exception as e:
+            logger.warning(f"Error closing crawler browser: {e}")
+
+    async def cleanup(self):
+        """Close the shared crawler browser."""
+        if self._crawler_lock is None:
+            return
+        async with self._crawler_lock:
+            await self._close_crawler()
+
+    async def _crawl_url(self, url: str, run_config) -> dict:
+        """Crawl a single URL and summarize the result.
+
+        If the browser crashed, it is restarted and the URL crawled once more.
+        """
+        start_time = asyncio.get_event_loop().time()
+        try:
+            logger.info(f"🕷️ Crawling URL: {url}")
+            crawler = await self._get_crawler()
+            try:
+                result = await crawler.arun(url=url, config=run_config)
+            except Exception:
+                if self._is_healthy(crawler):
+                    raise
+                crawler = await self._get_crawler()
+                result = await crawler.arun(url=url, config=run_config)
+        except Exception as e:
+            error_msg = f"Error crawling {url}: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "url": url,
+                "success": False,
+                "error_message": error_msg,
+                "execution_time": asyncio.get_event_loop().time() - start_time,
+            }
+        execution_time = asyncio.get_event_loop().time() - start_time
+
+        if not result.success:
+            logger.warning(f"❌ Failed to crawl {url}")
+            return {
+                "url": url,
+                "success": False,
+                "error_message": getattr(result, "error_message", "Unknown error"),
+                "execution_time": execution_time,
+            }
+
+        # Count words in markdown
+        word_count = 0
+        if hasattr(result, "markdown") and result.markdown:
+            word_count = len(result.markdown.split())
+
+        # Count links
+        links_count = 0
+        if hasattr(result, "links") and result.links:
+            internal_links = result.links.get("internal", [])
+            external_links = result.links.get("external", [])
+            links_count = len(internal_links) + len(external_links)
+
+        # Count images
+        images_count = 0
+        if hasattr(result, "media") and result.media:
+            images = result.media.get("images", [])
+            images_count = len(images)
+
+        logger.info(f"✅ Successfully crawled {url} in {execution_time:.2f}s")
+        return {
+            "url": url,
+            "success": True,
+            "status_code": getattr(result, "status_code", 200),
+            "title": result.metadata.get("title") if result.metadata else None,
+            "markdown": result.markdown if hasattr(result, "markdown") else None,
+            "word_count": word_count,
+            "links_count": links_count,
+            "images_count": images_count,
+            "execution_time": execution_time,
+        }
+
     def _is_valid_url(self, url: str) -> bool:
         """Validate if a URL is properly formatted."""
         try:
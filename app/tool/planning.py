@@ -1,6 +1,9 @@
 # tool/planning.py
+import re
 from typing import Dict, List, Literal, Optional
 
+from pydantic import BaseModel
+
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
 
@@ -11,6 +14,255 @@ The tool provides functionality for creating plans, updating plan steps, and tra
 """
 
 
+_STEP_STATUSES = ["not_started", "in_progress", "completed", "blocked"]
+_ACTIVE_STEP_STATUSES = ("not_started", "in_progress")
+_STEP_STATUS_MARKS = {
+    "not_started": "[ ]",
+    "in_progress": "[→]",
+    "completed": "[✓]",
+    "blocked": "[!]",
+}
+_STEP_TYPE = re.compile(r"\[([A-Z_]+)\]")
+
+
+class Plan(BaseModel):
+    """A plan and the state of its steps.
+
+    Besides the steps, a plan keeps an index of its ready steps (active steps
+    whose dependencies are all completed), status counts and its formatted
+    text. They are updated on each change, so looking up the next steps or the
+    plan text does not scan and format every step again. Change a plan only
+    through its methods to keep them in sync.
+    """
+
+    plan_id: str
+    title: str
+    steps: List[str]
+    step_statuses: List[str]
+    step_notes: List[str]
+    # For each step, the indices of the steps it waits for. None means every
+    # step waits for the previous one
+    step_dependencies: Optional[List[List[int]]] = None
+
+    _step_types: List[Optional[str]] = []
+    _dependents: List[List[int]] = []
+    _pending_dependencies: List[int] = []
+    _ready: set = set()
+    _status_counts: Dict[str, int] = {}
+    _step_lines: List[str] = []
+    _text: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        plan_id: str,
+        title: str,
+        steps: List[str],
+        dependencies: Optional[List[List[int]]] = None,
+    ) -> "Plan":
+        """Create a plan with every step not started."""
+        return cls(
+            plan_id=plan_id,
+            title=title,
+            steps=steps,
+            step_statuses=["not_started"] * len(steps),
+            step_notes=[""] * len(steps),
+            step_dependencies=cls._check_dependencies(dependencies, steps),
+        )
+
+    def model_post_init(self, __context) -> None:
+        self._build_index()
+
+    @property
+    def dependencies(self) -> List[List[int]]:
+        """The indices of the steps each step waits for."""
+        if self.step_dependencies is None:
+            return [[i - 1] if i else [] for i in range(len(self.steps))]
+        return self.step_dependencies
+
+    @staticmethod
+    def _check_dependencies(
+        dependencies: Optional[List[List[int]]], steps: List[str]
+    ) -> Optional[List[List[int]]]:
+        """Validate step dependencies, None means every step follows the previous one."""
+        if dependencies is None:
+            return None
+
+        if not isinstance(dependencies, list) or len(dependencies) != len(steps):
+            raise ToolError(
+                f"Parameter `dependencies` must have one list of step indices per step ({len(steps)} steps)"
+            )
+
+        checked = []
+        for i, step_dependencies in enumerate(dependencies):
+            if not isinstance(step_dependencies, list) or not all(
+                isinstance(index, int) and 0 <= index < i for index in step_dependencies
+            ):
+                raise ToolError(
+                    f"Invalid dependencies for step {i}: {step_dependencies}. A step can only depend on earlier steps (0 to {i - 1})."
+                )
+            checked.append(sorted(set(step_dependencies)))
+        return checked
+
+    def _build_index(self) -> None:
+        dependencies = self.dependencies
+        self._step_types = []
+        for step in self.steps:
+            # Step type from the text (e.g., [SEARCH] or [CODE])
+            type_match = _STEP_TYPE.search(step)
+            self._step_types.append(type_match.group(1).lower() if type_match else None)
+
+        self._dependents = [[] for _ in self.steps]
+        self._pending_dependencies = [0] * len(self.steps)
+        for i, step_dependencies in enumerate(dependencies):
+            for j in step_dependencies:
+                self._dependents[j].append(i)
+                if self.step_statuses[j] != "completed":
+                    self._pending_dependencies[i] += 1
+
+        self._status_counts = {status: 0 for status in _STEP_STATUSES}
+        for status in self.step_statuses:
+            self._status_counts[status] = self._status_counts.get(status, 0) + 1
+
+        self._ready = {i for i in range(len(self.steps)) if self._is_ready(i)}
+        self._step_lines = [self._format_step(i) for i in range(len(self.steps))]
+        self._text = None
+
+    def _format_step(self, index: int) -> str:
+        status_symbol = _STEP_STATUS_MARKS.get(self.step_statuses[index], "[ ]")
+        line = f"{index}. {status_symbol} {self.steps[index]}\n"
+        if self.step_dependencies and self.step_dependencies[index]:
+            depends_on = ", ".join(map(str, self.step_dependencies[index]))
+            line += f"   Depends on: {depends_on}\n"
+        if self.step_notes[index]:
+            line += f"   Notes: {self.step_notes[index]}\n"
+        return line
+
+    def _is_ready(self, index: int) -> bool:
+        return (
+            self.step_statuses[index] in _ACTIVE_STEP_STATUSES
+            and self._pending_dependencies[index] == 0
+        )
+
+    def _update_ready(self, index: int) -> None:
+        if self._is_ready(index):
+            self._ready.add(index)
+        else:
+            self._ready.discard(index)
+
+    def ready_steps(self) -> List[int]:
+        """Indices of the active steps whose dependencies are all completed, in order."""
+        return sorted(self._ready)
+
+    def step_type(self, index: int) -> Optional[str]:
+        """The lowercase [TYPE] tag of a step, if it has one."""
+        return self._step_types[index]
+
+    def count(self, status: str) -> int:
+        """Number of steps with the given status."""
+        return self._status_counts.get(status, 0)
+
+    def set_title(self, title: str) -> None:
+        """Rename the plan."""
+        self.title = title
+        self._text = None
+
+    def set_steps(
+        self, steps: List[str], dependencies: Optional[List[List[int]]] = None
+    ) -> None:
+        """Replace the steps, keeping status and notes of steps left unchanged."""
+        new_dependencies = self._check_dependencies(dependencies, steps)
+        new_statuses = []
+        new_notes = []
+
+        for i, step in enumerate(steps):
+            # If the step exists at the same position in old steps, preserve status and notes
+            if i < len(self.steps) and step == self.steps[i]:
+                new_statuses.append(self.step_statuses[i])
+                new_notes.append(self.step_notes[i])
+            else:
+                new_statuses.append("not_started")
+                new_notes.append("")
+
+        self.steps = steps
+        self.step_statuses = new_statuses
+        self.step_notes = new_notes
+        # Step indices may have shifted, so old dependencies no longer apply
+        self.step_dependencies = new_dependencies
+        self._build_index()
+
+    def set_dependencies(self, dependencies: Optional[List[List[int]]]) -> None:
+        """Replace the dependencies of the steps."""
+        self.step_dependencies = self._check_dependencies(dependencies, self.steps)
+        self._build_index()
+
+    def mark_step(
+        self,
+        index: int,
+        status: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> None:
+        """Set the status and/or notes of a step."""
+        if index < 0 or index >= len(self.steps):
+            raise ToolError(
+                f"Invalid step_index: {index}. Valid indices range from 0 to {len(self.steps)-1}."
+            )
+
+        if status and status not in _STEP_STATUSES:
+            raise ToolError(
+                f"Invalid step_status: {status}. Valid statuses are: {', '.join(_STEP_STATUSES)}"
+            )
+
+        if status and status != self.step_statuses[index]:
+            old_status = self.step_statuses[index]
+            self.step_statuses[index] = status
+            self._status_counts[old_status] -= 1
+            self._status_counts[status] += 1
+
+            # Only a step becoming or ceasing to be completed affects its dependents
+            change = (old_status == "completed") - (status == "completed")
+            if change:
+                for dependent in self._dependents[index]:
+                    self._pending_dependencies[dependent] += change
+                    self._update_ready(dependent)
+            self._update_ready(index)
+
+        if notes:
+            self.step_notes[index] = notes
+
+        if status or notes:
+            self._step_lines[index] = self._format_step(index)
+            self._text = None
+
+    def format(self) -> str:
+        """Format the plan for display."""
+        if self._text is not None:
+            return self._text
+
+        output = f"Plan: {self.title} (ID: {self.plan_id})\n"
+        output += "=" * len(output) + "\n\n"
+
+        # Progress statistics
+        total_steps = len(self.steps)
+        completed = self.count("completed")
+
+        output += f"Progress: {completed}/{total_steps} steps completed "
+        if total_steps > 0:
+            percentage = (completed / total_steps) * 100
+            output += f"({percentage:.1f}%)\n"
+        else:
+            output += "(0%)\n"
+
+        output += (
+            f"Status: {completed} completed, {self.count('in_progress')} in progress, "
+            f"{self.count('blocked')} blocked, {self.count('not_started')} not started\n\n"
+        )
+        output += "Steps:\n"
+
+        self._text = output + "".join(self._step_lines)
+        return self._text
+
+
 class PlanningTool(BaseTool):
     """
     A planning tool that allows the agent to create and manage plans for solving complex tasks.
@@ -48,6 +300,11 @@ class PlanningTool(BaseTool):
                 "type": "array",
                 "items": {"type": "string"},
             },
+            "dependencies": {
+                "description": "For each step, the 0-based indices of earlier steps that must be completed before it can start. Steps without dependencies can run in parallel. Optional for create and update commands; if omitted, every step depends on the previous one.",
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "integer"}},
+            },
             "step_index": {
                 "description": "Index of the step to update (0-based). Required for mark_step command.",
                 "type": "integer",
@@ -66,7 +323,7 @@ class PlanningTool(BaseTool):
         "additionalProperties": False,
     }
 
-    plans: dict = {}  # Dictionary to store plans by plan_id
+    plans: Dict[str, Plan] = {}  # Dictionary to store plans by plan_id
     _current_plan_id: Optional[str] = None  # Track the current active plan
 
     async def execute(
@@ -78,6 +335,7 @@ class PlanningTool(BaseTool):
         plan_id: Optional[str] = None,
         title: Optional[str] = None,
         steps: Optional[List[str]] = None,
+        dependencies: Optional[List[List[int]]] = None,
         step_index: Optional[int] = None,
         step_status: Optional[
             Literal["not_started", "in_progress", "completed", "blocked"]
@@ -93,15 +351,16 @@ class PlanningTool(BaseTool):
         - plan_id: Unique identifier for the plan
         - title: Title for the plan (used with create command)
         - steps: List of steps for the plan (used with create command)
+        - dependencies: Indices of the steps each step waits for (used with create and update commands)
         - step_index: Index of the step to update (used with mark_step command)
         - step_status: Status to set for a step (used with mark_step command)
         - step_notes: Additional notes for a step (used with mark_step command)
         """
 
         if command == "create":
-            return self._create_plan(plan_id, title, steps)
+            return self._create_plan(plan_id, title, steps, dependencies)
         elif command == "update":
-            return self._update_plan(plan_id, title, steps)
+            return self._update_plan(plan_id, title, steps, dependencies)
         elif command == "list":
             return self._list_plans()
         elif command == "get":
@@ -117,10 +376,14 @@ class PlanningTool(BaseTool):
                 f"Unrecognized command: {command}. Allowed commands are: create, update, list, get, set_active, mark_step, delete"
             )
 
-    def _create_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
-    ) -> ToolResult:
-        """Create a new plan with the given ID, title, and steps."""
+    def create_plan(
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        dependencies: Optional[List[List[int]]] = None,
+    ) -> Plan:
+        """Create a new plan with the given ID, title, and steps, and make it active."""
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: create")
 
@@ -141,36 +404,32 @@ class PlanningTool(BaseTool):
                 "Parameter `steps` must be a non-empty list of strings for command: create"
             )
 
-        # Create a new plan with initialized step statuses
-        plan = {
-            "plan_id": plan_id,
-            "title": title,
-            "steps": steps,
-            "step_statuses": ["not_started"] * len(steps),
-            "step_notes": [""] * len(steps),
-        }
-
+        plan = Plan.create(plan_id, title, steps, dependencies)
         self.plans[plan_id] = plan
         self._current_plan_id = plan_id  # Set as active plan
+        return plan
 
-        return ToolResult(
-            output=f"Plan created successfully with ID: {plan_id}\n\n{self._format_plan(plan)}"
-        )
+    def add_plan(self, plan: Plan) -> Plan:
+        """Add an existing plan, e.g. one restored from a checkpoint, and make it active."""
+        self.plans[plan.plan_id] = plan
+        self._current_plan_id = plan.plan_id
+        return plan
 
-    def _update_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
-    ) -> ToolResult:
-        """Update an existing plan with new title or steps."""
+    def update_plan(
+        self,
+        plan_id: Optional[str],
+        title: Optional[str] = None,
+        steps: Optional[List[str]] = None,
+        dependencies: Optional[List[List[int]]] = None,
+    ) -> Plan:
+        """Update an existing plan with new title, steps or dependencies."""
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: update")
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
-        plan = self.plans[plan_id]
+        plan = self.get_plan(plan_id)
 
         if title:
-            plan["title"] = title
+            plan.set_title(title)
 
         if steps:
             if not isinstance(steps, list) or not all(
@@ -179,31 +438,65 @@ class PlanningTool(BaseTool):
                 raise ToolError(
                     "Parameter `steps` must be a list of strings for command: update"
                 )
+            plan.set_steps(steps, dependencies)
+        elif dependencies is not None:
+            plan.set_dependencies(dependencies)
 
-            # Preserve existing step statuses for unchanged steps
-            old_steps = plan["steps"]
-            old_statuses = plan["step_statuses"]
-            old_notes = plan["step_notes"]
+        return plan
+
+    def get_plan(self, plan_id: Optional[str] = None) -> Plan:
+        """Get a plan, the active plan if no plan_id is given."""
+        if not plan_id:
+            # If no plan_id is provided, use the current active plan
+            if not self._current_plan_id:
+                raise ToolError(
+                    "No active plan. Please specify a plan_id or set an active plan."
+                )
+            plan_id = self._current_plan_id
+
+        if plan_id not in self.plans:
+            raise ToolError(f"No plan found with ID: {plan_id}")
+
+        return self.plans[plan_id]
+
+    def mark_step(
+        self,
+        plan_id: Optional[str],
+        step_index: Optional[int],
+        step_status: Optional[str] = None,
+        step_notes: Optional[str] = None,
+    ) -> Plan:
+        """Mark a step with a specific status and optional notes."""
+        plan = self.get_plan(plan_id)
 
-            # Create new step statuses and notes
-            new_statuses = []
-            new_notes = []
+        if step_index is None:
+            raise ToolError("Parameter `step_index` is required for command: mark_step")
 
-            for i, step in enumerate(steps):
-                # If the step exists at the same position in old steps, preserve status and notes
-                if i < len(old_steps) and step == old_steps[i]:
-                    new_statuses.append(old_statuses[i])
-                    new_notes.append(old_notes[i])
-                else:
-                    new_statuses.append("not_started")
-                    new_notes.append("")
+        plan.mark_step(step_index, step_status, step_notes)
+        return plan
 
-            plan["steps"] = steps
-            plan["step_statuses"] = new_statuses
-            plan["step_notes"] = new_notes
+    def _create_plan(
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        dependencies: Optional[List[List[int]]] = None,
+    ) -> ToolResult:
+        plan = self.create_plan(plan_id, title, steps, dependencies)
+        return ToolResult(
+            output=f"Plan created successfully with ID: {plan_id}\n\n{plan.format()}"
+        )
 
+    def _update_plan(
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        dependencies: Optional[List[List[int]]] = None,
+    ) -> ToolResult:
+        plan = self.update_plan(plan_id, title, steps, dependencies)
         return ToolResult(
-            output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
+            output=f"Plan updated successfully: {plan_id}\n\n{plan.format()}"
         )
 
     def _list_plans(self) -> ToolResult:
@@ -216,42 +509,24 @@ class PlanningTool(BaseTool):
         output = "Available plans:\n"
         for plan_id, plan in self.plans.items():
             current_marker = " (active)" if plan_id == self._current_plan_id else ""
-            completed = sum(
-                1 for status in plan["step_statuses"] if status == "completed"
-            )
-            total = len(plan["steps"])
-            progress = f"{completed}/{total} steps completed"
-            output += f"• {plan_id}{current_marker}: {plan['title']} - {progress}\n"
+            progress = f"{plan.count('completed')}/{len(plan.steps)} steps completed"
+            output += f"• {plan_id}{current_marker}: {plan.title} - {progress}\n"
 
         return ToolResult(output=output)
 
     def _get_plan(self, plan_id: Optional[str]) -> ToolResult:
         """Get details of a specific plan."""
-        if not plan_id:
-            # If no plan_id is provided, use the current active plan
-            if not self._current_plan_id:
-                raise ToolError(
-                    "No active plan. Please specify a plan_id or set an active plan."
-                )
-            plan_id = self._current_plan_id
-
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
-        plan = self.plans[plan_id]
-        return ToolResult(output=self._format_plan(plan))
+        return ToolResult(output=self.get_plan(plan_id).format())
 
     def _set_active_plan(self, plan_id: Optional[str]) -> ToolResult:
         """Set a plan as the active plan."""
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: set_active")
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
+        plan = self.get_plan(plan_id)
         self._current_plan_id = plan_id
         return ToolResult(
-            output=f"Plan '{plan_id}' is now the active plan.\n\n{self._format_plan(self.plans[plan_id])}"
+            output=f"Plan '{plan_id}' is now the active plan.\n\n{plan.format()}"
         )
 
     def _mark_step(
@@ -261,46 +536,9 @@ class PlanningTool(BaseTool):
         step_status: Optional[str],
         step_notes: Optional[str],
     ) -> ToolResult:
-        """Mark a step with a specific status and optional notes."""
-        if not plan_id:
-            # If no plan_id is provided, use the current active plan
-            if not self._current_plan_id:
-                raise ToolError(
-                    "No active plan. Please specify a plan_id or set an active plan."
-                )
-            plan_id = self._current_plan_id
-
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
-        if step_index is None:
-            raise ToolError("Parameter `step_index` is required for command: mark_step")
-
-        plan = self.plans[plan_id]
-
-        if step_index < 0 or step_index >= len(plan["steps"]):
-            raise ToolError(
-                f"Invalid step_index: {step_index}. Valid indices range from 0 to {len(plan['steps'])-1}."
-            )
-
-        if step_status and step_status not in [
-            "not_started",
-            "in_progress",
-            "completed",
-            "blocked",
-        ]:
-            raise ToolError(
-                f"Invalid step_status: {step_status}. Valid statuses are: not_started, in_progress, completed, blocked"
-            )
-
-        if step_status:
-            plan["step_statuses"][step_index] = step_status
-
-        if step_notes:
-            plan["step_notes"][step_index] = step_notes
-
+        plan = self.mark_step(plan_id, step_index, step_status, step_notes)
         return ToolResult(
-            output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
+            output=f"Step {step_index} updated in plan '{plan.plan_id}'.\n\n{plan.format()}"
         )
 
     def _delete_plan(self, plan_id: Optional[str]) -> ToolResult:
@@ -318,46 +556,3 @@ class PlanningTool(BaseTool):
             self._current_plan_id = None
 
         return ToolResult(output=f"Plan '{plan_id}' has been deleted.")
-
-    def _format_plan(self, plan: Dict) -> str:
-        """Format a plan for display."""
-        output = f"Plan: {plan['title']} (ID: {plan['plan_id']})\n"
-        output += "=" * len(output) + "\n\n"
-
-        # Calculate progress statistics
-        total_steps = len(plan["steps"])
-        completed = sum(1 for status in plan["step_statuses"] if status == "completed")
-        in_progress = sum(
-            1 for status in plan["step_statuses"] if status == "in_progress"
-        )
-        blocked = sum(1 for status in plan["step_statuses"] if status == "blocked")
-        not_started = sum(
-            1 for status in plan["step_statuses"] if status == "not_started"
-        )
-
-        output += f"Progress: {completed}/{total_steps} steps completed "
-        if total_steps > 0:
-            percentage = (completed / total_steps) * 100
-            output += f"({percentage:.1f}%)\n"
-        else:
-            output += "(0%)\n"
-
-        output += f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
-        output += "Steps:\n"
-
-        # Add each step with its status and notes
-        for i, (step, status, notes) in enumerate(
-            zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
-        ):
-            status_symbol = {
-                "not_started": "[ ]",
-                "in_progress": "[→]",
-                "completed": "[✓]",
-                "blocked": "[!]",
-            }.get(status, "[ ]")
-
-            output += f"{i}. {status_symbol} {step}\n"
-            if notes:
-                output += f"   Notes: {notes}\n"
-
-        return output
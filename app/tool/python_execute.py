@@ -1,11 +1,217 @@
+import asyncio
+import atexit
+import builtins
 import multiprocessing
 import sys
+import uuid
 from io import StringIO
-from typing import Dict
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional
 
+from app.logger import logger
 from app.tool.base import BaseTool
 
 
+def _fresh_globals() -> dict:
+    return {"__builtins__": builtins.__dict__.copy()}
+
+
+def _run_code(code: str, safe_globals: dict) -> Dict:
+    original_stdout = sys.stdout
+    try:
+        output_buffer = StringIO()
+        sys.stdout = output_buffer
+        exec(code, safe_globals, safe_globals)
+        return {"observation": output_buffer.getvalue(), "success": True}
+    except (Exception, SystemExit) as e:
+        return {"observation": str(e), "success": False}
+    finally:
+        sys.stdout = original_stdout
+
+
+def _worker_main(conn: Connection) -> None:
+    """Serve code execution requests until the pipe is closed or None is received"""
+    session_globals = None
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        code, persistent = message
+        if persistent:
+            if session_globals is None:
+                session_globals = _fresh_globals()
+            exec_globals = session_globals
+        else:
+            exec_globals = _fresh_globals()
+        conn.send(_run_code(code, exec_globals))
+
+
+class _PythonWorker:
+    """A pre-forked interpreter process that executes snippets sent over a pipe"""
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        # Not a daemon, so user code may start its own processes
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+        self.tasks_run = 0
+
+    async def run(self, code: str, timeout: int, persistent: bool) -> Optional[Dict]:
+        """Execute code in the worker, returning None on timeout"""
+        self.tasks_run += 1
+        self.conn.send((code, persistent))
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self.conn.poll, timeout):
+            return None
+        return self.conn.recv()
+
+    def stop(self) -> None:
+        """Ask the worker to exit, killing it if it does not respond"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.5)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(1)
+        self.conn.close()
+
+
+class _PythonWorkerPool:
+    """Process-wide pool of warm interpreter workers.
+
+    General snippets lease any idle worker and start from fresh globals.
+    Sessions get a dedicated worker whose globals persist across calls.
+    A timed out or crashed worker is killed and replaced on its own.
+    When every worker is busy the pool starts another one rather than
+    waiting, and keeps `size` of them once the load drops. Workers are
+    started and reaped in executor threads, process start and join block.
+    """
+
+    def __init__(self, size: int = 2, max_tasks_per_worker: int = 100):
+        self.size = size
+        # Recycle workers periodically so imports and global state do not pile up
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._idle: List[_PythonWorker] = []
+        self._busy = 0
+        self._starting = 0
+        self._sessions: Dict[str, _PythonWorker] = {}
+
+    def _warm_up(self) -> None:
+        """Start workers in the background until size are idle or busy"""
+        loop = asyncio.get_running_loop()
+        while len(self._idle) + self._busy + self._starting < self.size:
+            self._starting += 1
+            loop.run_in_executor(None, _PythonWorker).add_done_callback(
+                self._worker_started
+            )
+
+    def _worker_started(self, future: asyncio.Future) -> None:
+        self._starting -= 1
+        if future.cancelled():
+            return
+        if future.exception():
+            logger.error(f"Failed to start a Python worker: {future.exception()}")
+        elif len(self._idle) >= self.size:
+            self._reap(future.result())
+        else:
+            self._idle.append(future.result())
+
+    def _reap(self, worker: _PythonWorker, kill: bool = False) -> None:
+        """Stop a worker in the background"""
+        asyncio.get_running_loop().run_in_executor(
+            None, worker.kill if kill else worker.stop
+        )
+
+    async def _acquire(self) -> _PythonWorker:
+        self._busy += 1
+        self._warm_up()
+        if self._idle:
+            return self._idle.pop()
+        try:
+            return await asyncio.to_thread(_PythonWorker)
+        except BaseException:
+            self._busy -= 1
+            raise
+
+    def _release(self, worker: _PythonWorker, healthy: bool) -> None:
+        self._busy -= 1
+        if not healthy:
+            self._reap(worker, kill=True)
+        elif (
+            worker.tasks_run >= self.max_tasks_per_worker
+            or len(self._idle) >= self.size
+        ):
+            self._reap(worker)
+        else:
+            self._idle.append(worker)
+        self._warm_up()
+
+    async def run(
+        self, code: str, timeout: int, session_id: Optional[str] = None
+    ) -> Dict:
+        """Execute code in a pooled worker, or in the session's worker if given"""
+        if session_id:
+            worker = self._sessions.get(session_id)
+            if worker is None or not worker.process.is_alive():
+                worker = self._sessions[session_id] = await asyncio.to_thread(
+                    _PythonWorker
+                )
+        else:
+            worker = await self._acquire()
+
+        healthy = False
+        try:
+            result = await worker.run(code, timeout, persistent=bool(session_id))
+            if result is None:
+                logger.warning(
+                    f"Python worker timed out after {timeout}s, replacing it"
+                )
+                return {
+                    "observation": f"Execution timeout after {timeout} seconds",
+                    "success": False,
+                }
+            healthy = True
+            return result
+        except (EOFError, OSError) as e:
+            logger.warning(f"Python worker exited unexpectedly: {e}")
+            return {
+                "observation": "Execution process exited unexpectedly",
+                "success": False,
+            }
+        finally:
+            if not session_id:
+                self._release(worker, healthy)
+            elif not healthy and self._sessions.get(session_id) is worker:
+                del self._sessions[session_id]
+                self._reap(worker, kill=True)
+
+    async def close_session(self, session_id: str) -> None:
+        """Stop the dedicated worker of a session, dropping its globals"""
+        worker = self._sessions.pop(session_id, None)
+        if worker:
+            await asyncio.to_thread(worker.stop)
+
+    def shutdown(self) -> None:
+        """Stop all workers"""
+        while self._sessions:
+            self._sessions.popitem()[1].stop()
+        while self._idle:
+            self._idle.pop().stop()
+
+
+_WORKER_POOL = _PythonWorkerPool()
+atexit.register(_WORKER_POOL.shutdown)
+
+
 class PythonExecute(BaseTool):
     """A tool for executing Python code with timeout and safety restrictions."""
 
@@ -21,20 +227,10 @@ class PythonExecute(BaseTool):
         },
         "required": ["code"],
     }
+    # Keep variables defined by earlier calls of this tool instance
+    persistent_session: bool = False
 
-    def _run_code(self, code: str, result_dict: dict, safe_globals: dict) -> None:
-        original_stdout = sys.stdout
-        try:
-            output_buffer = StringIO()
-            sys.stdout = output_buffer
-            exec(code, safe_globals, safe_globals)
-            result_dict["observation"] = output_buffer.getvalue()
-            result_dict["success"] = True
-        except Exception as e:
-            result_dict["observation"] = str(e)
-            result_dict["success"] = False
-        finally:
-            sys.stdout = original_stdout
+    _session_id: str = ""
 
     async def execute(
         self,
@@ -51,25 +247,14 @@ class PythonExecute(BaseTool):
         Returns:
             Dict: Contains 'output' with execution output or error message and 'success' status.
         """
+        if self.persistent_session and not self._session_id:
+            self._session_id = uuid.uuid4().hex
+        return await _WORKER_POOL.run(
+            code, timeout, self._session_id if self.persistent_session else None
+        )
 
-        with multiprocessing.Manager() as manager:
-            result = manager.dict({"observation": "", "success": False})
-            if isinstance(__builtins__, dict):
-                safe_globals = {"__builtins__": __builtins__}
-            else:
-                safe_globals = {"__builtins__": __builtins__.__dict__.copy()}
-            proc = multiprocessing.Process(
-                target=self._run_code, args=(code, result, safe_globals)
-            )
-            proc.start()
-            proc.join(timeout)
-
-            # timeout process
-            if proc.is_alive():
-                proc.terminate()
-                proc.join(1)
-                return {
-                    "observation": f"Execution timeout after {timeout} seconds",
-                    "success": False,
-                }
-            return dict(result)
+    async def cleanup(self):
+        """Release the persistent session worker, if any."""
+        if self._session_id:
+            await _WORKER_POOL.close_session(self._session_id)
+            self._session_id = ""
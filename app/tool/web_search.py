@@ -1,12 +1,20 @@
 import asyncio
-from typing import Any, Dict, List, Optional
-
-import requests
+import bisect
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
 from bs4 import BeautifulSoup
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.config import config
+from app.config import SearchSettings, config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.search import (
@@ -103,54 +111,434 @@ class SearchResponse(ToolResult):
         return self
 
 
-class WebContentFetcher:
-    """Utility class for fetching web content."""
+class SearchCache:
+    """On-disk cache of search results and fetched page content.
+
+    Results are stored per normalized query and search parameters, page
+    content per URL together with its ETag and Last-Modified validators so
+    that stale pages can be revalidated instead of downloaded again. Both
+    live in one SQLite file, trimmed to its size limit by evicting the least
+    recently used entries. Caches are shared by every tool using the same file.
+    Reads only note access times, which are written with the next entry
+    stored. The methods block on the database, async code calls them in a
+    worker thread.
+    """
+
+    TABLES = ("results", "pages")
+
+    _instances: Dict[str, "SearchCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: Path,
+        results_ttl: float = 3600,
+        page_ttl: float = 24 * 3600,
+        max_size_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.path = path
+        self.results_ttl = results_ttl
+        self.page_ttl = page_ttl
+        self.max_size_bytes = max_size_bytes
+        self.stats = {
+            "result_hits": 0,
+            "result_misses": 0,
+            "page_hits": 0,
+            "page_revalidations": 0,
+            "page_misses": 0,
+        }
+        # (table, key) -> access time not yet written
+        self._touched: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+            "etag TEXT, last_modified TEXT)"
+        )
+        self._db.commit()
+
+    @classmethod
+    def for_config(
+        cls, search_config: Optional[SearchSettings]
+    ) -> Optional["SearchCache"]:
+        """Get the configured search cache, or None if caching is off"""
+        if search_config is None or not search_config.cache:
+            return None
+
+        path = Path(
+            search_config.cache_path
+            or config.workspace_root / ".cache" / "web_search.sqlite"
+        ).resolve()
+        with cls._instances_lock:
+            cache = cls._instances.get(str(path))
+            if cache is None:
+                cache = cls._instances[str(path)] = cls(
+                    path,
+                    results_ttl=search_config.cache_results_ttl,
+                    page_ttl=search_config.cache_page_ttl,
+                    max_size_bytes=int(search_config.cache_max_size_mb * 1024 * 1024),
+                )
+            return cache
 
     @staticmethod
-    async def fetch_content(url: str, timeout: int = 10) -> Optional[str]:
+    def make_results_key(query: str, **params: Any) -> str:
+        """Key of a query, ignoring case and whitespace differences"""
+        normalized = " ".join(query.lower().split())
+        payload = json.dumps({"query": normalized, **params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_results(self, key: str) -> Optional[List[dict]]:
+        """Get cached search results, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ? AND created_at >= ?",
+                (key, now - self.results_ttl),
+            ).fetchone()
+            if row is None:
+                self.stats["result_misses"] += 1
+                return None
+            self._touch("results", key, now)
+            self.stats["result_hits"] += 1
+            return json.loads(row[0])
+
+    def put_results(self, key: str, results: List[dict]) -> None:
+        """Store search results"""
+        self._put("results", key, json.dumps(results))
+
+    def get_page(self, url: str) -> Optional[dict]:
+        """Get cached page content with its validators, or None if missing.
+
+        The returned dict has content, etag, last_modified and fresh, which is
+        False once the page is older than the page TTL and must be revalidated.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at, etag, last_modified FROM pages "
+                "WHERE key = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self.stats["page_misses"] += 1
+                return None
+            content, created_at, etag, last_modified = row
+            fresh = now - created_at <= self.page_ttl
+            if fresh:
+                self._touch("pages", url, now)
+                self.stats["page_hits"] += 1
+            return {
+                "content": content,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fresh": fresh,
+            }
+
+    def put_page(
+        self,
+        url: str,
+        content: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store page content with the validators of its response"""
+        self._put("pages", url, content, etag=etag, last_modified=last_modified)
+
+    def revalidated_page(self, url: str) -> None:
+        """Mark a cached page as fresh after the server confirmed it is unchanged"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE pages SET created_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, url),
+            )
+            self._db.commit()
+            self.stats["page_revalidations"] += 1
+
+    def _touch(self, table: str, key: str, now: float) -> None:
+        self._touched[(table, key)] = now
+
+    def _write_touches(self) -> None:
+        for name in self.TABLES:
+            self._db.executemany(
+                f"UPDATE {name} SET accessed_at = ? WHERE key = ?",
+                [
+                    (accessed_at, key)
+                    for (table, key), accessed_at in self._touched.items()
+                    if table == name
+                ],
+            )
+        self._touched.clear()
+
+    def _put(self, table: str, key: str, value: str, **columns: Any) -> None:
+        now = time.time()
+        names = ", ".join(
+            ["key", "value", "size", "created_at", "accessed_at", *columns]
+        )
+        placeholders = ", ".join("?" * (5 + len(columns)))
+        with self._lock:
+            self._touched.pop((table, key), None)
+            # Pending access times decide what is evicted
+            self._write_touches()
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {table} ({names}) VALUES ({placeholders})",
+                (key, value, len(value), now, now, *columns.values()),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE created_at < ?", (now - self.results_ttl,)
+            )
+            # Drop the least recently used entries of both tables beyond the
+            # size limit
+            entries = " UNION ALL ".join(
+                f"SELECT '{name}' AS tbl, key, size, accessed_at FROM {name}"
+                for name in self.TABLES
+            )
+            evicted = self._db.execute(
+                "SELECT tbl, key FROM (SELECT tbl, key, SUM(size) OVER "
+                f"(ORDER BY accessed_at DESC, tbl, key) AS total FROM ({entries})) "
+                "WHERE total > ?",
+                (self.max_size_bytes,),
+            ).fetchall()
+            for name in self.TABLES:
+                self._db.executemany(
+                    f"DELETE FROM {name} WHERE key = ?",
+                    [(key,) for tbl, key in evicted if tbl == name],
+                )
+            self._db.commit()
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        with self._lock:
+            self._touched.clear()
+            for name in self.TABLES:
+                self._db.execute(f"DELETE FROM {name}")
+            self._db.commit()
+
+
+class WebContentFetcher:
+    """Utility class for fetching web content.
+
+    Pages are fetched with one pooled keep-alive HTTP client per event loop,
+    with a limit on concurrent requests per host. Bodies are streamed and cut
+    off at fetch_max_bytes, non-HTML responses are skipped from their headers,
+    and HTML is parsed in a worker thread.
+    """
+
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+    MAX_TEXT_LENGTH = 10000
+
+    _clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+    _host_limits: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Semaphore] = {}
+
+    @classmethod
+    def _get_client(cls) -> httpx.AsyncClient:
+        # Connections are bound to the loop that opened them
+        loop = asyncio.get_running_loop()
+        client = cls._clients.get(loop)
+        if client is None or client.is_closed:
+            for other in [other for other in cls._clients if other.is_closed()]:
+                cls._clients.pop(other)
+            search_config = config.search_config or SearchSettings()
+            client = httpx.AsyncClient(
+                headers={"User-Agent": cls.USER_AGENT},
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=search_config.fetch_max_connections,
+                    max_keepalive_connections=search_config.fetch_max_connections,
+                ),
+            )
+            cls._clients[loop] = client
+        return client
+
+    @classmethod
+    def _get_host_limit(cls, url: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        key = (loop, httpx.URL(url).host)
+        limit = cls._host_limits.get(key)
+        if limit is None:
+            for other in [other for other in cls._host_limits if other[0].is_closed()]:
+                cls._host_limits.pop(other)
+            search_config = config.search_config or SearchSettings()
+            limit = asyncio.Semaphore(search_config.fetch_max_per_host)
+            cls._host_limits[key] = limit
+        return limit
+
+    @classmethod
+    async def fetch_content(
+        cls, url: str, timeout: Optional[float] = None
+    ) -> Optional[str]:
         """
         Fetch and extract the main content from a webpage.
 
         Args:
             url: The URL to fetch content from
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (default from config)
 
         Returns:
             Extracted text content or None if fetching fails
         """
-        headers = {
-            "WebSearch": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        search_config = config.search_config or SearchSettings()
+        timeout = timeout or search_config.fetch_timeout
+
+        cache = SearchCache.for_config(config.search_config)
+        cached = await asyncio.to_thread(cache.get_page, url) if cache else None
+        if cached and cached["fresh"]:
+            return cached["content"]
+
+        # Revalidate stale content instead of downloading the page again
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
 
         try:
-            # Use asyncio to run requests in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: requests.get(url, headers=headers, timeout=timeout)
+            async with cls._get_host_limit(url):
+                response, body = await asyncio.wait_for(
+                    cls._download(url, search_config.fetch_max_bytes, headers),
+                    timeout,
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out fetching content from {url}")
+            return None
+        except Exception as e:
+            logger.warning(f"Error fetching content from {url}: {e}")
+            return None
+
+        if response.status_code == 304 and cached:
+            await asyncio.to_thread(cache.revalidated_page, url)
+            return cached["content"]
+        if body is None:
+            return None
+
+        # Parse HTML with BeautifulSoup, off the event loop
+        text = await asyncio.to_thread(
+            cls._extract_text, body, response.charset_encoding
+        )
+        if cache and text:
+            await asyncio.to_thread(
+                cache.put_page,
+                url,
+                text,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
             )
+        return text
 
+    @classmethod
+    async def _download(
+        cls, url: str, max_bytes: int, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[httpx.Response, Optional[bytes]]:
+        """Download at most max_bytes of a text page.
+
+        Returns the response and its body, which is None if the response is
+        not a successful text page.
+        """
+        async with cls._get_client().stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return response, None
             if response.status_code != 200:
                 logger.warning(
                     f"Failed to fetch content from {url}: HTTP {response.status_code}"
                 )
-                return None
-
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
+                return response, None
+
+            content_type = response.headers.get("content-type", "").lower()
+            if content_type and not content_type.startswith(cls.TEXT_CONTENT_TYPES):
+                logger.info(f"Skipping non-HTML content from {url}: {content_type}")
+                return response, None
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= max_bytes:
+                    logger.info(f"Content from {url} truncated to {max_bytes} bytes")
+                    del body[max_bytes:]
+                    break
+            return response, bytes(body)
+
+    @classmethod
+    def _extract_text(cls, body: bytes, encoding: Optional[str]) -> Optional[str]:
+        soup = BeautifulSoup(body, "html.parser", from_encoding=encoding)
+
+        # Remove script and style elements
+        for script in soup(["script", "style", "header", "footer", "nav"]):
+            script.extract()
+
+        # Get text content
+        text = soup.get_text(separator="\n", strip=True)
+
+        # Clean up whitespace and limit size
+        text = " ".join(text.split())
+        return text[: cls.MAX_TEXT_LENGTH] if text else None
+
+    @classmethod
+    async def aclose(cls) -> None:
+        """Close the HTTP client of the running event loop"""
+        client = cls._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+class EngineLatency:
+    """Latency histogram of a search engine, used to rank engines.
+
+    Failures are recorded in the slowest bucket, and counts are halved once
+    there are enough samples so that recent behaviour dominates.
+    """
+
+    BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+    FAILURE_LATENCY = 64.0
+    MIN_SAMPLES = 3
+    MAX_SAMPLES = 100
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        if self.samples > self.MAX_SAMPLES:
+            self.counts = [count // 2 for count in self.counts]
+
+    def record_failure(self) -> None:
+        self.record(self.FAILURE_LATENCY)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, None if unknown"""
+        if self.samples < self.MIN_SAMPLES:
+            return None
+        rank = q * self.samples
+        seen = 0
+        for bound, count in zip(self.BUCKETS + (self.FAILURE_LATENCY,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.FAILURE_LATENCY
 
-            # Get text content
-            text = soup.get_text(separator="\n", strip=True)
 
-            # Clean up whitespace and limit size (100KB max)
-            text = " ".join(text.split())
-            return text[:10000] if text else None
+# Process-wide latency statistics per engine name
+_ENGINE_LATENCY: Dict[str, EngineLatency] = {}
 
-        except Exception as e:
-            logger.warning(f"Error fetching content from {url}: {e}")
-            return None
+# Engine clients block, so searches run in threads. A cancelled search, e.g.
+# the loser of a race, cannot stop its thread, which runs until the engine
+# returns. Searches get their own small pool, so abandoned ones cannot take
+# threads from the default executor that file and cache work runs in.
+_ENGINE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="web_search")
 
 
 class WebSearch(BaseTool):
@@ -190,6 +578,7 @@ class WebSearch(BaseTool):
         },
         "required": ["query"],
     }
+    concurrency_safe: bool = True
     _search_engine: dict[str, WebSearchEngine] = {
         "google": GoogleSearchEngine(),
         "baidu": BaiduSearchEngine(),
@@ -248,9 +637,26 @@ class WebSearch(BaseTool):
 
         search_params = {"lang": lang, "country": country}
 
+        cache = SearchCache.for_config(config.search_config)
+        cache_key = SearchCache.make_results_key(
+            query, num_results=num_results, **search_params
+        )
+        cached = (
+            await asyncio.to_thread(cache.get_results, cache_key) if cache else None
+        )
+
         # Try searching with retries when all engines fail
         for retry_count in range(max_retries + 1):
-            results = await self._try_all_engines(query, num_results, search_params)
+            if cached:
+                results = [SearchResult(**result) for result in cached]
+            else:
+                results = await self._try_all_engines(query, num_results, search_params)
+                if cache and results:
+                    await asyncio.to_thread(
+                        cache.put_results,
+                        cache_key,
+                        [result.model_dump() for result in results],
+                    )
 
             if results:
                 # Fetch content if requested
@@ -292,16 +698,26 @@ class WebSearch(BaseTool):
     ) -> List[SearchResult]:
         """Try all search engines in the configured order."""
         engine_order = self._get_engine_order()
+        strategy = (
+            getattr(config.search_config, "strategy", "sequential")
+            if config.search_config
+            else "sequential"
+        )
+        if strategy == "race":
+            return await self._race_all_engines(
+                engine_order, query, num_results, search_params
+            )
+
         failed_engines = []
 
         for engine_name in engine_order:
-            engine = self._search_engine[engine_name]
             logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
-            search_items = await self._perform_search_with_engine(
-                engine, query, num_results, search_params
+            search_items = await self._search_with_engine(
+                engine_name, query, num_results, search_params
             )
 
             if not search_items:
+                failed_engines.append(engine_name)
                 continue
 
             if failed_engines:
@@ -309,23 +725,142 @@ class WebSearch(BaseTool):
                     f"Search successful with {engine_name.capitalize()} after trying: {', '.join(failed_engines)}"
                 )
 
-            # Transform search items into structured results
-            return [
-                SearchResult(
-                    position=i + 1,
-                    url=item.url,
-                    title=item.title
-                    or f"Result {i+1}",  # Ensure we always have a title
-                    description=item.description or "",
-                    source=engine_name,
-                )
-                for i, item in enumerate(search_items)
-            ]
+            return self._to_search_results(
+                [(engine_name, item) for item in search_items]
+            )
 
         if failed_engines:
             logger.error(f"All search engines failed: {', '.join(failed_engines)}")
         return []
 
+    async def _race_all_engines(
+        self,
+        engine_order: List[str],
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+    ) -> List[SearchResult]:
+        """Race engines in groups of race_engines, in engine order."""
+        search_config = config.search_config
+        group_size = max(1, search_config.race_engines)
+
+        for start in range(0, len(engine_order), group_size):
+            group = engine_order[start : start + group_size]
+            logger.info(
+                f"🔎 Racing search with {', '.join(e.capitalize() for e in group)}..."
+            )
+            results = await self._race_engines(
+                group, query, num_results, search_params, search_config.race_merge
+            )
+            if results:
+                return results
+
+        logger.error(f"All search engines failed: {', '.join(engine_order)}")
+        return []
+
+    async def _race_engines(
+        self,
+        engine_names: List[str],
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+        merge: bool = False,
+    ) -> List[SearchResult]:
+        """Query engines concurrently.
+
+        Returns the first result set with num_results items and cancels the
+        other engines. Otherwise, or when merging, waits for every engine and
+        returns the largest result set, or all of them merged by URL.
+        Cancelled engines stop being awaited, but their blocking search keeps
+        a thread of _ENGINE_EXECUTOR until it returns.
+        """
+        tasks = {
+            asyncio.create_task(
+                self._search_with_engine(name, query, num_results, search_params)
+            ): name
+            for name in engine_names
+        }
+        finished: List[Tuple[str, List[SearchItem]]] = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    items = task.result()
+                    if items:
+                        finished.append((tasks[task], items))
+                if not merge:
+                    complete = next(
+                        (entry for entry in finished if len(entry[1]) >= num_results),
+                        None,
+                    )
+                    if complete:
+                        logger.info(f"Search race won by {complete[0].capitalize()}")
+                        return self._to_search_results(
+                            [(complete[0], item) for item in complete[1]]
+                        )
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if not finished:
+            return []
+        if not merge:
+            name, items = max(finished, key=lambda entry: len(entry[1]))
+            return self._to_search_results([(name, item) for item in items])
+
+        merged: List[Tuple[str, SearchItem]] = []
+        seen_urls = set()
+        for name, items in finished:
+            for item in items:
+                key = item.url.split("#", 1)[0].rstrip("/").lower()
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    merged.append((name, item))
+        return self._to_search_results(merged[:num_results])
+
+    async def _search_with_engine(
+        self,
+        engine_name: str,
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+    ) -> List[SearchItem]:
+        """Search with one engine, recording its latency for engine ordering."""
+        latency = _ENGINE_LATENCY.setdefault(engine_name, EngineLatency())
+        start = time.perf_counter()
+        try:
+            items = await self._perform_search_with_engine(
+                self._search_engine[engine_name], query, num_results, search_params
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Search with {engine_name.capitalize()} failed: {e}")
+            items = []
+
+        if items:
+            latency.record(time.perf_counter() - start)
+        else:
+            latency.record_failure()
+        return items
+
+    @staticmethod
+    def _to_search_results(items: List[Tuple[str, SearchItem]]) -> List[SearchResult]:
+        """Transform search items into structured results"""
+        return [
+            SearchResult(
+                position=i + 1,
+                url=item.url,
+                title=item.title or f"Result {i+1}",  # Ensure we always have a title
+                description=item.description or "",
+                source=engine_name,
+            )
+            for i, (engine_name, item) in enumerate(items)
+        ]
+
     async def _fetch_content_for_results(
         self, results: List[SearchResult]
     ) -> List[SearchResult]:
@@ -382,7 +917,22 @@ class WebSearch(BaseTool):
         )
         engine_order.extend([e for e in self._search_engine if e not in engine_order])
 
-        return engine_order
+        # Move engines measured to be slow or failing behind faster ones.
+        # Engines without enough samples are assumed to be as fast as the
+        # fastest measured engine, and the stable sort keeps the configured
+        # order among engines of equal expected latency
+        medians = {}
+        for engine_name in engine_order:
+            latency = _ENGINE_LATENCY.get(engine_name)
+            median = latency.quantile(0.5) if latency else None
+            if median is not None:
+                medians[engine_name] = median
+        prior = min(medians.values(), default=0.0)
+
+        def expected_latency(engine_name: str) -> float:
+            return medians.get(engine_name, prior)
+
+        return sorted(engine_order, key=expected_latency)
 
     @retry(
         stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10)
@@ -396,7 +946,7 @@ class WebSearch(BaseTool):
     ) -> List[SearchItem]:
         """Execute search with the given engine and parameters."""
         return await asyncio.get_event_loop().run_in_executor(
-            None,
+            _ENGINE_EXECUTOR,
             lambda: list(
                 engine.perform_search(
                     query,
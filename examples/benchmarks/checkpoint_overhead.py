@@ -0,0 +1,71 @@
+"""
+Benchmark the per-step cost of checkpointing an agent run.
+
+Each simulated step adds an assistant tool call and its observation to memory
+and checkpoints the new messages, as `BaseAgent.run` does. Batched writes,
+the default, are compared with writing every record in its own transaction.
+
+Usage:
+    python -m examples.benchmarks.checkpoint_overhead --steps 200
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app.agent.toolcall import ToolCallAgent
+from app.checkpoint import CheckpointStore
+from app.schema import Message, ToolCall
+
+
+OBSERVATION = "Observed output of cmd `web_search` executed:\n" + (
+    "Search result line with a title, a url https://example.com/page and a snippet. "
+    * 40
+)
+
+
+def run_steps(store: CheckpointStore, steps: int) -> float:
+    agent = ToolCallAgent(name="bench", checkpoint_id=f"bench_{time.time()}")
+    agent.update_memory("user", "Research the topic")
+    elapsed = 0.0
+    for step in range(1, steps + 1):
+        call = ToolCall(
+            id=f"call_{step}",
+            function={"name": "web_search", "arguments": f'{{"query": "{step}"}}'},
+        )
+        agent.memory.add_messages(
+            [
+                Message.from_tool_calls(content="", tool_calls=[call]),
+                Message.tool_message(
+                    content=OBSERVATION, name="web_search", tool_call_id=call.id
+                ),
+            ]
+        )
+        agent.current_step = step
+        start = time.perf_counter()
+        agent._save_checkpoint(store, f"Step {step}: done")
+        elapsed += time.perf_counter() - start
+    start = time.perf_counter()
+    store.flush()
+    return elapsed + time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, flush_records in (("batched", 64), ("unbatched", 1)):
+            store = CheckpointStore(
+                Path(directory) / f"{name}.sqlite", flush_records=flush_records
+            )
+            elapsed = run_steps(store, args.steps)
+            print(
+                f"{name}: {elapsed * 1000:.1f} ms for {args.steps} steps, "
+                f"{elapsed * 1e6 / args.steps:.0f} us per step"
+            )
+
+
+if __name__ == "__main__":
+    main()
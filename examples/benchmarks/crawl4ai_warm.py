@@ -0,0 +1,54 @@
+"""
+Benchmark cold and warm single-URL crawls with Crawl4aiTool.
+
+A cold crawl uses a fresh tool, so it includes launching the browser, which
+is what every call used to pay. Warm crawls reuse the tool's long-lived
+browser and only pay for loading the page.
+
+Usage:
+    python -m examples.benchmarks.crawl4ai_warm https://example.com --runs 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.tool.crawl4ai import Crawl4aiTool
+
+
+async def crawl(tool: Crawl4aiTool, url: str) -> float:
+    start = time.perf_counter()
+    result = await tool.execute(urls=[url], bypass_cache=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.error or "Successful: 1" not in result.output:
+        raise RuntimeError(f"Crawl of {url} failed: {result.error or result.output}")
+    return elapsed
+
+
+async def run(args) -> None:
+    cold, warm = [], []
+    for _ in range(args.runs):
+        tool = Crawl4aiTool()
+        try:
+            cold.append(await crawl(tool, args.url))
+            warm.append(await crawl(tool, args.url))
+        finally:
+            await tool.cleanup()
+
+    print(f"url: {args.url}, runs: {args.runs}")
+    for name, samples in (("cold", cold), ("warm", warm)):
+        print(
+            f"{name}: mean {statistics.mean(samples):.0f} ms, "
+            f"min {min(samples):.0f} ms, max {max(samples):.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url")
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark copying large directory trees into and out of a sandbox.
+
+Generates a tree of random files on the host, copies it into a sandbox with
+`DockerSandbox.copy_to`, copies it back with `copy_from`, and reports the
+throughput of both directions along with the peak RSS of this process.
+
+Usage:
+    python -m examples.benchmarks.sandbox_copy --files 200 --file-size-mb 1
+"""
+import argparse
+import asyncio
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from app.config import SandboxSettings
+from app.sandbox.core.sandbox import DockerSandbox
+
+
+def make_tree(root: str, files: int, file_size: int, per_dir: int = 50) -> int:
+    for index in range(files):
+        directory = os.path.join(root, f"dir_{index // per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file_{index}.bin"), "wb") as f:
+            f.write(os.urandom(file_size))
+    return files * file_size
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(args) -> None:
+    host_dir = tempfile.mkdtemp(prefix="sandbox_copy_")
+    try:
+        src = os.path.join(host_dir, "src")
+        total = make_tree(src, args.files, int(args.file_size_mb * 1024 * 1024))
+        total_mb = total / (1024 * 1024)
+        print(f"tree: {args.files} files, {total_mb:.1f} MB")
+        print(f"peak RSS before copying: {peak_rss_mb():.1f} MB")
+
+        async with DockerSandbox(SandboxSettings(image=args.image)) as sandbox:
+            start = time.perf_counter()
+            await sandbox.copy_to(src, "/workspace/data")
+            elapsed = time.perf_counter() - start
+            print(f"copy_to:   {elapsed:.2f} s, {total_mb / elapsed:.1f} MB/s")
+
+            dst = os.path.join(host_dir, "dst")
+            os.makedirs(dst)
+            start = time.perf_counter()
+            await sandbox.copy_from("/workspace/data", dst)
+            elapsed = time.perf_counter() - start
+            print(f"copy_from: {elapsed:.2f} s, {total_mb / elapsed:.1f} MB/s")
+
+        print(f"peak RSS after copying: {peak_rss_mb():.1f} MB")
+    finally:
+        shutil.rmtree(host_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-size-mb", type=float, default=1.0)
+    parser.add_argument("--image", default="python:3.12-slim")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
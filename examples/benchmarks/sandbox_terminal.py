@@ -0,0 +1,54 @@
+"""
+Benchmark the round-trip latency of short commands in a sandbox terminal.
+
+Runs a short command repeatedly through `DockerSandbox.run_command` and reports
+latency percentiles, which are dominated by how fast the terminal notices the
+prompt once the command has finished.
+
+Usage:
+    python -m examples.benchmarks.sandbox_terminal --runs 100 --command ls
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.config import SandboxSettings
+from app.sandbox.core.sandbox import DockerSandbox
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run(args) -> None:
+    async with DockerSandbox(SandboxSettings(image=args.image)) as sandbox:
+        # Warm up the session before measuring
+        await sandbox.run_command(args.command)
+
+        samples = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            await sandbox.run_command(args.command)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    print(f"command: {args.command!r}, runs: {args.runs}")
+    print(
+        f"mean {statistics.mean(samples):.2f} ms, "
+        f"p50 {percentile(samples, 0.5):.2f} ms, "
+        f"p95 {percentile(samples, 0.95):.2f} ms, "
+        f"max {max(samples):.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--command", default="ls")
+    parser.add_argument("--image", default="python:3.12-slim")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
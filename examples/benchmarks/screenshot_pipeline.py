@@ -0,0 +1,71 @@
+"""
+Benchmark the bytes and input tokens of browser screenshots per step.
+
+Loads each URL in Chromium and compares the previous capture (full page JPEG
+at quality 100) with the current pipeline (viewport capture, downscaled to
+the configured maximum dimensions and quality), then captures the page again
+to show perceptual-hash deduplication of an unchanged page.
+
+Usage:
+    python -m examples.benchmarks.screenshot_pipeline https://example.com
+"""
+import argparse
+import asyncio
+import base64
+
+import tiktoken
+from playwright.async_api import async_playwright
+
+from app.config import BrowserSettings, config
+from app.llm import TokenCounter
+from app.tool.browser_use_tool import BrowserUseTool
+
+
+def image_tokens(counter: TokenCounter, data: bytes) -> int:
+    url = f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
+    return counter.count_image({"type": "image_url", "image_url": {"url": url}})
+
+
+async def run(urls) -> None:
+    counter = TokenCounter(tiktoken.get_encoding("cl100k_base"))
+    settings = config.browser_config or BrowserSettings()
+    tool = BrowserUseTool()
+
+    print(
+        f"pipeline: full_page={settings.screenshot_full_page}, "
+        f"max={settings.screenshot_max_width}x{settings.screenshot_max_height}, "
+        f"quality={settings.screenshot_quality}"
+    )
+    print(
+        f"{'url':<40} {'old bytes':>10} {'new bytes':>10} {'old tok':>8} {'new tok':>8}"
+    )
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch()
+        page = await browser.new_page(viewport={"width": 1280, "height": 1100})
+        for url in urls:
+            await page.goto(url, wait_until="load")
+            old = await page.screenshot(
+                full_page=True, animations="disabled", type="jpeg", quality=100
+            )
+            new, _ = await tool._capture_screenshot(page, url)
+            new = base64.b64decode(new) if new else b""
+            print(
+                f"{url[:40]:<40} {len(old):>10} {len(new):>10} "
+                f"{image_tokens(counter, old):>8} "
+                f"{image_tokens(counter, new) if new else 0:>8}"
+            )
+            # The page has not changed, so this capture should be skipped
+            await tool._capture_screenshot(page, url)
+        await browser.close()
+
+    print(tool.get_screenshot_stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("urls", nargs="+")
+    asyncio.run(run(parser.parse_args().urls))
+
+
+if __name__ == "__main__":
+    main()
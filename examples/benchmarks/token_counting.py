@@ -0,0 +1,79 @@
+"""
+Benchmark the per-step cost of counting prompt tokens as agent memory grows.
+
+Compares re-tokenizing the whole history on every step (the formatted-dict path)
+with the memoized per-message counts used by `LLM.ask_tool` and the running
+total kept by `Memory.count_tokens`.
+
+Usage:
+    python -m examples.benchmarks.token_counting --steps 60
+"""
+import argparse
+import time
+
+import tiktoken
+
+from app.llm import LLM, TokenCounter
+from app.schema import Memory, Message, ToolCall
+
+
+OBSERVATION = "Observed output of cmd `web_search` executed:\n" + (
+    "Search result line with a title, a url https://example.com/page and a snippet. "
+    * 40
+)
+
+
+def make_step_messages(step: int):
+    call = ToolCall(
+        id=f"call_{step}",
+        function={"name": "web_search", "arguments": f'{{"query": "topic {step}"}}'},
+    )
+    return [
+        Message.user_message("Decide the next step based on the observations."),
+        Message.from_tool_calls(
+            content=f"Thinking about step {step}", tool_calls=[call]
+        ),
+        Message.tool_message(
+            content=OBSERVATION, name="web_search", tool_call_id=f"call_{step}"
+        ),
+    ]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=60)
+    parser.add_argument("--report-every", type=int, default=10)
+    args = parser.parse_args()
+
+    counter = TokenCounter(tiktoken.get_encoding("cl100k_base"))
+    memory = Memory(max_messages=10_000)
+
+    print(
+        f"{'step':>5} {'messages':>9} {'tokens':>8} {'full (ms)':>10} "
+        f"{'memoized (ms)':>14} {'running (ms)':>13}"
+    )
+    for step in range(1, args.steps + 1):
+        memory.add_messages(make_step_messages(step))
+
+        formatted = LLM.format_messages(memory.messages)
+        full_ms = timed(lambda: [counter.count_formatted_message(m) for m in formatted])
+        memo_ms = timed(lambda: counter.count_message_tokens(memory.messages))
+        running_ms = timed(lambda: memory.count_tokens(counter))
+
+        if step % args.report_every == 0 or step == 1:
+            tokens = counter.count_message_tokens(memory.messages)
+            assert tokens == memory.count_tokens(counter) + counter.FORMAT_TOKENS
+            print(
+                f"{step:>5} {len(memory.messages):>9} {tokens:>8} {full_ms:>10.2f} "
+                f"{memo_ms:>14.2f} {running_ms:>13.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import argparse
 import asyncio
+import time
 
 from app.agent.manus import Manus
+from app.checkpoint import CheckpointStore
+from app.config import config
 from app.logger import logger
 
 
@@ -11,16 +14,44 @@ async def main():
     parser.add_argument(
         "--prompt", type=str, required=False, help="Input prompt for the agent"
     )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="Resume an interrupted run from its checkpoint",
+    )
     args = parser.parse_args()
+    checkpoints = config.checkpoint_config and config.checkpoint_config.enabled
+    if args.resume and not checkpoints:
+        logger.error("Cannot resume, checkpoints are disabled in the config")
+        return
 
     # Create and initialize Manus agent
     agent = await Manus.create()
     try:
+        if checkpoints:
+            agent.checkpoint_id = args.resume or f"manus_{int(time.time())}"
+            if not args.resume:
+                logger.info(
+                    f"Checkpointing run {agent.checkpoint_id}, "
+                    f"resume it with: python main.py --resume {agent.checkpoint_id}"
+                )
+            elif not await asyncio.to_thread(
+                CheckpointStore.for_config().load, agent.checkpoint_run_id
+            ):
+                logger.error(
+                    f"Cannot resume, no checkpoint found for run {args.resume}"
+                )
+                return
+
         # Use command line prompt if provided, otherwise ask for input
-        prompt = args.prompt if args.prompt else input("Enter your prompt: ")
-        if not prompt.strip():
-            logger.warning("Empty prompt provided.")
-            return
+        if args.resume:
+            prompt = ""
+        else:
+            prompt = args.prompt if args.prompt else input("Enter your prompt: ")
+            if not prompt.strip():
+                logger.warning("Empty prompt provided.")
+                return
 
         logger.warning("Processing your request...")
         await agent.run(prompt)
@@ -1,7 +1,9 @@
 import httpx
-from typing import Any, Dict, AsyncIterable, Literal, List, ClassVar
+from typing import Any, Dict, AsyncIterable, Literal, List, ClassVar, Optional
 from pydantic import BaseModel
 from app.agent.manus import Manus
+from app.schema import AgentState
+from app.tool import BrowserUseTool
 
 
 class ResponseFormat(BaseModel):
@@ -12,6 +14,39 @@ class ResponseFormat(BaseModel):
 
 
 class A2AManus(Manus):
+    # Pooled agents keep their MCP sessions and browser context between runs
+    pooled: bool = False
+    # A2A context whose browser tabs, cookies and sessions the agent holds
+    context_id: Optional[str] = None
+
+    async def cleanup(self):
+        """Clean up after a run, unless the agent is kept by a pool."""
+        if not self.pooled:
+            await super().cleanup()
+
+    async def close(self):
+        """Release the MCP sessions and browser context."""
+        await super().cleanup()
+
+    async def reset_browser(self) -> None:
+        """Close the browser context, the next browser action opens a fresh one."""
+        if self.browser_context_helper:
+            await self.browser_context_helper.cleanup_browser()
+        self.context_id = None
+
+    def reset(self) -> None:
+        """Forget the previous run so the agent can serve a new request."""
+        self.memory.clear()
+        self.state = AgentState.IDLE
+        self.current_step = 0
+        self.tool_calls = []
+        self.next_step_prompt = type(self).model_fields["next_step_prompt"].default
+        # The browser stays open, but its last state belongs to the old request
+        browser_tool = self.available_tools.get_tool(BrowserUseTool().name)
+        if browser_tool:
+            browser_tool.reset_observations()
+        if self.browser_context_helper:
+            self.browser_context_helper._current_base64_image = None
 
     async def invoke(self, query, sessionId) -> str:
         config = {"configurable": {"thread_id": sessionId}}
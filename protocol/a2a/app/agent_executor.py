@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from a2a.server.agent_execution import AgentExecutor, RequestContext
@@ -7,16 +8,18 @@ from a2a.types import (
     InvalidParamsError,
     Part,
     Task,
+    TaskNotCancelableError,
+    TaskState,
     TextPart,
-    UnsupportedOperationError,
 )
 from a2a.utils import (
     completed_task,
     new_artifact,
 )
 from .agent import A2AManus
+from .agent_pool import AgentPool
 from a2a.utils.errors import ServerError
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, Dict
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,8 +28,15 @@ logger = logging.getLogger(__name__)
 class ManusExecutor(AgentExecutor):
     """Currency Conversion AgentExecutor Example."""
 
-    def __init__(self, agent_factory: Callable[[], Awaitable[A2AManus]]):
-        self.agent_factory = agent_factory
+    def __init__(
+        self,
+        agent_factory: Callable[[], Awaitable[A2AManus]],
+        pool_size: int = 4,
+        prewarm: int = 1,
+    ):
+        self.pool = AgentPool(agent_factory, size=pool_size, prewarm=prewarm)
+        # task_id -> agent run, to cancel it
+        self._running: Dict[str, asyncio.Task] = {}
 
     async def execute(
         self,
@@ -38,13 +48,21 @@ class ManusExecutor(AgentExecutor):
             raise ServerError(error=InvalidParamsError())
 
         query = context.get_user_input()
+        run = asyncio.create_task(self._invoke(query, context.context_id))
+        self._running[context.task_id] = run
         try:
-            self.agent = await self.agent_factory()
-            result = await self.agent.invoke(query, context.context_id)
+            result = await run
             print(f"Final Result ===> {result}")
+        except asyncio.CancelledError:
+            if run.cancelled() and asyncio.current_task().cancelling() == 0:
+                # Cancelled through cancel(), which reported the task state
+                return
+            raise
         except Exception as e:
             print("Error invoking agent: %s", e)
             raise ServerError(error=ValueError(f"Error invoking agent: {e}")) from e
+        finally:
+            self._running.pop(context.task_id, None)
         parts = [
             Part(
                 root=TextPart(
@@ -65,10 +83,20 @@ class ManusExecutor(AgentExecutor):
             )
         )
 
+    async def _invoke(self, query: str, context_id: str) -> dict:
+        async with self.pool.lease(context_id) as agent:
+            return await agent.invoke(query, context_id)
+
     def _validate_request(self, context: RequestContext) -> bool:
         return False
 
     async def cancel(
         self, request: RequestContext, event_queue: EventQueue
     ) -> Task | None:
-        raise ServerError(error=UnsupportedOperationError())
+        run = self._running.get(request.task_id)
+        if run is None or run.done():
+            raise ServerError(error=TaskNotCancelableError())
+        run.cancel()
+        TaskUpdater(event_queue, request.task_id, request.context_id).update_status(
+            TaskState.canceled, final=True
+        )
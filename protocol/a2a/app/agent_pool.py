@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List
+
+from .agent import A2AManus
+
+
+logger = logging.getLogger(__name__)
+
+
+class AgentPool:
+    """Pool of initialized A2AManus agents leased per A2A request.
+
+    Creating an agent connects every MCP server, so agents are kept between
+    requests with their MCP sessions and browser context, and only their
+    conversation state is reset. At most `size` agents run at once, further
+    requests wait for one to be returned. Requests of the same context are
+    run one after the other, preferably on the agent that served the context
+    before, so it finds its browser tabs and cookies as it left them. An
+    agent handed to another context closes its browser context first, so
+    no browser state crosses contexts.
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Awaitable[A2AManus]],
+        size: int = 4,
+        prewarm: int = 1,
+        max_contexts: int = 1024,
+    ):
+        self.agent_factory = agent_factory
+        self.size = size
+        self.prewarm = min(prewarm, size)
+        self.max_contexts = max_contexts
+        self._idle: List[A2AManus] = []
+        self._created = 0
+        self._slots = asyncio.Semaphore(size)
+        self._lock = asyncio.Lock()
+        # context_id -> agent that last served it
+        self._context_agents: "OrderedDict[str, A2AManus]" = OrderedDict()
+        # Locks are dropped with the last request waiting for them
+        self._context_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    async def start(self) -> None:
+        """Create the prewarmed agents"""
+        agents = await asyncio.gather(
+            *(self._create_agent() for _ in range(self.prewarm - self._created))
+        )
+        self._idle.extend(agents)
+        logger.info(f"Agent pool started with {len(self._idle)}/{self.size} agents")
+
+    async def _create_agent(self) -> A2AManus:
+        self._created += 1
+        try:
+            agent = await self.agent_factory()
+        except BaseException:
+            self._created -= 1
+            raise
+        agent.pooled = True
+        return agent
+
+    async def _take(self, context_id: str) -> A2AManus:
+        async with self._lock:
+            agent = self._context_agents.get(context_id)
+            if agent is not None and agent in self._idle:
+                self._idle.remove(agent)
+                return agent
+            # Prefer agents without browser state to clear
+            index = next(
+                (i for i, idle in enumerate(self._idle) if idle.context_id is None),
+                len(self._idle) - 1,
+            )
+            agent = self._idle.pop(index) if self._idle else None
+            if agent is not None and agent.context_id is not None:
+                # Its old context must not find it with another browser state
+                if self._context_agents.get(agent.context_id) is agent:
+                    del self._context_agents[agent.context_id]
+        if agent is None:
+            # A slot is held, so fewer than size agents are in use
+            return await self._create_agent()
+        if agent.context_id is not None:
+            try:
+                await agent.reset_browser()
+            except Exception as e:
+                logger.error(f"Error resetting agent browser, replacing it: {e}")
+                await self._give_back(agent, context_id, discard=True)
+                return await self._create_agent()
+        return agent
+
+    async def _give_back(self, agent: A2AManus, context_id: str, discard: bool):
+        if discard:
+            self._created -= 1
+            for key in [k for k, v in self._context_agents.items() if v is agent]:
+                del self._context_agents[key]
+            await agent.close()
+            return
+        agent.reset()
+        agent.context_id = context_id
+        async with self._lock:
+            self._context_agents[context_id] = agent
+            self._context_agents.move_to_end(context_id)
+            while len(self._context_agents) > self.max_contexts:
+                self._context_agents.popitem(last=False)
+            self._idle.append(agent)
+
+    @asynccontextmanager
+    async def lease(self, context_id: str) -> AsyncIterator[A2AManus]:
+        """Lease an agent for a request of the given context.
+
+        The agent is reset and returned to the pool afterwards. An agent whose
+        run was cancelled may have been interrupted anywhere, so it is closed
+        instead.
+        """
+        context_lock = self._context_locks.get(context_id)
+        if context_lock is None:
+            context_lock = self._context_locks[context_id] = asyncio.Lock()
+
+        async with context_lock, self._slots:
+            agent = await self._take(context_id)
+            discard = False
+            try:
+                yield agent
+            except asyncio.CancelledError:
+                discard = True
+                raise
+            finally:
+                await asyncio.shield(self._give_back(agent, context_id, discard))
+
+    async def close(self) -> None:
+        """Close the idle agents"""
+        async with self._lock:
+            agents, self._idle = self._idle, []
+            self._context_agents.clear()
+        for agent in agents:
+            self._created -= 1
+            try:
+                await agent.close()
+            except Exception as e:
+                logger.error(f"Error closing agent: {e}")
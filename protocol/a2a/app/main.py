@@ -19,6 +19,7 @@ from app.tool.terminate import _TERMINATE_DESCRIPTION
 import logging
 from dotenv import load_dotenv
 import asyncio
+from contextlib import asynccontextmanager
 from typing import Optional
 
 load_dotenv()
@@ -27,7 +28,9 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def main(host: str = "localhost", port: int = 10000):
+async def main(
+    host: str = "localhost", port: int = 10000, pool_size: int = 4, prewarm: int = 1
+):
     """Starts the Manus Agent server."""
     try:
         capabilities = AgentCapabilities(streaming=False, pushNotifications=True)
@@ -84,10 +87,13 @@ async def main(host: str = "localhost", port: int = 10000):
         )
 
         httpx_client = httpx.AsyncClient()
+        agent_executor = ManusExecutor(
+            agent_factory=lambda: A2AManus.create(max_steps=3),
+            pool_size=pool_size,
+            prewarm=prewarm,
+        )
         request_handler = DefaultRequestHandler(
-            agent_executor=ManusExecutor(
-                agent_factory=lambda: A2AManus.create(max_steps=3)
-            ),
+            agent_executor=agent_executor,
             task_store=InMemoryTaskStore(),
             push_notifier=InMemoryPushNotifier(httpx_client),
         )
@@ -96,18 +102,33 @@ async def main(host: str = "localhost", port: int = 10000):
             agent_card=agent_card, http_handler=request_handler
         )
 
+        # Agents are created in the server's event loop, their MCP sessions
+        # and browser are bound to it
+        @asynccontextmanager
+        async def lifespan(app):
+            await agent_executor.pool.start()
+            try:
+                yield
+            finally:
+                await agent_executor.pool.close()
+
         logger.info(f"Starting server on {host}:{port}")
-        return server.build()
+        return server.build(lifespan=lifespan)
     except Exception as e:
         logger.error(f"An error occurred during server startup: {e}")
         exit(1)
 
 
-def run_server(host: Optional[str] = "localhost", port: Optional[int] = 10000):
+def run_server(
+    host: Optional[str] = "localhost",
+    port: Optional[int] = 10000,
+    pool_size: int = 4,
+    prewarm: int = 1,
+):
     try:
         import uvicorn
 
-        app = asyncio.run(main(host, port))
+        app = asyncio.run(main(host, port, pool_size, prewarm))
         config = uvicorn.Config(
             app=app, host=host, port=port, loop="asyncio", proxy_headers=True
         )
@@ -129,6 +150,18 @@ if __name__ == "__main__":
     parser.add_argument(
         "--port", type=int, default=10000, help="Server port, default is 10000"
     )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=4,
+        help="Maximum number of agents running requests at once, default is 4",
+    )
+    parser.add_argument(
+        "--pool-prewarm",
+        type=int,
+        default=1,
+        help="Number of agents created at startup, default is 1",
+    )
     args = parser.parse_args()
     # Start the server with the specified or default host and port
-    run_server(args.host, args.port)
+    run_server(args.host, args.port, args.pool_size, args.pool_prewarm)
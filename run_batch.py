@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.agent.data_analysis import DataAnalysis
+from app.agent.manus import Manus
+from app.config import config
+from app.flow.flow_factory import FlowFactory, FlowType
+from app.llm import track_token_usage
+from app.logger import logger
+
+
+def load_tasks(path: Path, done_ids: set) -> List[Dict]:
+    """Read the tasks of a JSONL file, skipping those whose id is in done_ids.
+
+    Each line is either a JSON string prompt or an object with a `prompt`, and
+    optionally an `id` (defaults to the line number), a `mode` ("agent" or
+    "flow") and a `timeout` in seconds. Runs are checkpointed under
+    "<file stem>_<id>", so rerunning a batch resumes its interrupted tasks.
+    """
+    tasks = []
+    with path.open(encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                task = json.loads(line)
+            except ValueError as e:
+                logger.warning(f"Skipping line {line_number}, invalid JSON: {e}")
+                continue
+            if isinstance(task, str):
+                task = {"prompt": task}
+            if not isinstance(task, dict) or not task.get("prompt"):
+                logger.warning(f"Skipping line {line_number} without a prompt")
+                continue
+            task.setdefault("id", line_number)
+            if not isinstance(task["id"], (str, int)):
+                logger.warning(
+                    f"Skipping line {line_number}, its id is not a string or number"
+                )
+                continue
+            task.setdefault("checkpoint_id", f"{path.stem}_{task['id']}")
+            if task["id"] not in done_ids:
+                tasks.append(task)
+    return tasks
+
+
+def load_done_ids(path: Path) -> set:
+    """Ids of the tasks already in a results file, to resume a batch"""
+    if not path.exists():
+        return set()
+    done_ids = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                done_ids.add(json.loads(line)["id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done_ids
+
+
+async def execute_task(task: Dict, mode: str) -> str:
+    if mode == "flow":
+        agents = {"manus": Manus()}
+        if config.run_flow_config.use_data_analysis_agent:
+            agents["data_analysis"] = DataAnalysis()
+        # Concurrent flows would otherwise share a time-based plan ID, and so
+        # their checkpoints
+        flow = FlowFactory.create_flow(
+            flow_type=FlowType.PLANNING,
+            agents=agents,
+            plan_id=task["checkpoint_id"],
+        )
+        return await flow.execute(task["prompt"])
+
+    agent = await Manus.create(checkpoint_id=task["checkpoint_id"])
+    try:
+        return await agent.run(task["prompt"])
+    finally:
+        await agent.cleanup()
+
+
+async def run_task(task: Dict, mode: str, timeout: float) -> Dict:
+    """Run one task, returning its result record"""
+    mode = task.get("mode", mode)
+    timeout = task.get("timeout", timeout)
+    record = {"id": task["id"], "mode": mode, "worker": os.getpid()}
+    started_at = time.time()
+    start = time.perf_counter()
+    logger.info(f"Starting task {task['id']}")
+    with track_token_usage() as usage:
+        try:
+            record["result"] = await asyncio.wait_for(
+                execute_task(task, mode), timeout=timeout
+            )
+            record["status"] = "ok"
+        except asyncio.TimeoutError:
+            record["status"] = "timeout"
+            record["error"] = f"Timed out after {timeout:g} seconds"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+    record["started_at"] = started_at
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    record["tokens"] = usage.to_dict()
+    logger.info(
+        f"Task {task['id']} {record['status']} in {record['elapsed']:.1f}s, "
+        f"{record['tokens']['total']} tokens"
+    )
+    return record
+
+
+async def run_tasks(
+    get_task: Callable,
+    on_result: Callable[[Dict], None],
+    concurrency: int,
+    mode: str,
+    timeout: float,
+) -> None:
+    """Run tasks with `concurrency` agents in this event loop.
+
+    Agents of one loop share the LLM connection pool, the browser pool and the
+    sandbox. get_task is awaited for the next task, None meaning no more.
+    """
+
+    async def worker() -> None:
+        while True:
+            task = await get_task()
+            if task is None:
+                return
+            on_result(await run_task(task, mode, timeout))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+def process_worker(
+    task_queue: multiprocessing.Queue,
+    result_queue: multiprocessing.Queue,
+    concurrency: int,
+    mode: str,
+    timeout: float,
+) -> None:
+    """Entry point of a worker process, running tasks until it gets None"""
+
+    async def get_task() -> Optional[Dict]:
+        return await asyncio.to_thread(task_queue.get)
+
+    asyncio.run(run_tasks(get_task, result_queue.put, concurrency, mode, timeout))
+
+
+def run_in_processes(tasks: List[Dict], write: Callable[[Dict], None], args) -> None:
+    context = multiprocessing.get_context("spawn")
+    task_queue = context.Queue()
+    result_queue = context.Queue()
+    for task in tasks:
+        task_queue.put(task)
+    # One stop marker per agent of every worker
+    for _ in range(args.workers * args.concurrency):
+        task_queue.put(None)
+
+    workers = [
+        context.Process(
+            target=process_worker,
+            args=(task_queue, result_queue, args.concurrency, args.mode, args.timeout),
+        )
+        for _ in range(args.workers)
+    ]
+    for process in workers:
+        process.start()
+
+    remaining = len(tasks)
+    while remaining:
+        try:
+            write(result_queue.get(timeout=1))
+            remaining -= 1
+        except queue.Empty:
+            if not any(process.is_alive() for process in workers):
+                logger.error(f"Workers exited with {remaining} tasks unfinished")
+                break
+    for process in workers:
+        process.join()
+
+
+async def run_in_process(tasks: List[Dict], write: Callable[[Dict], None], args):
+    pending = asyncio.Queue()
+    for task in tasks:
+        pending.put_nowait(task)
+
+    async def get_task() -> Optional[Dict]:
+        return None if pending.empty() else pending.get_nowait()
+
+    await run_tasks(get_task, write, args.concurrency, args.mode, args.timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a batch of prompts from a JSONL file"
+    )
+    parser.add_argument("tasks", type=Path, help="JSONL file of prompts")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="JSONL file results are appended to (default: <tasks>.results.jsonl), "
+        "tasks already in it are skipped",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent tasks per process"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes, each running --concurrency tasks",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["agent", "flow"],
+        default="agent",
+        help="Run each prompt with a Manus agent or a planning flow",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=config.run_flow_config.task_timeout,
+        help="Seconds a task may run before it is cancelled",
+    )
+    args = parser.parse_args()
+
+    output = args.output or args.tasks.with_suffix(".results.jsonl")
+    tasks = load_tasks(args.tasks, load_done_ids(output))
+    if not tasks:
+        logger.warning("No tasks to run")
+        return
+    logger.info(
+        f"Running {len(tasks)} tasks with {args.workers} process(es) x "
+        f"{args.concurrency} agents, writing results to {output}"
+    )
+
+    statuses: Dict[str, int] = {}
+    tokens = 0
+    start = time.perf_counter()
+    with output.open("a", encoding="utf-8") as f:
+
+        def write(record: Dict) -> None:
+            nonlocal tokens
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+            tokens += record["tokens"]["total"]
+
+        try:
+            if args.workers > 1:
+                run_in_processes(tasks, write, args)
+            else:
+                asyncio.run(run_in_process(tasks, write, args))
+        except KeyboardInterrupt:
+            logger.warning("Batch interrupted, rerun it to continue")
+
+    summary = ", ".join(f"{count} {status}" for status, count in statuses.items())
+    logger.info(
+        f"Finished {sum(statuses.values())}/{len(tasks)} tasks ({summary}) in "
+        f"{time.perf_counter() - start:.1f}s, {tokens} tokens"
+    )
+
+
+if __name__ == "__main__":
+    main()
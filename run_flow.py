@@ -1,43 +1,71 @@
+import argparse
 import asyncio
 import time
 
 from app.agent.data_analysis import DataAnalysis
 from app.agent.manus import Manus
+from app.checkpoint import CheckpointStore
 from app.config import config
 from app.flow.flow_factory import FlowFactory, FlowType
 from app.logger import logger
 
 
 async def run_flow():
+    parser = argparse.ArgumentParser(description="Run a planning flow with a prompt")
+    parser.add_argument(
+        "--resume",
+        metavar="PLAN_ID",
+        help="Resume an interrupted flow from its checkpoint instead of asking for a prompt",
+    )
+    args = parser.parse_args()
+    checkpoints = config.checkpoint_config and config.checkpoint_config.enabled
+    if args.resume and not checkpoints:
+        logger.error("Cannot resume, checkpoints are disabled in the config")
+        return
+
     agents = {
         "manus": Manus(),
     }
     if config.run_flow_config.use_data_analysis_agent:
         agents["data_analysis"] = DataAnalysis()
     try:
-        prompt = input("Enter your prompt: ")
+        prompt = "" if args.resume else input("Enter your prompt: ")
 
-        if prompt.strip().isspace() or not prompt:
+        if not args.resume and (prompt.strip().isspace() or not prompt):
             logger.warning("Empty prompt provided.")
             return
 
+        flow_kwargs = {"plan_id": args.resume} if args.resume else {}
         flow = FlowFactory.create_flow(
             flow_type=FlowType.PLANNING,
             agents=agents,
+            **flow_kwargs,
         )
+        if args.resume and not await asyncio.to_thread(
+            CheckpointStore.for_config().load, flow.checkpoint_run_id
+        ):
+            logger.error(f"Cannot resume, no checkpoint found for plan {args.resume}")
+            return
+        if checkpoints and not args.resume:
+            logger.info(
+                f"Checkpointing plan {flow.active_plan_id}, "
+                f"resume it with: python run_flow.py --resume {flow.active_plan_id}"
+            )
         logger.warning("Processing your request...")
 
         try:
             start_time = time.time()
             result = await asyncio.wait_for(
                 flow.execute(prompt),
-                timeout=3600,  # 60 minute timeout for the entire execution
+                timeout=config.run_flow_config.task_timeout,
             )
             elapsed_time = time.time() - start_time
             logger.info(f"Request processed in {elapsed_time:.2f} seconds")
             logger.info(result)
         except asyncio.TimeoutError:
-            logger.error("Request processing timed out after 1 hour")
+            logger.error(
+                f"Request processing timed out after {config.run_flow_config.task_timeout:.0f} seconds"
+            )
             logger.info(
                 "Operation terminated due to timeout. Please try a simpler request."
             )
@@ -0,0 +1,105 @@
+from typing import List
+
+import pytest
+from pydantic import Field
+
+from app.agent.base import BaseAgent
+from app.checkpoint import CheckpointStore
+from app.schema import Memory
+
+
+class CountingAgent(BaseAgent):
+    """Agent whose steps add numbered messages, optionally failing at one."""
+
+    name: str = "counting"
+    crash_at: int = 0
+    executed: List[int] = Field(default_factory=list)
+
+    async def step(self) -> str:
+        if self.current_step == self.crash_at:
+            raise RuntimeError(f"crash at step {self.current_step}")
+        self.executed.append(self.current_step)
+        self.update_memory("assistant", f"thinking at step {self.current_step}")
+        self.update_memory("user", f"observation of step {self.current_step}")
+        return f"did step {self.current_step}"
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path, monkeypatch):
+    """Points agents at a checkpoint file, reopened on each lookup.
+
+    A new store per run stands for a new process, which only sees what the
+    previous one wrote.
+    """
+    path = tmp_path / "checkpoints.sqlite"
+    monkeypatch.setattr(
+        CheckpointStore,
+        "for_config",
+        classmethod(lambda cls, settings=None: cls(path)),
+    )
+    return path
+
+
+def contents(agent: BaseAgent) -> list:
+    return [(message.role, message.content) for message in agent.memory.messages]
+
+
+async def crash_and_resume(max_messages: int, crash_at: int):
+    """Runs an agent that crashes, and then the same run again."""
+    expected = CountingAgent(max_steps=5, memory=Memory(max_messages=max_messages))
+    expected_result = await expected.run("count")
+
+    crashed = CountingAgent(
+        max_steps=5,
+        memory=Memory(max_messages=max_messages),
+        checkpoint_id="run",
+        crash_at=crash_at,
+    )
+    with pytest.raises(RuntimeError):
+        await crashed.run("count")
+
+    resumed = CountingAgent(
+        max_steps=5, memory=Memory(max_messages=max_messages), checkpoint_id="run"
+    )
+    result = await resumed.run("count")
+    return expected, expected_result, resumed, result
+
+
+@pytest.mark.asyncio
+async def test_resume_after_crash(checkpoint_path):
+    """Tests that a resumed run continues after its last recorded step."""
+    expected, expected_result, resumed, result = await crash_and_resume(
+        max_messages=100, crash_at=3
+    )
+
+    assert result == expected_result
+    assert contents(resumed) == contents(expected)
+    assert resumed.executed == [3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_resume_after_crash_with_trimmed_memory(checkpoint_path):
+    """Tests resuming when memory dropped its oldest messages between steps."""
+    expected, expected_result, resumed, result = await crash_and_resume(
+        max_messages=3, crash_at=4
+    )
+
+    assert result == expected_result
+    assert contents(resumed) == contents(expected)
+    assert len(resumed.memory.messages) == 3
+    assert resumed.executed == [4, 5]
+
+
+@pytest.mark.asyncio
+async def test_finished_run_returns_recorded_result(checkpoint_path):
+    """Tests that a finished run is not run again."""
+    first = CountingAgent(max_steps=2, checkpoint_id="run")
+    result = await first.run("count")
+
+    again = CountingAgent(max_steps=2, checkpoint_id="run", crash_at=1)
+    assert await again.run("count") == result
+    assert again.executed == []
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,93 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent.browser import BrowserContextHelper
+from app.schema import Memory, Message
+from app.tool import browser_use_tool
+from app.tool.base import ToolResult
+
+
+FULL_LIST = "[0]<a>Home</a>\n[1]<button>Search</button>"
+
+
+class FakeBrowserTool:
+    """Browser tool returning the given element states one after the other."""
+
+    def __init__(self, states: list):
+        self.states = states
+        self.resets = 0
+
+    async def get_current_state(self) -> ToolResult:
+        elements, diff = self.states.pop(0)
+        state = {"url": "https://example.com", "title": "Example"}
+        state["interactive_elements"] = elements
+        if diff is not None:
+            state["interactive_elements_diff"] = diff
+        return ToolResult(output=json.dumps(state))
+
+    def reset_observations(self) -> None:
+        self.resets += 1
+
+
+@pytest.fixture
+def make_helper(monkeypatch):
+    """Creates a context helper for an agent holding the fake tool."""
+    monkeypatch.setattr(
+        browser_use_tool, "config", SimpleNamespace(browser_config=None)
+    )
+
+    def make(tool: FakeBrowserTool) -> BrowserContextHelper:
+        agent = SimpleNamespace(
+            available_tools=SimpleNamespace(get_tool=lambda name: tool),
+            memory=Memory(),
+        )
+        return BrowserContextHelper(agent)
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_prompt_shows_elements_then_changes(make_helper):
+    """Tests that the prompt lists all elements once, and then their changes."""
+    changes = {
+        "added": "[2]<input>Query</input>",
+        "changed": "",
+        "removed": [1],
+        "renumbered": [],
+    }
+    tool = FakeBrowserTool(
+        [(FULL_LIST, None), (FULL_LIST, {"unchanged": True}), (FULL_LIST, changes)]
+    )
+    helper = make_helper(tool)
+
+    prompt = await helper.format_next_step_prompt()
+    assert f"their indices:\n{FULL_LIST}\n" in prompt
+    helper.agent.memory.add_message(Message.user_message(prompt))
+
+    prompt = await helper.format_next_step_prompt()
+    assert "their indices (unchanged since the previous step)\n" in prompt
+    assert FULL_LIST not in prompt
+
+    prompt = await helper.format_next_step_prompt()
+    assert "Added:\n[2]<input>Query</input>\nRemoved: [1]\n" in prompt
+    assert "Changed" not in prompt
+    assert tool.resets == 0
+
+
+@pytest.mark.asyncio
+async def test_full_list_sent_again_once_dropped_from_memory(make_helper):
+    """Tests that changes are not sent against a list memory no longer has."""
+    tool = FakeBrowserTool([(FULL_LIST, None), (FULL_LIST, None)])
+    helper = make_helper(tool)
+
+    await helper.format_next_step_prompt()
+    prompt = await helper.format_next_step_prompt()
+
+    assert tool.resets == 1
+    assert f"their indices:\n{FULL_LIST}\n" in prompt
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
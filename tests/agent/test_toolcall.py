@@ -0,0 +1,175 @@
+import asyncio
+import json
+from typing import List
+
+import pytest
+
+from app.agent.toolcall import ToolCallAgent
+from app.exceptions import ToolCallStreamInterrupted
+from app.llm import LLM
+from app.schema import AgentState, Function, Message, ToolCall
+from app.tool import ToolCollection
+from app.tool.base import BaseTool
+
+
+class RecordingTool(BaseTool):
+    """Tool recording when each of its calls starts and ends."""
+
+    name: str = "record"
+    description: str = "Records its calls"
+    parameters: dict = {"type": "object", "properties": {"label": {"type": "string"}}}
+    events: List[str] = []
+
+    async def execute(self, label: str, delay: float = 0.0) -> str:
+        self.events.append(f"start {label}")
+        await asyncio.sleep(delay)
+        self.events.append(f"end {label}")
+        return label
+
+
+class SafeRecordingTool(RecordingTool):
+    """Recording tool that may run concurrently with other calls."""
+
+    name: str = "read"
+    concurrency_safe: bool = True
+
+
+def tool_call(call_id: str, name: str, label: str, delay: float = 0.0) -> ToolCall:
+    return ToolCall(
+        id=call_id,
+        function=Function(
+            name=name, arguments=json.dumps({"label": label, "delay": delay})
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_interrupted_stream_reports_started_calls(monkeypatch):
+    """Tests that calls started before a stream failed are run once and kept."""
+    tool = RecordingTool()
+    agent = ToolCallAgent(
+        available_tools=ToolCollection(tool),
+        next_step_prompt="",
+    )
+    monkeypatch.setattr(agent.llm, "stream_tool_calls", True)
+    requests = []
+
+    async def ask_tool(self, messages, on_tool_call=None, **kwargs):
+        requests.append(list(messages))
+        if len(requests) > 1:
+            return None
+        on_tool_call(tool_call("call_1", "record", "first"))
+        raise ToolCallStreamInterrupted("stream reset")
+
+    monkeypatch.setattr(LLM, "ask_tool", ask_tool)
+    agent.update_memory("user", "record something")
+
+    result = await agent.step()
+
+    assert tool.events == ["start first", "end first"]
+    assert "first" in result
+    assistant, observation = agent.memory.messages[-2:]
+    assert [call.id for call in assistant.tool_calls] == ["call_1"]
+    assert "interrupted" in assistant.content
+    assert observation.tool_call_id == "call_1"
+    assert agent.state != AgentState.FINISHED
+
+    # The next step sees the reported call instead of the failed request
+    await agent.step()
+    assert requests[1][-1].tool_call_id == "call_1"
+    assert tool.events == ["start first", "end first"]
+
+
+@pytest.mark.asyncio
+async def test_unsafe_calls_are_serialized():
+    """Tests that safe calls overlap, unsafe ones run alone, results keep order."""
+    unsafe, safe = RecordingTool(), SafeRecordingTool()
+    safe.events = unsafe.events
+    agent = ToolCallAgent(available_tools=ToolCollection(unsafe, safe))
+    agent.tool_calls = [
+        tool_call("s1", "read", "s1", delay=0.2),
+        tool_call("s2", "read", "s2", delay=0.1),
+        tool_call("u1", "record", "u1", delay=0.1),
+        tool_call("s3", "read", "s3", delay=0.1),
+        tool_call("u2", "record", "u2"),
+    ]
+
+    await agent.act()
+
+    assert unsafe.events == [
+        "start s1",
+        "start s2",
+        "end s2",
+        "end s1",
+        "start u1",
+        "end u1",
+        "start s3",
+        "end s3",
+        "start u2",
+        "end u2",
+    ]
+    assert [message.tool_call_id for message in agent.memory.messages] == [
+        "s1",
+        "s2",
+        "u1",
+        "s3",
+        "u2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_parallel_tool_calls_off_runs_in_order():
+    """Tests that every call runs alone when parallel tool calls are disabled."""
+    unsafe, safe = RecordingTool(), SafeRecordingTool()
+    safe.events = unsafe.events
+    agent = ToolCallAgent(
+        available_tools=ToolCollection(unsafe, safe), parallel_tool_calls=False
+    )
+    agent.tool_calls = [
+        tool_call("s1", "read", "s1", delay=0.1),
+        tool_call("s2", "read", "s2"),
+    ]
+
+    await agent.act()
+
+    assert unsafe.events == ["start s1", "end s1", "start s2", "end s2"]
+
+
+@pytest.mark.parametrize("limit", ["memory_token_budget", "max_input_tokens"])
+def test_compact_memory_fits_budget(monkeypatch, limit):
+    """Tests that memory is compacted to the budget left by the request overhead."""
+    agent = ToolCallAgent(available_tools=ToolCollection(RecordingTool()))
+    monkeypatch.setattr(agent.llm, "max_input_tokens", None)
+    monkeypatch.setattr(agent.llm, "total_input_tokens", 0)
+    agent.update_memory("user", "the task")
+    for i in range(10):
+        agent.memory.add_message(
+            Message.from_tool_calls(
+                tool_calls=[tool_call(f"call_{i}", "record", str(i))]
+            )
+        )
+        agent.update_memory(
+            "tool", "output " * 200, tool_call_id=f"call_{i}", name="record"
+        )
+    counter = agent.llm.token_counter
+    before = agent.memory.count_tokens(counter)
+    if limit == "memory_token_budget":
+        agent.memory_token_budget = before // 2
+    else:
+        monkeypatch.setattr(agent.llm, "max_input_tokens", before // 2)
+
+    agent._compact_memory()
+
+    overhead = counter.FORMAT_TOKENS + counter.count_message(
+        Message.system_message(agent.system_prompt)
+    )
+    overhead += sum(
+        counter.count_text(str(tool)) for tool in agent.available_tools.to_params()
+    )
+    assert agent.memory.count_tokens(counter) <= before // 2 - overhead
+    assert agent.memory.messages[0].content == "the task"
+    assert agent.memory.messages[-1].tool_call_id == "call_9"
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
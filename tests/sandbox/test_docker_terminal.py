@@ -81,6 +81,15 @@ class TestAsyncDockerizedTerminal:
         assert "First" in cmd1
         assert "Second" in cmd2
 
+    @pytest.mark.asyncio
+    async def test_large_output(self, terminal):
+        """Test that output spanning many socket reads is returned intact."""
+        result = await terminal.run_command("seq 1 20000")
+        lines = result.splitlines()
+        assert len(lines) == 20000
+        assert lines[0] == "1"
+        assert lines[-1] == "20000"
+
     @pytest.mark.asyncio
     async def test_session_cleanup(self, docker_container):
         """Test proper cleanup of resources."""
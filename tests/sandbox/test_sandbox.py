@@ -1,3 +1,5 @@
+import os
+
 import pytest
 import pytest_asyncio
 
@@ -86,6 +88,29 @@ async def test_sandbox_file_persistence(sandbox):
         assert content.strip() == expected_content
 
 
+@pytest.mark.asyncio
+async def test_sandbox_copy_directory(sandbox, tmp_path):
+    """Tests copying a directory tree into the sandbox and back."""
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    (src / "small.txt").write_text("Small file")
+    large_content = os.urandom(3 * 1024 * 1024 + 1)
+    (src / "nested" / "large.bin").write_bytes(large_content)
+
+    await sandbox.copy_to(str(src), "/workspace/copied")
+    content = await sandbox.read_file("/workspace/copied/small.txt")
+    assert content == "Small file"
+
+    dst = tmp_path / "dst"
+    dst.mkdir()
+    await sandbox.copy_from("/workspace/copied", str(dst))
+    assert (dst / "copied" / "small.txt").read_text() == "Small file"
+    assert (dst / "copied" / "nested" / "large.bin").read_bytes() == large_content
+
+    await sandbox.copy_from("/workspace/copied/small.txt", str(tmp_path / "one.txt"))
+    assert (tmp_path / "one.txt").read_text() == "Small file"
+
+
 @pytest.mark.asyncio
 async def test_sandbox_python_environment(sandbox):
     """Tests Python environment configuration."""
@@ -6,6 +6,7 @@ from typing import AsyncGenerator
 import pytest
 import pytest_asyncio
 
+from app.config import SandboxSettings
 from app.sandbox.core.manager import SandboxManager
 
 
@@ -134,5 +135,58 @@ async def test_manager_cleanup(manager):
     assert not manager._last_used
 
 
+@pytest.mark.asyncio
+async def test_warm_pool_acquire_and_release(manager):
+    """Tests acquiring from and recycling into the warm pool."""
+    # A single slot keeps the refill from replacing the leased sandbox
+    manager.pool_min_idle = 1
+    manager.pool_max_total = 1
+    await manager.warm_up()
+    assert manager.get_stats()["pools"]["python:3.12-slim"]["warm"] == 1
+
+    # Acquire should be served from the warm pool
+    sandbox_id = await manager.create_sandbox()
+    stats = manager.get_stats()
+    assert stats["pool_hits"] == 1
+    assert stats["pool_hit_rate"] == 1.0
+
+    sandbox = await manager.get_sandbox(sandbox_id)
+    await sandbox.write_file("leftover.txt", "data")
+
+    # The refill has no free slot, so release resets and recycles
+    for task in list(manager._refill_tasks.values()):
+        await task
+    assert manager.get_stats()["pools"]["python:3.12-slim"]["warm"] == 0
+    await manager.release_sandbox(sandbox_id)
+    assert sandbox_id not in manager._sandboxes
+    assert manager.get_stats()["pools"]["python:3.12-slim"]["warm"] == 1
+
+    # The same sandbox comes back, without the previous files
+    sandbox_id = await manager.create_sandbox()
+    assert await manager.get_sandbox(sandbox_id) is sandbox
+    assert manager.get_stats()["pool_hits"] == 2
+    result = await sandbox.run_command("ls")
+    assert "leftover.txt" not in result
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_refill_respects_max_total(manager):
+    """Tests that refills and acquires together stay within the pool limit."""
+    manager.pool_min_idle = 2
+    manager.pool_max_total = 2
+    results = await asyncio.gather(
+        manager.warm_up(),
+        manager.create_sandbox(),
+        manager.create_sandbox(),
+        return_exceptions=True,
+    )
+    for task in list(manager._refill_tasks.values()):
+        await task
+
+    pool_key = manager._pool_key(SandboxSettings())
+    assert manager._pool_size(pool_key) <= 2
+    assert sum(isinstance(result, str) for result in results) <= 2
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
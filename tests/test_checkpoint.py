@@ -0,0 +1,104 @@
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+
+from app.checkpoint import CheckpointStore
+
+
+def stored_kinds(path: Path, run_id: str) -> list:
+    """Reads the record kinds of a run straight from the file."""
+    with sqlite3.connect(str(path)) as db:
+        rows = db.execute(
+            "SELECT kind FROM records WHERE run_id = ? ORDER BY seq", (run_id,)
+        ).fetchall()
+    return [kind for (kind,) in rows]
+
+
+def test_record_and_load(tmp_path):
+    """Tests that records are replayed in order, across store instances."""
+    path = tmp_path / "checkpoints.sqlite"
+    store = CheckpointStore(path)
+    store.record("run", "step", {"step": 1})
+    store.record("run", "step", {"step": 2})
+    store.record("other", "step", {"step": 1})
+    store.flush()
+
+    reopened = CheckpointStore(path)
+    assert reopened.load("run") == [("step", {"step": 1}), ("step", {"step": 2})]
+    assert reopened.load("missing") == []
+
+
+def test_replace_keeps_latest_record(tmp_path):
+    """Tests that replaced records keep only the latest snapshot."""
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite")
+    store.record("run", "plan", {"version": 1}, replace=True)
+    store.flush()
+    store.record("run", "step", {"step": 1})
+    store.record("run", "plan", {"version": 2}, replace=True)
+    store.record("run", "plan", {"version": 3}, replace=True)
+
+    assert store.load("run") == [("step", {"step": 1}), ("plan", {"version": 3})]
+
+
+def test_delete(tmp_path):
+    """Tests that deleting a run drops its written and pending records."""
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite")
+    store.record("run", "step", {"step": 1})
+    store.flush()
+    store.record("run", "step", {"step": 2})
+    store.record("other", "step", {"step": 1})
+    store.delete("run")
+
+    assert store.load("run") == []
+    assert store.load("other") == [("step", {"step": 1})]
+
+
+def wait_for_kinds(path: Path, run_id: str, kinds: list) -> None:
+    """Waits for the timer thread to write the given record kinds."""
+    deadline = time.monotonic() + 5
+    while stored_kinds(path, run_id) != kinds and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stored_kinds(path, run_id) == kinds
+
+
+def test_flush_records(tmp_path):
+    """Tests that a full buffer is written right away."""
+    path = tmp_path / "checkpoints.sqlite"
+    store = CheckpointStore(path, flush_interval=60, flush_records=2)
+    store.record("run", "step", {"step": 1})
+    assert stored_kinds(path, "run") == []
+
+    store.record("run", "result", "done")
+    wait_for_kinds(path, "run", ["step", "result"])
+
+
+def test_record_does_not_wait_for_writes(tmp_path):
+    """Tests that recording returns while a write is in progress."""
+    path = tmp_path / "checkpoints.sqlite"
+    store = CheckpointStore(path, flush_interval=60, flush_records=1)
+    with store._write_lock:
+        started = time.monotonic()
+        store.record("run", "step", {"step": 1})
+        store.record("run", "step", {"step": 2})
+        assert time.monotonic() - started < 0.5
+        assert stored_kinds(path, "run") == []
+
+    wait_for_kinds(path, "run", ["step", "step"])
+    assert store.load("run") == [("step", {"step": 1}), ("step", {"step": 2})]
+
+
+def test_flush_interval(tmp_path):
+    """Tests that buffered records are written without a further record."""
+    path = tmp_path / "checkpoints.sqlite"
+    store = CheckpointStore(path, flush_interval=0.1, flush_records=64)
+    store.record("run", "step", {"step": 1})
+    assert stored_kinds(path, "run") == []
+
+    time.sleep(0.5)
+    assert stored_kinds(path, "run") == ["step"]
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
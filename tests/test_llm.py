@@ -0,0 +1,110 @@
+import itertools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.exceptions import ToolCallStreamInterrupted
+from app.llm import LLM, LLMResponseCache
+
+
+def tool_call_chunk(index: int, call_id: str, arguments: str) -> SimpleNamespace:
+    """Builds a stream chunk holding one tool call."""
+    call = SimpleNamespace(
+        index=index,
+        id=call_id,
+        function=SimpleNamespace(name="bash", arguments=arguments),
+    )
+    return SimpleNamespace(
+        choices=[
+            SimpleNamespace(delta=SimpleNamespace(content=None, tool_calls=[call]))
+        ]
+    )
+
+
+class FailingStreamClient:
+    """Chat client whose streams fail after sending the given chunks."""
+
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **params):
+        self.requests += 1
+
+        async def stream():
+            for chunk in self.chunks:
+                yield chunk
+            raise ConnectionError("stream reset")
+
+        return stream()
+
+
+@pytest.fixture
+def streaming_llm(monkeypatch) -> LLM:
+    """Creates an LLM streaming tool calls, without a response cache."""
+    llm = LLM()
+    monkeypatch.setattr(llm, "stream_tool_calls", True)
+    monkeypatch.setattr(llm, "api_type", "openai")
+    monkeypatch.setattr(llm, "response_cache", None)
+    return llm
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_after_tool_call_is_not_retried(
+    streaming_llm, monkeypatch
+):
+    """Tests that a started tool call is not started again by a retry."""
+    client = FailingStreamClient(
+        [
+            tool_call_chunk(0, "call_1", '{"command": "ls"}'),
+            tool_call_chunk(1, "call_2", '{"command":'),
+        ]
+    )
+    monkeypatch.setattr(streaming_llm, "client", client)
+    started = []
+
+    with pytest.raises(ToolCallStreamInterrupted):
+        await streaming_llm.ask_tool(
+            [{"role": "user", "content": "list files"}],
+            tools=[{"type": "function", "function": {"name": "bash"}}],
+            on_tool_call=lambda call: started.append(call.id),
+        )
+
+    assert client.requests == 1
+    assert started == ["call_1"]
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_before_tool_call_is_raised(streaming_llm, monkeypatch):
+    """Tests that a stream failing before any tool call keeps its error."""
+    client = FailingStreamClient([])
+    monkeypatch.setattr(streaming_llm, "client", client)
+
+    with pytest.raises(ConnectionError):
+        await streaming_llm._stream_tool_response(
+            {"messages": []}, 0, on_tool_call=lambda call: None
+        )
+
+
+def test_response_cache_evicts_least_recently_read(tmp_path, monkeypatch):
+    """Tests that reads, written lazily, still protect entries from eviction."""
+    clock = itertools.count()
+    monkeypatch.setattr("app.llm.time.time", lambda: next(clock))
+    value = {"message": "x" * 100}
+    cache = LLMResponseCache(tmp_path / "responses.sqlite", memory_entries=0)
+    cache.put("first", value)
+    cache.put("second", value)
+    cache.max_size_bytes = 2 * len(json.dumps(value))
+
+    assert cache.get("first") == value
+    cache.put("third", value)
+
+    assert cache.get("first") == value
+    assert cache.get("second") is None
+    assert cache.get("third") == value
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from run_batch import load_done_ids, load_tasks
+
+
+def write_lines(path: Path, lines: list) -> Path:
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_load_tasks(tmp_path):
+    """Tests prompts, objects and defaults read from a tasks file."""
+    path = write_lines(
+        tmp_path / "batch.jsonl",
+        [
+            json.dumps("first prompt"),
+            "",
+            json.dumps({"id": "b", "prompt": "second", "mode": "flow"}),
+            json.dumps({"prompt": "third", "checkpoint_id": "custom"}),
+        ],
+    )
+
+    assert load_tasks(path, set()) == [
+        {"prompt": "first prompt", "id": 1, "checkpoint_id": "batch_1"},
+        {"id": "b", "prompt": "second", "mode": "flow", "checkpoint_id": "batch_b"},
+        {"prompt": "third", "id": 4, "checkpoint_id": "custom"},
+    ]
+
+
+def test_load_tasks_skips_bad_lines(tmp_path):
+    """Tests that lines that are not tasks are skipped, not fatal."""
+    path = write_lines(
+        tmp_path / "batch.jsonl",
+        [
+            "{not json",
+            json.dumps(["a", "list"]),
+            json.dumps(42),
+            json.dumps({"id": 1}),
+            json.dumps({"id": ["unhashable"], "prompt": "bad id"}),
+            json.dumps("kept"),
+        ],
+    )
+
+    assert load_tasks(path, set()) == [
+        {"prompt": "kept", "id": 6, "checkpoint_id": "batch_6"}
+    ]
+
+
+def test_resume_skips_done_tasks(tmp_path):
+    """Tests that tasks with a result are skipped when a batch is run again."""
+    tasks = write_lines(
+        tmp_path / "batch.jsonl",
+        [json.dumps("one"), json.dumps({"id": "two", "prompt": "two"}), '"three"'],
+    )
+    results = write_lines(
+        tmp_path / "batch.results.jsonl",
+        [
+            json.dumps({"id": 1, "status": "ok"}),
+            json.dumps({"id": "two", "status": "timeout"}),
+            '{"id": 3, "status": "ok"',
+            json.dumps([3]),
+        ],
+    )
+
+    done_ids = load_done_ids(results)
+    assert done_ids == {1, "two"}
+    assert [task["id"] for task in load_tasks(tasks, done_ids)] == [3]
+    assert load_done_ids(tmp_path / "missing.jsonl") == set()
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,145 @@
+import pytest
+
+from app.llm import TokenCounter
+from app.schema import Function, Memory, Message, Role, ToolCall
+
+
+class WordTokenizer:
+    """Tokenizer counting one token per word."""
+
+    name = "words"
+
+    def encode(self, text: str) -> list:
+        return text.split()
+
+
+@pytest.fixture
+def counter() -> TokenCounter:
+    """Creates a token counter counting words."""
+    return TokenCounter(WordTokenizer())
+
+
+def calls_message(*call_ids: str) -> Message:
+    return Message.from_tool_calls(
+        content="calling tools",
+        tool_calls=[
+            ToolCall(id=call_id, function=Function(name="bash", arguments="{}"))
+            for call_id in call_ids
+        ],
+    )
+
+
+def observation(call_id: str, words: int) -> Message:
+    return Message.tool_message(
+        " ".join(["word"] * words), name="bash", tool_call_id=call_id
+    )
+
+
+def recount(memory: Memory, counter: TokenCounter, supports_images: bool) -> int:
+    """Counts the messages from scratch."""
+    return sum(
+        counter.count_message(message.model_copy(), supports_images)
+        for message in memory.messages
+    )
+
+
+def test_compact_within_budget_changes_nothing(counter):
+    """Tests that memory under budget is left alone."""
+    memory = Memory(messages=[Message.user_message("task"), observation("a", 900)])
+    total = memory.count_tokens(counter)
+
+    assert memory.compact(counter, total) == total
+    assert memory.messages[1].content.count("word") == 900
+
+
+def test_compact_drops_old_images_first(counter):
+    """Tests that older screenshots go before any text is touched."""
+    memory = Memory(
+        messages=[
+            Message.user_message("task"),
+            Message.user_message("old screenshot", base64_image="aW1hZ2U="),
+            observation("a", 900),
+            Message.user_message("new screenshot", base64_image="aW1hZ2U="),
+        ]
+    )
+    total = memory.count_tokens(counter, supports_images=True)
+
+    after = memory.compact(counter, total - 1, supports_images=True, keep_recent=1)
+
+    assert after < total
+    assert after == recount(memory, counter, supports_images=True)
+    assert memory.messages[1].base64_image is None
+    assert memory.messages[3].base64_image == "aW1hZ2U="
+    assert memory.messages[2].content.count("word") == 900
+
+
+def test_compact_truncates_old_observations(counter):
+    """Tests that old observations keep their prefix and report what was cut."""
+    memory = Memory(
+        messages=[
+            Message.user_message("task"),
+            calls_message("a", "b"),
+            observation("a", 300),
+            observation("b", 300),
+            Message.user_message("recent"),
+        ]
+    )
+    total = memory.count_tokens(counter)
+
+    after = memory.compact(counter, total - 1, keep_recent=1, observation_chars=500)
+
+    assert after == recount(memory, counter, supports_images=False)
+    truncated, kept = memory.messages[2].content, memory.messages[3].content
+    # 500 characters keep 100 of the 300 words
+    assert truncated.startswith("word " * 100 + "\n")
+    assert "observation truncated, 200 tokens removed" in truncated
+    assert kept.count("word") == 300
+
+
+def test_compact_evicts_groups_and_pins_task(counter):
+    """Tests that turns are evicted with their results, keeping the task."""
+    memory = Memory(
+        messages=[
+            Message.user_message("the task"),
+            calls_message("a", "b"),
+            observation("a", 100),
+            observation("b", 100),
+            Message.assistant_message("thinking"),
+            calls_message("c"),
+            observation("c", 100),
+        ]
+    )
+    memory.count_tokens(counter)
+
+    after = memory.compact(counter, 60, keep_recent=1, observation_chars=0)
+
+    assert after == recount(memory, counter, supports_images=False)
+    # The recent tool result keeps its tool_calls message
+    assert [message.role for message in memory.messages] == [
+        Role.USER,
+        Role.ASSISTANT,
+        Role.TOOL,
+    ]
+    assert memory.messages[0].content == "the task"
+    assert memory.messages[2].tool_call_id == "c"
+
+
+def test_compact_without_recent_window(counter):
+    """Tests compaction with keep_recent=0 and a tool result last."""
+    memory = Memory(
+        messages=[
+            Message.user_message("task"),
+            calls_message("a"),
+            observation("a", 300),
+        ]
+    )
+    total = memory.count_tokens(counter)
+
+    after = memory.compact(counter, total - 1, keep_recent=0)
+
+    assert after < total
+    assert "observation truncated" in memory.messages[2].content
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
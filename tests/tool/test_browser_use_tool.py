@@ -0,0 +1,124 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.llm import LLM
+from app.tool import browser_use_tool
+from app.tool.browser_use_tool import BrowserUseTool
+
+
+def tool_response(arguments: dict) -> SimpleNamespace:
+    """Builds a response holding one extract_content tool call."""
+    return SimpleNamespace(
+        tool_calls=[
+            SimpleNamespace(function=SimpleNamespace(arguments=json.dumps(arguments)))
+        ]
+    )
+
+
+@pytest.fixture
+def chunked_tool(monkeypatch) -> BrowserUseTool:
+    """Creates a browser tool whose pages split into chunks on '|'."""
+    monkeypatch.setattr(
+        BrowserUseTool,
+        "_markdown_chunks",
+        lambda self, html, max_tokens: html.split("|"),
+    )
+    return BrowserUseTool()
+
+
+@pytest.mark.asyncio
+async def test_extract_content_merges_chunks(chunked_tool, monkeypatch):
+    """Tests that chunk results are merged in page order."""
+
+    async def ask_tool(self, messages, **kwargs):
+        chunk = messages[0]["content"].rsplit("\n", 2)[-2]
+        return tool_response(
+            {
+                "extracted_content": {
+                    "text": f"text of {chunk}",
+                    "metadata": {"source": "page"},
+                }
+            }
+        )
+
+    monkeypatch.setattr(LLM, "ask_tool", ask_tool)
+    result = await chunked_tool._extract_content("first|second", "goal")
+
+    assert result.error is None
+    assert "text of first\\n\\ntext of second" in result.output
+    assert "'chunks': '2 of 2'" in result.output
+
+
+@pytest.mark.asyncio
+async def test_extract_content_skips_failed_chunks(chunked_tool, monkeypatch):
+    """Tests that a failing or malformed chunk leaves a partial result."""
+
+    async def ask_tool(self, messages, **kwargs):
+        chunk = messages[0]["content"].rsplit("\n", 2)[-2]
+        if chunk == "broken":
+            raise RuntimeError("token limit exceeded")
+        if chunk == "malformed":
+            return SimpleNamespace(
+                tool_calls=[SimpleNamespace(function=SimpleNamespace(arguments="{"))]
+            )
+        if chunk == "string":
+            return tool_response({"extracted_content": "not an object"})
+        return tool_response({"extracted_content": {"text": f"text of {chunk}"}})
+
+    monkeypatch.setattr(LLM, "ask_tool", ask_tool)
+    result = await chunked_tool._extract_content(
+        "first|broken|malformed|string|last", "goal"
+    )
+
+    assert result.error is None
+    assert "text of first\\n\\ntext of last" in result.output
+    assert "'chunks': '2 of 5'" in result.output
+
+
+@pytest.mark.asyncio
+async def test_extract_content_all_chunks_failed(chunked_tool, monkeypatch):
+    """Tests extraction when no chunk produced content."""
+
+    async def ask_tool(self, messages, **kwargs):
+        raise RuntimeError("token limit exceeded")
+
+    monkeypatch.setattr(LLM, "ask_tool", ask_tool)
+    result = await chunked_tool._extract_content("first|second", "goal")
+
+    assert result.output == "No content was extracted from the page."
+
+
+def test_reset_observations(monkeypatch):
+    """Tests that a reset sends the next element list in full."""
+    monkeypatch.setattr(
+        browser_use_tool, "config", SimpleNamespace(browser_config=None)
+    )
+    tool = BrowserUseTool()
+    elements = "[0]<a>Home</a>\n[1]<button>Search</button>"
+
+    assert tool._diff_elements("https://example.com", elements, {}) is None
+    assert tool._diff_elements("https://example.com", elements, {}) == {
+        "unchanged": True
+    }
+
+    tool.reset_observations()
+    assert tool._diff_elements("https://example.com", elements, {}) is None
+
+
+@pytest.mark.asyncio
+async def test_cleanup_resets_observations(monkeypatch):
+    """Tests that a released tool sends its next state in full."""
+    monkeypatch.setattr(
+        browser_use_tool, "config", SimpleNamespace(browser_config=None)
+    )
+    tool = BrowserUseTool()
+    tool._diff_elements("https://example.com", "[0]<a>Home</a>", {})
+
+    await tool.cleanup()
+    assert tool._diff_elements("https://example.com", "[0]<a>Home</a>", {}) is None
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
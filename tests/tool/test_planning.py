@@ -0,0 +1,150 @@
+import random
+
+import pytest
+
+from app.exceptions import ToolError
+from app.tool.planning import Plan
+
+
+STATUSES = ["not_started", "in_progress", "completed", "blocked"]
+
+
+def expected_ready(plan: Plan) -> list:
+    """Computes the ready steps from scratch."""
+    return [
+        i
+        for i, status in enumerate(plan.step_statuses)
+        if status in ("not_started", "in_progress")
+        and all(plan.step_statuses[j] == "completed" for j in plan.dependencies[i])
+    ]
+
+
+def assert_consistent(plan: Plan) -> None:
+    """Checks the incremental index against a plan rebuilt from its fields."""
+    assert plan.ready_steps() == expected_ready(plan)
+    for status in STATUSES:
+        assert plan.count(status) == plan.step_statuses.count(status)
+    assert plan.format() == Plan.model_validate(plan.model_dump()).format()
+
+
+@pytest.fixture
+def diamond() -> Plan:
+    """Creates a plan where step 3 waits for steps 1 and 2, which wait for 0."""
+    return Plan.create(
+        "plan",
+        "Diamond",
+        ["[SEARCH] Find", "Read A", "Read B", "[CODE] Combine"],
+        dependencies=[[], [0], [0], [1, 2]],
+    )
+
+
+def test_completion_releases_dependents(diamond):
+    """Tests that completing a step readies the steps waiting only for it."""
+    assert diamond.ready_steps() == [0]
+
+    diamond.mark_step(0, "completed")
+    assert diamond.ready_steps() == [1, 2]
+
+    diamond.mark_step(1, "completed")
+    assert diamond.ready_steps() == [2]
+
+    diamond.mark_step(2, "completed")
+    assert diamond.ready_steps() == [3]
+    assert diamond.count("completed") == 3
+    assert_consistent(diamond)
+
+
+def test_uncompleting_a_step_holds_dependents(diamond):
+    """Tests that a step marked active again holds back its dependents."""
+    diamond.mark_step(0, "completed")
+    diamond.mark_step(1, "completed")
+    diamond.mark_step(2, "completed")
+
+    diamond.mark_step(1, "not_started")
+    assert diamond.ready_steps() == [1]
+    assert diamond.count("completed") == 2
+    assert_consistent(diamond)
+
+    diamond.mark_step(0, "blocked")
+    assert diamond.ready_steps() == []
+    assert_consistent(diamond)
+
+
+def test_in_progress_steps_stay_ready(diamond):
+    """Tests that in progress steps remain ready until they end."""
+    diamond.mark_step(0, "completed")
+    diamond.mark_step(1, "in_progress")
+    assert diamond.ready_steps() == [1, 2]
+    assert diamond.count("in_progress") == 1
+
+    diamond.mark_step(1, "blocked")
+    assert diamond.ready_steps() == [2]
+    assert_consistent(diamond)
+
+
+def test_sequential_plan():
+    """Tests that without dependencies each step waits for the previous one."""
+    plan = Plan.create("plan", "Sequence", ["One", "Two", "Three"])
+    assert plan.dependencies == [[], [0], [1]]
+    assert plan.ready_steps() == [0]
+
+    plan.mark_step(0, "completed")
+    assert plan.ready_steps() == [1]
+    assert_consistent(plan)
+
+
+def test_set_steps_keeps_unchanged_steps(diamond):
+    """Tests that replacing steps keeps the state of unchanged ones."""
+    diamond.mark_step(0, "completed", notes="found")
+    diamond.set_steps(["[SEARCH] Find", "Read C", "Read B"])
+
+    assert diamond.step_statuses == ["completed", "not_started", "not_started"]
+    assert diamond.step_notes == ["found", "", ""]
+    assert diamond.step_dependencies is None
+    assert diamond.ready_steps() == [1]
+    assert diamond.count("completed") == 1
+    assert_consistent(diamond)
+
+
+def test_set_dependencies(diamond):
+    """Tests that new dependencies rebuild the ready steps."""
+    diamond.set_dependencies([[], [], [], []])
+    assert diamond.ready_steps() == [0, 1, 2, 3]
+
+    with pytest.raises(ToolError):
+        diamond.set_dependencies([[], [2], [], []])
+
+
+def test_model_round_trip(diamond):
+    """Tests that a dumped plan validates back to the same state."""
+    diamond.mark_step(0, "completed", notes="done")
+    diamond.mark_step(1, "in_progress")
+
+    restored = Plan.model_validate(diamond.model_dump())
+    assert restored == diamond
+    assert restored.ready_steps() == diamond.ready_steps() == [1, 2]
+    assert restored.step_type(0) == "search"
+    assert restored.step_type(3) == "code"
+    assert restored.format() == diamond.format()
+
+    restored.mark_step(1, "completed")
+    restored.mark_step(2, "completed")
+    assert restored.ready_steps() == [3]
+    assert diamond.ready_steps() == [1, 2]
+
+
+def test_random_changes_match_rebuilt_index():
+    """Tests the incremental index against a full rebuild after each change."""
+    rng = random.Random(0)
+    for _ in range(50):
+        size = rng.randint(1, 8)
+        dependencies = [rng.sample(range(i), rng.randint(0, i)) for i in range(size)]
+        plan = Plan.create("plan", "Random", [f"Step {i}" for i in range(size)])
+        plan.set_dependencies(dependencies)
+        for _ in range(20):
+            plan.mark_step(rng.randrange(size), rng.choice(STATUSES))
+            assert_consistent(plan)
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
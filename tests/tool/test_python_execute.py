@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from app.tool.python_execute import _PythonWorkerPool
+
+
+PID = "import os\nprint(os.getpid())"
+
+
+@pytest_asyncio.fixture
+async def pool():
+    """Creates a pool of one warm worker, stopped after the test."""
+    pool = _PythonWorkerPool(size=1, max_tasks_per_worker=3)
+    yield pool
+    # Let background starts and stops finish before stopping the rest
+    await asyncio.sleep(0.5)
+    pool.shutdown()
+
+
+async def pid(pool: _PythonWorkerPool, session_id=None) -> str:
+    result = await pool.run(PID, timeout=10, session_id=session_id)
+    assert result["success"]
+    return result["observation"]
+
+
+@pytest.mark.asyncio
+async def test_snippets_start_from_fresh_globals(pool):
+    """Tests that a pooled worker does not keep variables between snippets."""
+    first = await pool.run("x = 1\nprint(x)", timeout=10)
+    second = await pool.run("print(x)", timeout=10)
+
+    assert first == {"observation": "1\n", "success": True}
+    assert second == {"observation": "name 'x' is not defined", "success": False}
+
+
+@pytest.mark.asyncio
+async def test_timed_out_worker_is_replaced(pool):
+    """Tests that a timed out worker is killed and the pool keeps running."""
+    before = await pid(pool)
+    result = await pool.run("while True:\n    pass", timeout=1)
+
+    assert result == {
+        "observation": "Execution timeout after 1 seconds",
+        "success": False,
+    }
+    after = await pid(pool)
+    assert after != before
+
+
+@pytest.mark.asyncio
+async def test_workers_are_recycled(pool):
+    """Tests that a worker is replaced after max_tasks_per_worker snippets."""
+    pids = [await pid(pool) for _ in range(4)]
+
+    assert pids[0] == pids[1] == pids[2]
+    assert pids[3] != pids[0]
+
+
+@pytest.mark.asyncio
+async def test_pool_grows_when_busy(pool):
+    """Tests that snippets do not wait for a busy worker, and size are kept."""
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(pool.run("import time\ntime.sleep(1)", timeout=10) for _ in range(3))
+    )
+
+    assert all(result["success"] for result in results)
+    assert time.monotonic() - started < 2.5
+    assert len(pool._idle) == 1
+    assert pool._busy == 0
+
+
+@pytest.mark.asyncio
+async def test_sessions_keep_globals(pool):
+    """Tests that a session keeps its variables until it is closed."""
+    await pool.run("x = 1", timeout=10, session_id="a")
+    kept = await pool.run("print(x)", timeout=10, session_id="a")
+    other = await pool.run("print(x)", timeout=10, session_id="b")
+
+    assert kept == {"observation": "1\n", "success": True}
+    assert other["success"] is False
+
+    await pool.close_session("a")
+    closed = await pool.run("print(x)", timeout=10, session_id="a")
+    assert closed["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_timed_out_session_starts_over(pool):
+    """Tests that a session whose worker timed out gets a new worker."""
+    await pool.run("x = 1", timeout=10, session_id="a")
+    before = await pid(pool, session_id="a")
+    result = await pool.run("while True:\n    pass", timeout=1, session_id="a")
+
+    assert result["success"] is False
+    assert await pid(pool, session_id="a") != before
+    lost = await pool.run("print(x)", timeout=10, session_id="a")
+    assert lost["success"] is False
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,229 @@
+import itertools
+import time
+from types import SimpleNamespace
+from typing import List
+
+import httpx
+import pytest
+
+from app.config import SearchSettings
+from app.tool import web_search
+from app.tool.search.base import SearchItem, WebSearchEngine
+from app.tool.web_search import SearchCache, WebContentFetcher, WebSearch
+
+
+class FakeEngine(WebSearchEngine):
+    """Engine returning fixed items after a delay, blocking like real ones."""
+
+    items: List[SearchItem] = []
+    delay: float = 0.0
+
+    def perform_search(self, query, num_results=10, *args, **kwargs):
+        time.sleep(self.delay)
+        return self.items[:num_results]
+
+
+def items(*urls: str) -> List[SearchItem]:
+    return [SearchItem(title=url, url=url) for url in urls]
+
+
+@pytest.fixture
+def search_config(monkeypatch, tmp_path):
+    """Points the module at search settings the test can change."""
+    settings = SearchSettings(cache_path=str(tmp_path / "search.sqlite"))
+    monkeypatch.setattr(
+        web_search,
+        "config",
+        SimpleNamespace(search_config=settings, workspace_root=tmp_path),
+    )
+    monkeypatch.setattr(web_search, "_ENGINE_LATENCY", {})
+    return settings
+
+
+def make_tool(**engines: FakeEngine) -> WebSearch:
+    tool = WebSearch()
+    tool._search_engine = engines
+    return tool
+
+
+@pytest.mark.asyncio
+async def test_race_returns_first_complete_result(search_config):
+    """Tests that a race returns without waiting for slower engines."""
+    tool = make_tool(
+        slow=FakeEngine(items=items("https://slow/1", "https://slow/2"), delay=1),
+        fast=FakeEngine(items=items("https://fast/1", "https://fast/2")),
+    )
+
+    started = time.perf_counter()
+    results = await tool._race_engines(["slow", "fast"], "query", 2, {})
+
+    assert time.perf_counter() - started < 0.9
+    assert [(r.position, r.url, r.source) for r in results] == [
+        (1, "https://fast/1", "fast"),
+        (2, "https://fast/2", "fast"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_race_without_complete_result_keeps_largest(search_config):
+    """Tests that without a full result set the largest one is returned."""
+    tool = make_tool(
+        one=FakeEngine(items=items("https://one/1")),
+        two=FakeEngine(items=items("https://two/1", "https://two/2"), delay=0.1),
+        none=FakeEngine(),
+    )
+
+    results = await tool._race_engines(["one", "two", "none"], "query", 5, {})
+
+    assert [r.url for r in results] == ["https://two/1", "https://two/2"]
+
+
+@pytest.mark.asyncio
+async def test_race_merge_orders_by_finish_and_deduplicates(search_config):
+    """Tests that merged results follow finish order without duplicate URLs."""
+    tool = make_tool(
+        late=FakeEngine(
+            items=items("https://A.com/#top", "https://late/1", "https://late/2"),
+            delay=0.2,
+        ),
+        early=FakeEngine(items=items("https://a.com", "https://early/1")),
+    )
+
+    results = await tool._race_engines(["late", "early"], "query", 3, {}, merge=True)
+
+    assert [(r.position, r.url, r.source) for r in results] == [
+        (1, "https://a.com", "early"),
+        (2, "https://early/1", "early"),
+        (3, "https://late/1", "late"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_race_strategy_tries_groups_in_engine_order(search_config):
+    """Tests that the next group of engines races once a group found nothing."""
+    search_config.strategy = "race"
+    search_config.race_engines = 2
+    search_config.engine = "a"
+    search_config.fallback_engines = ["b", "c"]
+    tool = make_tool(
+        c=FakeEngine(items=items("https://c/1")),
+        b=FakeEngine(),
+        a=FakeEngine(),
+    )
+
+    results = await tool._try_all_engines("query", 1, {})
+
+    assert [(r.url, r.source) for r in results] == [("https://c/1", "c")]
+
+
+class FakeSite:
+    """Mock transport answering requests with the given response."""
+
+    def __init__(self, response: httpx.Response):
+        self.response = response
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.response
+
+
+@pytest.fixture
+def fake_site(monkeypatch):
+    """Routes the fetcher's requests to a fake site."""
+    site = FakeSite(httpx.Response(404))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(site))
+    monkeypatch.setattr(WebContentFetcher, "_get_client", classmethod(lambda c: client))
+    return site
+
+
+def html_page(body: str, **headers: str) -> httpx.Response:
+    return httpx.Response(
+        200,
+        headers={"content-type": "text/html; charset=utf-8", **headers},
+        content=f"<html><body>{body}</body></html>".encode(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_extracts_text(search_config, fake_site):
+    """Tests that page text is extracted without scripts and navigation."""
+    fake_site.response = html_page(
+        "<nav>Menu</nav><script>var x;</script><p>Hello</p><p>world</p>"
+    )
+
+    assert await WebContentFetcher.fetch_content("https://site/page") == "Hello world"
+
+
+@pytest.mark.asyncio
+async def test_fetch_skips_non_html(search_config, fake_site):
+    """Tests that non-text responses are skipped from their headers."""
+    fake_site.response = httpx.Response(
+        200, headers={"content-type": "application/pdf"}, content=b"%PDF"
+    )
+
+    assert await WebContentFetcher.fetch_content("https://site/doc.pdf") is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_truncates_large_pages(search_config, fake_site):
+    """Tests that downloads stop at fetch_max_bytes."""
+    search_config.fetch_max_bytes = 100
+    fake_site.response = html_page("<p>" + "a" * 1000 + "</p>")
+
+    text = await WebContentFetcher.fetch_content("https://site/large")
+
+    assert text and len(text) < 100
+
+
+@pytest.mark.asyncio
+async def test_fetch_uses_and_revalidates_cache(search_config, fake_site):
+    """Tests that cached pages are served fresh and revalidated once stale."""
+    search_config.cache = True
+    fake_site.response = html_page("<p>Cached</p>", etag='"v1"')
+
+    assert await WebContentFetcher.fetch_content("https://site/page") == "Cached"
+    assert await WebContentFetcher.fetch_content("https://site/page") == "Cached"
+    assert len(fake_site.requests) == 1
+
+    cache = SearchCache.for_config(search_config)
+    cache.page_ttl = -1
+    fake_site.response = httpx.Response(304)
+
+    assert await WebContentFetcher.fetch_content("https://site/page") == "Cached"
+    assert fake_site.requests[-1].headers["if-none-match"] == '"v1"'
+    assert cache.stats["page_revalidations"] == 1
+
+
+def test_cache_results_expire(tmp_path, monkeypatch):
+    """Tests that cached results are only returned within their TTL."""
+    now = [1000.0]
+    monkeypatch.setattr("app.tool.web_search.time.time", lambda: now[0])
+    cache = SearchCache(tmp_path / "search.sqlite", results_ttl=60)
+    key = SearchCache.make_results_key("Some  Query", lang="en")
+    cache.put_results(key, [{"url": "https://a"}])
+
+    assert SearchCache.make_results_key("some query", lang="en") == key
+    assert cache.get_results(key) == [{"url": "https://a"}]
+    now[0] += 61
+    assert cache.get_results(key) is None
+
+
+def test_cache_evicts_least_recently_read(tmp_path, monkeypatch):
+    """Tests that reads, written lazily, still protect pages from eviction."""
+    clock = itertools.count()
+    monkeypatch.setattr("app.tool.web_search.time.time", lambda: next(clock))
+    cache = SearchCache(tmp_path / "search.sqlite", max_size_bytes=200)
+    cache.put_page("first", "x" * 100)
+    cache.put_page("second", "x" * 100)
+
+    assert cache.get_page("first")["content"] == "x" * 100
+    cache.put_page("third", "x" * 100)
+
+    assert cache.get_page("first") is not None
+    assert cache.get_page("second") is None
+    assert cache.get_page("third") is not None
+
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])